@@ -1,9 +1,25 @@
+import io
+
 from django import forms
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import OperationalError, connections
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
 
+from academics.exports import enrollment_marks_export, exam_roster_export, export_response
+from academics.jobs import enqueue_job
+from academics.reports import generate_report_cards
 from academics.models import (
     AcademicYear,
+    ArchivedMark,
     Assignment,
+    BackgroundJob,
     ClassOffering,
     Enrollment,
     Exam,
@@ -11,13 +27,115 @@ from academics.models import (
     PromotionRecord,
     Subject,
 )
+from config.timeouts import is_statement_timeout, statement_timeout
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for very large tables. An unfiltered PostgreSQL changelist uses the planner's row
+    estimate (pg_class.reltuples) instead of COUNT(*) once the table passes ESTIMATE_THRESHOLD;
+    filtered lists and other backends keep the exact count.
+    """
+
+    ESTIMATE_THRESHOLD = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.ESTIMATE_THRESHOLD:
+                return row[0]
+        return super().count
+
+
+class ProjectedChangeList(ChangeList):
+    """Loads only `list_only` columns for the rows on the page; actions still get full querysets."""
+
+    def get_results(self, request):
+        if self.model_admin.list_only:
+            self.queryset = self.queryset.only(*self.model_admin.list_only)
+        super().get_results(request)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist defaults for tables that grow into the hundreds of thousands of rows."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ("-id",)
+    list_only = ()
+
+    changelist_statement_timeout = 15000
+
+    def get_changelist(self, request, **kwargs):
+        return ProjectedChangeList
+
+    def changelist_view(self, request, extra_context=None):
+        try:
+            with statement_timeout(self.changelist_statement_timeout):
+                response = super().changelist_view(request, extra_context)
+                # The changelist queries run while the template renders.
+                if hasattr(response, "render"):
+                    response.render()
+        except OperationalError as exc:
+            if not is_statement_timeout(exc) or not request.GET:
+                raise
+            self.message_user(request, "That filter took too long and was cancelled; narrow it down.", messages.ERROR)
+            return HttpResponseRedirect(request.path)
+        return response
+
+
+class BackgroundActionsMixin:
+    """Admin actions that hand the selection to academics.jobs and return immediately."""
+
+    job_scope = ""
+
+    def queue_job(self, request, name, params):
+        job = enqueue_job(name, params=params, user=request.user)
+        url = reverse("admin:academics_backgroundjob_change", args=[job.pk])
+        self.message_user(request, format_html('Queued {} as <a href="{}">job #{}</a>.', name, url, job.pk))
+
+    def selection(self, queryset):
+        return {self.job_scope: list(queryset.values_list("pk", flat=True))}
+
+    @admin.action(description="Recompute grades (background)")
+    def recompute_grades_in_background(self, request, queryset):
+        self.queue_job(request, "recompute_grades", self.selection(queryset))
+
+    @admin.action(description="Export marks to CSV (background)")
+    def export_marks_in_background(self, request, queryset):
+        params = {**self.selection(queryset), "filename": f"{self.model._meta.model_name}-marks"}
+        self.queue_job(request, "export_marks", params)
 
 
 @admin.register(AcademicYear)
-class AcademicYearAdmin(admin.ModelAdmin):
-    list_display = ("id", "year", "start_date", "end_date", "is_current")
-    list_filter = ("is_current",)
+class AcademicYearAdmin(BackgroundActionsMixin, admin.ModelAdmin):
+    list_display = ("id", "year", "start_date", "end_date", "is_current", "is_archived")
+    list_filter = ("is_current", "is_archived")
     search_fields = ("year",)
+    readonly_fields = ("is_archived", "archived_at")
+    job_scope = "academic_year_ids"
+    actions = ("archive_in_background", "freeze_history_in_background")
+
+    @admin.action(description="Close and archive selected years (background)")
+    def archive_in_background(self, request, queryset):
+        open_years = [year for year in queryset if not year.is_closed]
+        if open_years:
+            names = ", ".join(year.year for year in open_years)
+            self.message_user(request, f"Skipped {names}: only years that have ended can be archived.", messages.WARNING)
+        closed = queryset.exclude(pk__in=[year.pk for year in open_years])
+        if closed.exists():
+            self.queue_job(request, "archive_years", self.selection(closed))
+
+    @admin.action(description="Refresh frozen student history (background)")
+    def freeze_history_in_background(self, request, queryset):
+        self.queue_job(request, "freeze_history", self.selection(queryset))
 
 
 @admin.register(Subject)
@@ -27,10 +145,17 @@ class SubjectAdmin(admin.ModelAdmin):
 
 
 @admin.register(ClassOffering)
-class ClassOfferingAdmin(admin.ModelAdmin):
+class ClassOfferingAdmin(BackgroundActionsMixin, admin.ModelAdmin):
     list_display = ("id", "name", "level", "academic_year")
     list_filter = ("academic_year",)
     search_fields = ("name", "level")
+    job_scope = "class_offering_ids"
+    actions = ("recompute_grades_in_background", "export_marks_in_background", "promote_in_background")
+
+    @admin.action(description="Promote selected classes (background)")
+    def promote_in_background(self, request, queryset):
+        params = {**self.selection(queryset), "user_id": request.user.pk}
+        self.queue_job(request, "promote_classes", params)
 
 
 @admin.register(Assignment)
@@ -41,7 +166,7 @@ class AssignmentAdmin(admin.ModelAdmin):
 
 
 @admin.register(Enrollment)
-class EnrollmentAdmin(admin.ModelAdmin):
+class EnrollmentAdmin(BackgroundActionsMixin, LargeTableAdmin):
     list_display = (
         "id",
         "student",
@@ -51,28 +176,186 @@ class EnrollmentAdmin(admin.ModelAdmin):
         "roll_number",
         "grade",
     )
-    list_filter = ("academic_year", "class_offering")
+    list_select_related = ("student__user", "academic_year", "class_offering__academic_year")
+    list_only = (
+        "id",
+        "roll_number",
+        "grade",
+        "student__full_name",
+        "student__student_id",
+        "student__user__username",
+        "academic_year__year",
+        "class_offering__name",
+        "class_offering__academic_year__year",
+    )
+    list_filter = ("academic_year", "class_offering__level", "grade")
     search_fields = ("student__user__username", "student__full_name", "student__student_id", "roll_number")
+    autocomplete_fields = ("student", "academic_year", "class_offering")
+
+    job_scope = "enrollment_ids"
+    actions = (
+        "export_marks_csv",
+        "download_report_cards",
+        "recompute_grades_in_background",
+        "export_marks_in_background",
+    )
 
     @admin.display(description="Student ID")
     def student_id_display(self, obj):
         return getattr(obj.student, "student_id", None)
 
+    @admin.action(description="Export marks of selected enrollments (CSV)")
+    def export_marks_csv(self, request, queryset):
+        return export_response(
+            enrollment_marks_export(queryset.values("pk")), export_format="csv", filename="enrollment-marks"
+        )
+
+    @admin.action(description="Download report cards for selected enrollments (zip)")
+    def download_report_cards(self, request, queryset):
+        buffer = io.BytesIO()
+        # Rendered inside the web worker, so no process pool (IMPORT_WEB_WORKERS, as in the staff views).
+        generate_report_cards(queryset, buffer, workers=settings.IMPORT_WEB_WORKERS)
+        response = HttpResponse(buffer.getvalue(), content_type="application/zip")
+        response["Content-Disposition"] = 'attachment; filename="report-cards.zip"'
+        return response
+
 
 @admin.register(Exam)
-class ExamAdmin(admin.ModelAdmin):
+class ExamAdmin(BackgroundActionsMixin, LargeTableAdmin):
     list_display = ("id", "title", "academic_year", "assignment", "date", "status", "max_marks", "created_by")
+    list_select_related = (
+        "academic_year",
+        "assignment__class_offering__academic_year",
+        "assignment__subject",
+        "created_by__user",
+    )
     list_filter = ("academic_year", "status", "assignment__subject")
     search_fields = ("title", "assignment__class_offering__name", "assignment__subject__name")
     date_hierarchy = "date"
+    ordering = ("-date", "-id")
+    autocomplete_fields = ("assignment", "academic_year", "created_by")
+    job_scope = "exam_ids"
+    actions = ("export_roster_csv", "recompute_grades_in_background", "export_marks_in_background")
+
+    @admin.action(description="Export rosters of selected exams (CSV)")
+    def export_roster_csv(self, request, queryset):
+        exams = list(queryset.select_related("assignment").order_by("date", "id"))
+        return export_response(exam_roster_export(exams), export_format="csv", filename="exam-rosters")
 
 
 @admin.register(Mark)
-class MarkAdmin(admin.ModelAdmin):
-    list_display = ("id", "exam", "enrollment", "marks_obtained")
-    list_filter = ("exam",)
+class MarkAdmin(LargeTableAdmin):
+    list_display = ("id", "exam", "student_display", "class_display", "marks_obtained")
+    list_select_related = ("exam", "enrollment__student__user", "enrollment__class_offering__academic_year")
+    list_only = (
+        "id",
+        "marks_obtained",
+        "exam__title",
+        "enrollment__student__full_name",
+        "enrollment__student__user__username",
+        "enrollment__class_offering__name",
+        "enrollment__class_offering__academic_year__year",
+    )
+    # Filtering by exam rendered every exam ever created; year and subject lists stay small.
+    list_filter = ("exam__academic_year", "exam__assignment__subject")
+    search_fields = ("exam__title", "enrollment__student__user__username")
+    autocomplete_fields = ("exam", "enrollment")
+
+    @admin.display(description="Student")
+    def student_display(self, obj):
+        return obj.enrollment.student
+
+    @admin.display(description="Class")
+    def class_display(self, obj):
+        return obj.enrollment.class_offering
+
+
+@admin.register(ArchivedMark)
+class ArchivedMarkAdmin(LargeTableAdmin):
+    """Marks of closed years; rows are written only by academics.archive."""
+
+    list_display = ("id", "exam", "enrollment", "academic_year", "marks_obtained", "archived_at")
+    list_select_related = ("exam", "enrollment__student__user", "academic_year")
+    list_only = (
+        "id",
+        "marks_obtained",
+        "archived_at",
+        "exam__title",
+        "enrollment__student__full_name",
+        "enrollment__student__user__username",
+        "academic_year__year",
+    )
+    list_filter = ("academic_year",)
     search_fields = ("exam__title", "enrollment__student__user__username")
 
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    """Status page for queued admin work: read-only rows, progress, results and the CSV download."""
+
+    list_display = ("id", "name", "status", "progress_display", "created_by", "created_at", "finished_at", "download")
+    list_filter = ("status", "name")
+    list_select_related = ("created_by",)
+    fields = (
+        "name",
+        "status",
+        "progress_display",
+        "params",
+        "result",
+        "error",
+        "download",
+        "created_by",
+        "created_at",
+        "attempts",
+        "run_after",
+        "locked_by",
+        "started_at",
+        "finished_at",
+    )
+    readonly_fields = fields
+
+    @admin.display(description="Progress")
+    def progress_display(self, obj):
+        return f"{obj.progress}/{obj.total}" if obj.total is not None else str(obj.progress)
+
+    @admin.display(description="Output")
+    def download(self, obj):
+        if not obj.output_name:
+            return "-"
+        url = reverse("admin:academics_backgroundjob_download", args=[obj.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.output_name)
+
+    def get_urls(self):
+        download = path(
+            "<int:job_id>/download/",
+            self.admin_site.admin_view(self.download_view),
+            name="academics_backgroundjob_download",
+        )
+        return [download, *super().get_urls()]
+
+    def download_view(self, request, job_id):
+        job = get_object_or_404(BackgroundJob, pk=job_id)
+        if not self.has_view_permission(request, job) or not job.output_name:
+            raise Http404
+        response = HttpResponse(job.output, content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="{job.output_name}"'
+        return response
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(PromotionRecord)
 class PromotionRecordAdmin(admin.ModelAdmin):
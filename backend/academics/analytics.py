@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import statistics
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import (
+    Aggregate,
+    Avg,
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    IntegerField,
+    Max,
+    Min,
+    Q,
+    QuerySet,
+    StdDev,
+)
+from django.db.models.functions import Least
+
+from config.timeouts import statement_timeout
+
+from .models import PASS_PERCENT, Assignment, Exam
+
+
+HISTOGRAM_BUCKETS = 10
+PERCENTILES = (25, 50, 75, 90)
+
+# Cache misses aggregate a whole exam or assignment, so they get more than the calling view's budget.
+ANALYTICS_STATEMENT_TIMEOUT_MS = 15000
+
+
+class PercentileCont(Aggregate):
+    """PostgreSQL ordered-set aggregate: PERCENTILE_CONT(fraction) WITHIN GROUP (ORDER BY expr)."""
+
+    function = "PERCENTILE_CONT"
+    template = "%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, fraction: float, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+def _percent_expression():
+    return ExpressionWrapper(F("marks_obtained") * 100.0 / F("exam__max_marks"), output_field=FloatField())
+
+
+def _bucket_expression():
+    # Integer division floors non-negative values on every backend; a full score joins the top bucket.
+    bucket = ExpressionWrapper(F("marks_obtained") * HISTOGRAM_BUCKETS / F("exam__max_marks"), output_field=IntegerField())
+    return Least(bucket, HISTOGRAM_BUCKETS - 1)
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+def _fallback_percentiles(marks: QuerySet) -> dict:
+    """`marks` must already carry the `percent` annotation."""
+    values = list(marks.order_by("percent").values_list("percent", flat=True))
+    if not values:
+        return {f"p{p}": None for p in PERCENTILES}
+    if len(values) == 1:
+        return {f"p{p}": values[0] for p in PERCENTILES}
+    # "inclusive" interpolates between closest ranks exactly like PERCENTILE_CONT.
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {f"p{p}": cuts[p - 1] for p in PERCENTILES}
+
+
+def summarize_marks(marks: QuerySet) -> dict:
+    """
+    Score distribution for a set of marks, expressed as percent of each exam's maximum.
+    Aggregates run in the database; percentiles use PERCENTILE_CONT on PostgreSQL and a sorted
+    single-column fetch elsewhere.
+    """
+    marks = marks.annotate(percent=_percent_expression())
+    aggregates = {
+        "count": Count("id"),
+        "mean": Avg("percent"),
+        "std_dev": StdDev("percent"),
+        "minimum": Min("percent"),
+        "maximum": Max("percent"),
+        "passed": Count("id", filter=Q(percent__gte=PASS_PERCENT)),
+    }
+    use_database_percentiles = connections[marks.db].vendor == "postgresql"
+    if use_database_percentiles:
+        aggregates.update({f"p{p}": PercentileCont("percent", p / 100) for p in PERCENTILES})
+    summary = marks.aggregate(**aggregates)
+    if not use_database_percentiles:
+        summary.update(_fallback_percentiles(marks))
+
+    counts = dict(
+        marks.annotate(bucket=_bucket_expression()).values("bucket").annotate(n=Count("id")).values_list("bucket", "n")
+    )
+    width = 100 // HISTOGRAM_BUCKETS
+    histogram = [
+        {"range_start": bucket * width, "range_end": (bucket + 1) * width, "count": counts.get(bucket, 0)}
+        for bucket in range(HISTOGRAM_BUCKETS)
+    ]
+
+    count = summary["count"]
+    return {
+        "count": count,
+        "mean": _round(summary["mean"]),
+        "median": _round(summary["p50"]),
+        "std_dev": _round(summary["std_dev"]),
+        "minimum": _round(summary["minimum"]),
+        "maximum": _round(summary["maximum"]),
+        "percentiles": {key: _round(summary[key]) for key in (f"p{p}" for p in PERCENTILES)},
+        "pass_threshold": PASS_PERCENT,
+        "passed": summary["passed"],
+        "pass_rate": _round(summary["passed"] * 100 / count) if count else None,
+        "histogram": histogram,
+    }
+
+
+def _exam_cache_key(exam_id: int) -> str:
+    return f"academics:analytics:exam:{exam_id}"
+
+
+def _assignment_cache_key(assignment_id: int) -> str:
+    return f"academics:analytics:assignment:{assignment_id}"
+
+
+@statement_timeout(ANALYTICS_STATEMENT_TIMEOUT_MS)
+def get_exam_analytics(exam: Exam) -> dict:
+    def build():
+        marks = exam.academic_year.marks_model.objects.filter(exam=exam)
+        return {"exam_id": exam.id, "max_marks": exam.max_marks, **summarize_marks(marks)}
+
+    return cache.get_or_set(_exam_cache_key(exam.id), build, settings.ANALYTICS_CACHE_SECONDS)
+
+
+@statement_timeout(ANALYTICS_STATEMENT_TIMEOUT_MS)
+def get_assignment_analytics(assignment: Assignment) -> dict:
+    def build():
+        marks = assignment.academic_year.marks_model.objects.filter(exam__assignment=assignment)
+        exams: List[dict] = [
+            {
+                "exam_id": row["exam_id"],
+                "title": row["exam__title"],
+                "date": row["exam__date"],
+                "count": row["count"],
+                "mean": _round(row["mean"]),
+                "pass_rate": _round(row["passed"] * 100 / row["count"]) if row["count"] else None,
+            }
+            for row in marks.annotate(percent=_percent_expression())
+            .values("exam_id", "exam__title", "exam__date")
+            .annotate(count=Count("id"), mean=Avg("percent"), passed=Count("id", filter=Q(percent__gte=PASS_PERCENT)))
+            .order_by("exam__date", "exam_id")
+        ]
+        return {"assignment_id": assignment.id, **summarize_marks(marks), "exams": exams}
+
+    return cache.get_or_set(_assignment_cache_key(assignment.id), build, settings.ANALYTICS_CACHE_SECONDS)
+
+
+def invalidate_exam_analytics(exam_id: int, assignment_id: Optional[int] = None):
+    if assignment_id is None:
+        assignment_id = Exam.objects.filter(pk=exam_id).values_list("assignment_id", flat=True).first()
+    keys = [_exam_cache_key(exam_id)]
+    if assignment_id is not None:
+        keys.append(_assignment_cache_key(assignment_id))
+    cache.delete_many(keys)
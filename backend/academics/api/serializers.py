@@ -30,6 +30,8 @@ class EnrollmentSerializer(serializers.Serializer):
     roll_number = serializers.IntegerField(allow_null=True, required=False)
     student_id = serializers.CharField(allow_null=True)
     grade = serializers.CharField(allow_null=True, required=False)
+    class_rank = serializers.IntegerField(allow_null=True, required=False)
+    class_size = serializers.IntegerField(allow_null=True, required=False)
 
 
 class UpcomingExamSerializer(serializers.Serializer):
@@ -48,6 +50,8 @@ class StudentMarkSerializer(serializers.Serializer):
     max_marks = serializers.IntegerField()
     highest_mark = serializers.IntegerField(required=False, allow_null=True)
     lowest_mark = serializers.IntegerField(required=False, allow_null=True)
+    rank = serializers.IntegerField(required=False, allow_null=True)
+    percentile = serializers.FloatField(required=False, allow_null=True)
 
 
 class StudentDashboardMarkSerializer(serializers.Serializer):
@@ -59,6 +63,8 @@ class StudentDashboardMarkSerializer(serializers.Serializer):
     max_marks = serializers.IntegerField()
     highest_mark = serializers.IntegerField(required=False, allow_null=True)
     lowest_mark = serializers.IntegerField(required=False, allow_null=True)
+    rank = serializers.IntegerField(required=False, allow_null=True)
+    percentile = serializers.FloatField(required=False, allow_null=True)
 
 
 class StudentHistorySubjectSerializer(serializers.Serializer):
@@ -110,6 +116,26 @@ class StudentDashboardSerializer(serializers.Serializer):
     history = PaginatedHistorySerializer()
 
 
+class TrendPointSerializer(serializers.Serializer):
+    academic_year = serializers.CharField()
+    percent = serializers.FloatField(allow_null=True)
+    grade = serializers.CharField(allow_null=True)
+    delta = serializers.FloatField(allow_null=True)
+
+
+class SubjectTrendSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    code = serializers.CharField(allow_null=True, required=False)
+    series = TrendPointSerializer(many=True)
+
+
+class StudentTrendsSerializer(serializers.Serializer):
+    years = serializers.ListField(child=serializers.CharField())
+    overall = TrendPointSerializer(many=True)
+    subjects = SubjectTrendSerializer(many=True)
+
+
 class TeacherProfileSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     user_id = serializers.IntegerField()
@@ -124,6 +150,9 @@ class AssignmentSummarySerializer(serializers.Serializer):
     class_offering = ClassOfferingSerializer()
     subject = SubjectSerializer()
     student_count = serializers.IntegerField()
+    exams_held = serializers.IntegerField()
+    exams_awaiting_marks = serializers.IntegerField()
+    class_average = serializers.FloatField(allow_null=True)
 
 
 class ExamSummarySerializer(serializers.Serializer):
@@ -133,11 +162,18 @@ class ExamSummarySerializer(serializers.Serializer):
     status = serializers.CharField(required=False)
 
 
+class ExamCountsSerializer(serializers.Serializer):
+    current = serializers.IntegerField()
+    past = serializers.IntegerField()
+    total = serializers.IntegerField()
+
+
 class TeacherDashboardSerializer(serializers.Serializer):
     teacher_profile = TeacherProfileSerializer()
     assignments = AssignmentSummarySerializer(many=True)
     current_exams = ExamSummarySerializer(many=True)
     past_exams = ExamSummarySerializer(many=True)
+    exam_counts = ExamCountsSerializer()
     subject_count = serializers.IntegerField()
     current_year = serializers.DictField(allow_null=True)
 
@@ -203,3 +239,113 @@ class MarksEntrySerializer(serializers.Serializer):
             if "student_enrollment_id" not in entry or "marks_obtained" not in entry:
                 raise serializers.ValidationError("Each mark entry requires student_enrollment_id and marks_obtained")
         return value
+
+
+class RosterImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    batch_size = serializers.IntegerField(min_value=1, max_value=5000, default=500)
+
+
+class ImportRowErrorSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    username = serializers.CharField(allow_blank=True, required=False)
+    errors = serializers.DictField(child=serializers.ListField(child=serializers.CharField()))
+
+
+class RosterImportReportSerializer(serializers.Serializer):
+    total_rows = serializers.IntegerField()
+    created = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    errors = ImportRowErrorSerializer(many=True)
+
+
+class TeacherImportSerializer(serializers.Serializer):
+    file = serializers.FileField(required=False)
+    rows = serializers.ListField(child=serializers.DictField(), required=False, allow_empty=False)
+    academic_year = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if bool(attrs.get("file")) == bool(attrs.get("rows")):
+            raise serializers.ValidationError("Provide either a CSV/JSON file or a rows list")
+        return attrs
+
+
+class TeacherImportReportSerializer(serializers.Serializer):
+    total_rows = serializers.IntegerField()
+    teachers_created = serializers.IntegerField()
+    assignments_created = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    errors = ImportRowErrorSerializer(many=True)
+
+
+class AssignmentCloneSerializer(serializers.Serializer):
+    source_year = serializers.CharField()
+    target_year = serializers.CharField()
+
+
+class AssignmentCloneSkipSerializer(serializers.Serializer):
+    class_level = serializers.CharField()
+    subject = serializers.CharField()
+    reason = serializers.CharField()
+
+
+class AssignmentCloneReportSerializer(serializers.Serializer):
+    source_year = serializers.CharField()
+    target_year = serializers.CharField()
+    created = serializers.IntegerField()
+    skipped = AssignmentCloneSkipSerializer(many=True)
+
+
+class MarksUploadSerializer(serializers.Serializer):
+    file = serializers.FileField()
+
+    def validate_file(self, value):
+        if not value.name.lower().endswith((".csv", ".xlsx")):
+            raise serializers.ValidationError("Upload a .csv or .xlsx file")
+        return value
+
+
+class MarksUploadReportSerializer(serializers.Serializer):
+    total_rows = serializers.IntegerField()
+    saved = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    errors = ImportRowErrorSerializer(many=True)
+
+
+class HistogramBucketSerializer(serializers.Serializer):
+    range_start = serializers.IntegerField()
+    range_end = serializers.IntegerField()
+    count = serializers.IntegerField()
+
+
+class MarksAnalyticsSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    mean = serializers.FloatField(allow_null=True)
+    median = serializers.FloatField(allow_null=True)
+    std_dev = serializers.FloatField(allow_null=True)
+    minimum = serializers.FloatField(allow_null=True)
+    maximum = serializers.FloatField(allow_null=True)
+    percentiles = serializers.DictField(child=serializers.FloatField(allow_null=True))
+    pass_threshold = serializers.IntegerField()
+    passed = serializers.IntegerField()
+    pass_rate = serializers.FloatField(allow_null=True)
+    histogram = HistogramBucketSerializer(many=True)
+
+
+class ExamAnalyticsSerializer(MarksAnalyticsSerializer):
+    exam_id = serializers.IntegerField()
+    max_marks = serializers.IntegerField()
+
+
+class AssignmentExamAnalyticsSerializer(serializers.Serializer):
+    exam_id = serializers.IntegerField()
+    title = serializers.CharField()
+    date = serializers.DateField()
+    count = serializers.IntegerField()
+    mean = serializers.FloatField(allow_null=True)
+    pass_rate = serializers.FloatField(allow_null=True)
+
+
+class AssignmentAnalyticsSerializer(MarksAnalyticsSerializer):
+    assignment_id = serializers.IntegerField()
+    exams = AssignmentExamAnalyticsSerializer(many=True)
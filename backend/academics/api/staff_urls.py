@@ -0,0 +1,23 @@
+from django.urls import path
+
+from academics.api.views import (
+    StaffAssignmentCloneView,
+    StaffClassMarksExportView,
+    StaffExamRosterExportView,
+    StaffRosterImportView,
+    StaffTeacherImportView,
+    StaffYearResultsExportView,
+)
+
+urlpatterns = [
+    path("roster-import/", StaffRosterImportView.as_view(), name="staff-roster-import"),
+    path("teacher-import/", StaffTeacherImportView.as_view(), name="staff-teacher-import"),
+    path("assignments/clone/", StaffAssignmentCloneView.as_view(), name="staff-assignment-clone"),
+    path("exports/exams/<int:exam_id>/roster/", StaffExamRosterExportView.as_view(), name="staff-export-exam-roster"),
+    path(
+        "exports/classes/<int:class_offering_id>/marks/",
+        StaffClassMarksExportView.as_view(),
+        name="staff-export-class-marks",
+    ),
+    path("exports/years/<str:year>/results/", StaffYearResultsExportView.as_view(), name="staff-export-year-results"),
+]
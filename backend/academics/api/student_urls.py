@@ -1,9 +1,19 @@
 from django.urls import path
 
-from academics.api.views import StudentDashboardView, StudentMarksView, UpcomingExamsView
+from academics.api.views import (
+    AsyncStudentDashboardView,
+    StudentDashboardView,
+    StudentEventsView,
+    StudentMarksView,
+    StudentTrendsView,
+    UpcomingExamsView,
+)
 
 urlpatterns = [
     path("dashboard/", StudentDashboardView.as_view(), name="student-dashboard"),
+    path("dashboard/async/", AsyncStudentDashboardView.as_view(), name="student-dashboard-async"),
     path("upcoming-exams/", UpcomingExamsView.as_view(), name="student-upcoming-exams"),
     path("marks/", StudentMarksView.as_view(), name="student-marks"),
+    path("trends/", StudentTrendsView.as_view(), name="student-trends"),
+    path("events/", StudentEventsView.as_view(), name="student-events"),
 ]
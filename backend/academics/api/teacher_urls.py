@@ -1,19 +1,31 @@
 from django.urls import path
 
 from academics.api.views import (
+    AsyncTeacherDashboardView,
+    TeacherAssignmentAnalyticsView,
     TeacherDashboardView,
+    TeacherExamAnalyticsView,
     TeacherExamDetailView,
     TeacherExamsView,
     TeacherMarksEntryView,
+    TeacherMarksUploadView,
     TeacherPastClassesView,
     TeacherClassExamsView,
 )
 
 urlpatterns = [
     path("dashboard/", TeacherDashboardView.as_view(), name="teacher-dashboard"),
+    path("dashboard/async/", AsyncTeacherDashboardView.as_view(), name="teacher-dashboard-async"),
     path("exams/", TeacherExamsView.as_view(), name="teacher-exams"),
     path("classes/", TeacherPastClassesView.as_view(), name="teacher-classes"),
     path("classes/<int:class_offering_id>/exams/", TeacherClassExamsView.as_view(), name="teacher-class-exams"),
     path("exams/<int:exam_id>/", TeacherExamDetailView.as_view(), name="teacher-exam-detail"),
     path("exams/<int:exam_id>/marks/", TeacherMarksEntryView.as_view(), name="teacher-exam-marks"),
+    path("exams/<int:exam_id>/marks/upload/", TeacherMarksUploadView.as_view(), name="teacher-exam-marks-upload"),
+    path("exams/<int:exam_id>/analytics/", TeacherExamAnalyticsView.as_view(), name="teacher-exam-analytics"),
+    path(
+        "assignments/<int:assignment_id>/analytics/",
+        TeacherAssignmentAnalyticsView.as_view(),
+        name="teacher-assignment-analytics",
+    ),
 ]
@@ -1,39 +1,80 @@
 import logging
+
+from asgiref.sync import sync_to_async
 from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema, inline_serializer
 
+from django.conf import settings
 from django.core.exceptions import PermissionDenied
-from django.db import models
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import status, serializers
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
 
-from authentication.api.permissions import IsStudent, IsTeacherOrAdmin
-from authentication.models import TeacherProfile
+from authentication.api.permissions import IsAdmin, IsStudent, IsTeacherOrAdmin
+from authentication.models import StudentProfile, TeacherProfile
+from config.async_support import AsyncAPIView
+from config.tenancy import QueryTokenJWTAuthentication
+from config.timeouts import StatementTimeoutMixin
 from academics.api.serializers import (
+    AssignmentAnalyticsSerializer,
+    AssignmentCloneReportSerializer,
+    AssignmentCloneSerializer,
     ExamCreateSerializer,
+    ExamAnalyticsSerializer,
     ExamDetailSerializer,
     MarksEntrySerializer,
+    MarksUploadReportSerializer,
+    MarksUploadSerializer,
+    RosterImportReportSerializer,
+    RosterImportSerializer,
     StudentDashboardSerializer,
     StudentDashboardMarkSerializer,
     StudentHistoryEntrySerializer,
     StudentMarkSerializer,
+    StudentTrendsSerializer,
     TeacherDashboardSerializer,
+    TeacherImportReportSerializer,
+    TeacherImportSerializer,
     TeacherExamListSerializer,
     TeacherPastClassSerializer,
     TeacherClassExamSerializer,
     UpcomingExamSerializer,
 )
-from academics.models import Assignment, Exam, Mark
+from academics.analytics import get_assignment_analytics, get_exam_analytics
+from academics.events import class_event_stream
+from academics.imports import (
+    clone_assignments,
+    import_exam_marks,
+    import_roster,
+    import_teachers,
+    iter_csv_rows,
+    iter_json_rows,
+)
+from academics.exports import (
+    EXPORT_FORMATS,
+    class_marks_export,
+    exam_roster_export,
+    export_response,
+    year_results_export,
+)
+from academics.models import AcademicYear, Assignment, ClassOffering, Exam, Mark
 from academics.services import (
     ServiceError,
+    _aget_enrollment,
     _get_enrollment,
-    can_edit_marks,
+    aget_student_dashboard,
+    aget_teacher_dashboard,
     create_exam,
-    get_exam_roster,
+    get_class_standing,
+    get_exam_roster_with_lock,
+    get_exam_standings,
     get_student_dashboard,
+    get_student_trends,
     get_teacher_dashboard,
     get_teacher_past_classes,
     list_teacher_exams,
@@ -80,8 +121,9 @@ def _get_teacher_for_request(request):
     return None
 
 
-class StudentDashboardView(APIView):
+class StudentDashboardView(StatementTimeoutMixin, APIView):
     permission_classes = [IsAuthenticated, IsStudent]
+    statement_timeout = 5000
 
     @extend_schema(
         parameters=[OpenApiParameter(name="year", type=str, required=False, description="Academic year filter (YYYY)")],
@@ -89,8 +131,9 @@ class StudentDashboardView(APIView):
     )
     def get(self, request):
         year = request.query_params.get("year")
-        dashboard = get_student_dashboard(request.user.student_profile, year)
+        return self.dashboard_response(request, get_student_dashboard(request.user.student_profile, year))
 
+    def dashboard_response(self, request, dashboard):
         def paginate_list(items, serializer_cls, paginator_cls):
             paginator = paginator_cls()
             page = paginator.paginate_queryset(items, request, view=self)
@@ -120,8 +163,64 @@ class StudentDashboardView(APIView):
         return Response(payload, status=status.HTTP_200_OK)
 
 
-class UpcomingExamsView(APIView):
+class AsyncStudentDashboardView(AsyncAPIView, StudentDashboardView):
+    """ASGI variant of StudentDashboardView: the dashboard sections are fetched concurrently."""
+
+    @extend_schema(
+        parameters=[OpenApiParameter(name="year", type=str, required=False, description="Academic year filter (YYYY)")],
+        responses=StudentDashboardSerializer,
+    )
+    async def get(self, request):
+        year = request.query_params.get("year")
+        student = await StudentProfile.objects.select_related("user").aget(user_id=request.user.pk)
+        dashboard = await aget_student_dashboard(student, year, statement_budget=self.statement_timeout)
+        return self.dashboard_response(request, dashboard)
+
+
+class StudentEventsView(AsyncAPIView):
+    """
+    Server-sent events for the student's current class ("exam_scheduled", "marks_published").
+    Clients refetch the dashboard or upcoming exams when an event arrives instead of polling.
+    """
+
+    authentication_classes = [QueryTokenJWTAuthentication]
+    permission_classes = [IsAuthenticated, IsStudent]
+
+    def perform_content_negotiation(self, request, force=False):
+        return super().perform_content_negotiation(request, force=True)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="access_token", type=str, required=False, description="JWT for clients without headers"),
+            OpenApiParameter(name="last_event_id", type=int, required=False, description="Resume after this event id"),
+        ],
+        responses={200: OpenApiResponse(description="text/event-stream of class events")},
+    )
+    async def get(self, request):
+        if not isinstance(request._request, ASGIRequest):
+            return Response({"error": "The event stream needs an ASGI server"}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        last_event_id = request.headers.get("Last-Event-ID") or request.query_params.get("last_event_id")
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            return Response({"error": "Last-Event-ID must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        student = await StudentProfile.objects.aget(user_id=request.user.pk)
+        enrollment = await _aget_enrollment(student)
+        if not enrollment:
+            return Response({"error": "No current enrollment"}, status=status.HTTP_404_NOT_FOUND)
+
+        response = StreamingHttpResponse(
+            class_event_stream(enrollment.class_offering_id, last_event_id), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # Stops nginx from buffering the stream.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class UpcomingExamsView(StatementTimeoutMixin, APIView):
     permission_classes = [IsAuthenticated, IsStudent]
+    statement_timeout = 5000
 
     @extend_schema(
         parameters=[OpenApiParameter(name="year", type=str, required=False, description="Academic year filter (YYYY)")],
@@ -141,8 +240,9 @@ class UpcomingExamsView(APIView):
         return Response({"results": serializer.data, "message": "Upcoming exams retrieved"}, status=status.HTTP_200_OK)
 
 
-class StudentMarksView(APIView):
+class StudentMarksView(StatementTimeoutMixin, APIView):
     permission_classes = [IsAuthenticated, IsStudent]
+    statement_timeout = 5000
     pagination_class = StudentMarksPagination
 
     @extend_schema(
@@ -152,7 +252,7 @@ class StudentMarksView(APIView):
     def get(self, request):
         enrollment = _get_enrollment(request.user.student_profile, request.query_params.get("year"))
         marks_qs = (
-            Mark.objects.filter(enrollment=enrollment)
+            enrollment.academic_year.marks_model.objects.filter(enrollment=enrollment)
             .select_related("exam__assignment__subject")
             .order_by("-exam__date")
             if enrollment
@@ -161,14 +261,7 @@ class StudentMarksView(APIView):
 
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(marks_qs, request)
-        exam_stats_map = {}
-        if page:
-            exam_stats = (
-                Mark.objects.filter(exam_id__in=[mark.exam_id for mark in page])
-                .values("exam_id")
-                .annotate(highest=models.Max("marks_obtained"), lowest=models.Min("marks_obtained"))
-            )
-            exam_stats_map = {row["exam_id"]: {"highest": row["highest"], "lowest": row["lowest"]} for row in exam_stats}
+        exam_stats_map = get_exam_standings(enrollment, [mark.exam_id for mark in page]) if page else {}
         results = [
             {
                 "exam": {"id": mark.exam.id, "title": mark.exam.title},
@@ -178,16 +271,30 @@ class StudentMarksView(APIView):
                 "max_marks": mark.exam.max_marks,
                 "highest_mark": exam_stats_map.get(mark.exam_id, {}).get("highest"),
                 "lowest_mark": exam_stats_map.get(mark.exam_id, {}).get("lowest"),
+                "rank": exam_stats_map.get(mark.exam_id, {}).get("rank"),
+                "percentile": exam_stats_map.get(mark.exam_id, {}).get("percentile"),
             }
             for mark in page
         ]
         serializer = StudentMarkSerializer(results, many=True)
         paginated = paginator.get_paginated_response(serializer.data)
+        paginated.data.update(get_class_standing(enrollment) if enrollment else {"class_rank": None, "class_size": None})
         paginated.data["message"] = "Marks retrieved"
         return paginated
 
 
-class TeacherDashboardView(APIView):
+class StudentTrendsView(StatementTimeoutMixin, APIView):
+    permission_classes = [IsAuthenticated, IsStudent]
+    statement_timeout = 5000
+
+    @extend_schema(responses=StudentTrendsSerializer)
+    def get(self, request):
+        payload = StudentTrendsSerializer(get_student_trends(request.user.student_profile)).data
+        payload["message"] = "Trends retrieved"
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class TeacherDashboardView(StatementTimeoutMixin, APIView):
     permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
 
     @extend_schema(responses=TeacherDashboardSerializer)
@@ -195,16 +302,31 @@ class TeacherDashboardView(APIView):
         teacher_profile = _get_teacher_for_request(request)
         if not teacher_profile:
             return Response({"error": "Teacher profile not found"}, status=status.HTTP_400_BAD_REQUEST)
+        return self.dashboard_response(get_teacher_dashboard(teacher_profile))
 
-        dashboard = get_teacher_dashboard(teacher_profile)
+    def dashboard_response(self, dashboard):
         serializer = TeacherDashboardSerializer(dashboard)
         payload = serializer.data
         payload["message"] = "Teacher dashboard retrieved"
         return Response(payload, status=status.HTTP_200_OK)
 
 
-class TeacherExamsView(APIView):
+class AsyncTeacherDashboardView(AsyncAPIView, TeacherDashboardView):
+    """ASGI variant of TeacherDashboardView: assignments and exam lists are fetched concurrently."""
+
+    @extend_schema(responses=TeacherDashboardSerializer)
+    async def get(self, request):
+        teacher_profile = await sync_to_async(_get_teacher_for_request)(request)
+        if not teacher_profile:
+            return Response({"error": "Teacher profile not found"}, status=status.HTTP_400_BAD_REQUEST)
+        teacher_profile = await TeacherProfile.objects.select_related("user").aget(pk=teacher_profile.pk)
+        dashboard = await aget_teacher_dashboard(teacher_profile, statement_budget=self.statement_timeout)
+        return self.dashboard_response(dashboard)
+
+
+class TeacherExamsView(StatementTimeoutMixin, APIView):
     permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
+    statement_timeout = 15000
     pagination_class = TeacherPagination
 
     @extend_schema(
@@ -278,8 +400,9 @@ class TeacherExamsView(APIView):
         )
 
 
-class TeacherPastClassesView(APIView):
+class TeacherPastClassesView(StatementTimeoutMixin, APIView):
     permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
+    statement_timeout = 15000
     pagination_class = TeacherPagination
 
     @extend_schema(responses=TeacherPastClassSerializer(many=True))
@@ -299,8 +422,9 @@ class TeacherPastClassesView(APIView):
         return Response({"results": serializer.data, "message": "Classes retrieved"}, status=status.HTTP_200_OK)
 
 
-class TeacherClassExamsView(APIView):
+class TeacherClassExamsView(StatementTimeoutMixin, APIView):
     permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
+    statement_timeout = 15000
     pagination_class = TeacherPagination
 
     @extend_schema(responses=TeacherClassExamSerializer(many=True))
@@ -332,7 +456,7 @@ class TeacherClassExamsView(APIView):
         return Response({"results": serializer.data, "message": "Exams retrieved"}, status=status.HTTP_200_OK)
 
 
-class TeacherExamDetailView(APIView):
+class TeacherExamDetailView(StatementTimeoutMixin, APIView):
     permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
 
     @extend_schema(responses=ExamDetailSerializer)
@@ -346,8 +470,7 @@ class TeacherExamDetailView(APIView):
         if not is_admin and (not teacher_profile or exam.assignment.teacher_id != teacher_profile.id):
             raise PermissionDenied("Not assigned to this class+subject")
 
-        roster = get_exam_roster(exam)
-        allow_edit = can_edit_marks(exam)
+        roster, allow_edit = get_exam_roster_with_lock(exam)
         payload = {
             "exam": {
                 "id": exam.id,
@@ -370,7 +493,7 @@ class TeacherExamDetailView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TeacherMarksEntryView(APIView):
+class TeacherMarksEntryView(StatementTimeoutMixin, APIView):
     permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
 
     @extend_schema(
@@ -396,3 +519,189 @@ class TeacherMarksEntryView(APIView):
             return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         logger.info("marks_saved", extra={"exam_id": exam.id, "count": saved_count})
         return Response({"saved": saved_count, "message": "Marks saved"}, status=status.HTTP_200_OK)
+
+
+class TeacherExamAnalyticsView(StatementTimeoutMixin, APIView):
+    permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
+
+    @extend_schema(responses=ExamAnalyticsSerializer)
+    def get(self, request, exam_id):
+        exam = get_object_or_404(Exam.objects.select_related("assignment"), id=exam_id)
+        teacher_profile = _get_teacher_for_request(request)
+        is_admin = request.user.is_staff or request.user.is_superuser
+        if not is_admin and (not teacher_profile or exam.assignment.teacher_id != teacher_profile.id):
+            raise PermissionDenied("Not assigned to this class+subject")
+
+        payload = ExamAnalyticsSerializer(get_exam_analytics(exam)).data
+        payload["message"] = "Exam analytics retrieved"
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class TeacherAssignmentAnalyticsView(StatementTimeoutMixin, APIView):
+    permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
+
+    @extend_schema(responses=AssignmentAnalyticsSerializer)
+    def get(self, request, assignment_id):
+        assignment = get_object_or_404(Assignment, id=assignment_id)
+        teacher_profile = _get_teacher_for_request(request)
+        is_admin = request.user.is_staff or request.user.is_superuser
+        if not is_admin and (not teacher_profile or assignment.teacher_id != teacher_profile.id):
+            raise PermissionDenied("Not assigned to this class+subject")
+
+        payload = AssignmentAnalyticsSerializer(get_assignment_analytics(assignment)).data
+        payload["message"] = "Assignment analytics retrieved"
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class TeacherMarksUploadView(StatementTimeoutMixin, APIView):
+    permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
+    statement_timeout = 30000
+    parser_classes = [MultiPartParser, FormParser]
+
+    @extend_schema(request=MarksUploadSerializer, responses=MarksUploadReportSerializer)
+    def post(self, request, exam_id):
+        exam = get_object_or_404(
+            Exam.objects.select_related("assignment__class_offering", "assignment__subject", "academic_year"),
+            id=exam_id,
+        )
+        teacher_profile = _get_teacher_for_request(request)
+        is_admin = request.user.is_staff or request.user.is_superuser
+        if not is_admin and (not teacher_profile or exam.assignment.teacher_id != teacher_profile.id):
+            raise PermissionDenied("Not assigned to this class+subject")
+
+        serializer = MarksUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["file"]
+
+        try:
+            report = import_exam_marks(exam, upload, filename=upload.name, actor=teacher_profile, is_admin=is_admin)
+        except ServiceError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        payload = MarksUploadReportSerializer(report).data
+        if report["failed"] or not report["saved"]:
+            payload["error"] = "Marks file has invalid rows" if report["failed"] else "Marks file has no rows"
+            return Response(payload, status=status.HTTP_400_BAD_REQUEST)
+        logger.info("marks_uploaded", extra={"exam_id": exam.id, "count": report["saved"]})
+        payload["message"] = "Marks saved"
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class StaffRosterImportView(StatementTimeoutMixin, APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+    statement_timeout = 30000
+    parser_classes = [MultiPartParser, FormParser]
+
+    @extend_schema(request=RosterImportSerializer, responses=RosterImportReportSerializer)
+    def post(self, request):
+        serializer = RosterImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            report = import_roster(
+                serializer.validated_data["file"],
+                batch_size=serializer.validated_data["batch_size"],
+                # Hashing processes would be forked from a threaded web worker holding DB connections.
+                workers=settings.IMPORT_WEB_WORKERS,
+            )
+        except ServiceError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info("roster_imported", extra={"created_count": report["created"], "failed_count": report["failed"]})
+        payload = RosterImportReportSerializer(report).data
+        payload["message"] = "Roster imported"
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class StaffTeacherImportView(StatementTimeoutMixin, APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+    statement_timeout = 30000
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+
+    @extend_schema(request=TeacherImportSerializer, responses=TeacherImportReportSerializer)
+    def post(self, request):
+        serializer = TeacherImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data.get("file")
+
+        try:
+            if upload is None:
+                rows = iter_json_rows(serializer.validated_data["rows"])
+            elif upload.name.lower().endswith(".json"):
+                rows = iter_json_rows(upload)
+            else:
+                rows = iter_csv_rows(upload)
+            report = import_teachers(
+                rows, year=serializer.validated_data.get("academic_year"), workers=settings.IMPORT_WEB_WORKERS
+            )
+        except ServiceError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info(
+            "teachers_imported",
+            extra={"teachers_created": report["teachers_created"], "assignments_created": report["assignments_created"]},
+        )
+        payload = TeacherImportReportSerializer(report).data
+        payload["message"] = "Teachers imported"
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class StaffAssignmentCloneView(StatementTimeoutMixin, APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    @extend_schema(request=AssignmentCloneSerializer, responses=AssignmentCloneReportSerializer)
+    def post(self, request):
+        serializer = AssignmentCloneSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            report = clone_assignments(**serializer.validated_data)
+        except ServiceError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info("assignments_cloned", extra={"target_year": report["target_year"], "created_count": report["created"]})
+        payload = AssignmentCloneReportSerializer(report).data
+        payload["message"] = "Assignments cloned"
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+EXPORT_FORMAT_PARAMETER = OpenApiParameter(
+    name="export_format", type=str, required=False, enum=list(EXPORT_FORMATS), description="csv (default) or ndjson"
+)
+
+
+class StaffExportView(StatementTimeoutMixin, APIView):
+    """Base for streaming exports; the body is CSV/NDJSON regardless of the Accept header."""
+
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def perform_content_negotiation(self, request, force=False):
+        return super().perform_content_negotiation(request, force=True)
+
+    def export(self, request, export, filename):
+        export_format = request.query_params.get("export_format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return Response({"error": "export_format must be csv or ndjson"}, status=status.HTTP_400_BAD_REQUEST)
+        return export_response(export, export_format=export_format, filename=filename)
+
+
+class StaffExamRosterExportView(StaffExportView):
+    @extend_schema(parameters=[EXPORT_FORMAT_PARAMETER], responses={200: OpenApiResponse(description="Streamed roster")})
+    def get(self, request, exam_id):
+        exam = get_object_or_404(Exam, id=exam_id)
+        return self.export(request, exam_roster_export([exam]), f"exam-{exam.id}-roster")
+
+
+class StaffClassMarksExportView(StaffExportView):
+    @extend_schema(parameters=[EXPORT_FORMAT_PARAMETER], responses={200: OpenApiResponse(description="Streamed marks")})
+    def get(self, request, class_offering_id):
+        class_offering = get_object_or_404(ClassOffering.objects.select_related("academic_year"), id=class_offering_id)
+        filename = f"{class_offering.academic_year.year}-class-{class_offering.level}-marks"
+        return self.export(request, class_marks_export(class_offering), filename)
+
+
+class StaffYearResultsExportView(StaffExportView):
+    @extend_schema(parameters=[EXPORT_FORMAT_PARAMETER], responses={200: OpenApiResponse(description="Streamed results")})
+    def get(self, request, year):
+        academic_year = get_object_or_404(AcademicYear, year=year)
+        return self.export(request, year_results_export(academic_year), f"{academic_year.year}-results")
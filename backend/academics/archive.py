@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import logging
+
+from django.db import connections, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from config.tenancy import tenant_database
+
+from .models import (
+    AcademicYear,
+    ArchivedMark,
+    Enrollment,
+    EnrollmentHistorySnapshot,
+    EnrollmentSubjectSummary,
+    Exam,
+    Mark,
+)
+from .services import ServiceError, _grade_from_percent, invalidate_student_trends
+
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_BATCH_SIZE = 1000
+SNAPSHOT_BATCH_SIZE = 500
+
+
+def _copy_marks_sql() -> str:
+    archived = ArchivedMark._meta.db_table
+    return (
+        f"INSERT INTO {archived} "
+        "(exam_id, enrollment_id, academic_year_id, marks_obtained, created_at, updated_at, archived_at) "
+        "SELECT m.exam_id, m.enrollment_id, e.academic_year_id, m.marks_obtained, m.created_at, m.updated_at, %s "
+        f"FROM {Mark._meta.db_table} m INNER JOIN {Exam._meta.db_table} e ON e.id = m.exam_id "
+        "WHERE e.academic_year_id = %s"
+    )
+
+
+def _delete_marks_sql() -> str:
+    return (
+        f"DELETE FROM {Mark._meta.db_table} "
+        f"WHERE exam_id IN (SELECT id FROM {Exam._meta.db_table} WHERE academic_year_id = %s)"
+    )
+
+
+def _percent(scored, possible):
+    return round((scored / possible) * 100, 2) if possible else None
+
+
+def freeze_history_snapshots(academic_year: AcademicYear) -> int:
+    """
+    Write one pre-rendered dashboard history entry per enrollment of a closed year.
+    Existing snapshots for the year are replaced, so the step can be re-run after an admin corrects data.
+    """
+    if academic_year.is_current:
+        raise ServiceError("History for the current academic year cannot be frozen.")
+    if not academic_year.is_closed:
+        raise ServiceError(f"Academic year {academic_year.year} has not ended yet; its history cannot be frozen.")
+
+    subjects = {}
+    totals = (
+        academic_year.marks_model.objects.filter(enrollment__academic_year=academic_year)
+        .values(
+            "enrollment_id",
+            "exam__assignment__subject_id",
+            "exam__assignment__subject__name",
+            "exam__assignment__subject__code",
+        )
+        .annotate(exams=Count("pk"), scored=Sum("marks_obtained"), possible=Sum("exam__max_marks"))
+        .order_by("exam__assignment__subject__name")
+    )
+    for row in totals:
+        subjects.setdefault(row["enrollment_id"], []).append(row)
+
+    now = timezone.now()
+    snapshots = []
+    enrollments = Enrollment.objects.filter(academic_year=academic_year).select_related("class_offering")
+    for enrollment in enrollments.order_by("pk"):
+        rows = subjects.get(enrollment.pk, [])
+        overall_percent = _percent(sum(row["scored"] for row in rows), sum(row["possible"] for row in rows))
+        payload = {
+            "academic_year": academic_year.year,
+            "class_name": enrollment.class_offering.name,
+            "roll_number": enrollment.roll_number,
+            "total_exams": sum(row["exams"] for row in rows),
+            "overall_percent": overall_percent,
+            "overall_grade": enrollment.grade or _grade_from_percent(overall_percent),
+            "subjects": [
+                {
+                    "id": row["exam__assignment__subject_id"],
+                    "name": row["exam__assignment__subject__name"],
+                    "code": row["exam__assignment__subject__code"],
+                    "percent": _percent(row["scored"], row["possible"]),
+                    "grade": _grade_from_percent(_percent(row["scored"], row["possible"])),
+                }
+                for row in rows
+            ],
+        }
+        snapshots.append(
+            EnrollmentHistorySnapshot(
+                enrollment=enrollment,
+                student_id=enrollment.student_id,
+                academic_year=academic_year,
+                year_start=academic_year.start_date,
+                payload=payload,
+                frozen_at=now,
+            )
+        )
+
+    student_ids = [snapshot.student_id for snapshot in snapshots]
+    with transaction.atomic(using=tenant_database()):
+        EnrollmentHistorySnapshot.objects.filter(academic_year=academic_year).delete()
+        EnrollmentHistorySnapshot.objects.bulk_create(snapshots, batch_size=SNAPSHOT_BATCH_SIZE)
+        # Corrected data has to reach the trends endpoint, which caches closed years without expiry.
+        transaction.on_commit(
+            lambda: invalidate_student_trends(student_ids, academic_year.year), using=tenant_database()
+        )
+    logger.info("history_snapshots_frozen", extra={"academic_year": academic_year.year, "snapshots": len(snapshots)})
+    return len(snapshots)
+
+
+def close_academic_year(academic_year: AcademicYear) -> dict:
+    """
+    Move a finished year's marks from Mark into ArchivedMark and leave per-subject summaries behind.
+    Runs in one transaction with set-based INSERT ... SELECT / DELETE statements, so the copy does
+    not round-trip rows through Python and per-row Mark signals do not fire. History snapshots are
+    frozen in the same transaction.
+    """
+    if academic_year.is_current:
+        raise ServiceError("The current academic year cannot be archived.")
+    if not academic_year.is_closed:
+        raise ServiceError(f"Academic year {academic_year.year} has not ended yet and cannot be archived.")
+    if academic_year.is_archived:
+        raise ServiceError(f"Academic year {academic_year.year} is already archived.")
+
+    now = timezone.now()
+    with transaction.atomic(using=tenant_database()):
+        totals = (
+            Mark.objects.filter(exam__academic_year=academic_year)
+            .values("enrollment_id", "exam__assignment__subject_id")
+            .annotate(exams_taken=Count("pk"), scored=Sum("marks_obtained"), possible=Sum("exam__max_marks"))
+            .order_by()
+        )
+        summaries = EnrollmentSubjectSummary.objects.bulk_create(
+            (
+                EnrollmentSubjectSummary(
+                    enrollment_id=row["enrollment_id"],
+                    academic_year=academic_year,
+                    subject_id=row["exam__assignment__subject_id"],
+                    exams_taken=row["exams_taken"],
+                    scored=row["scored"],
+                    possible=row["possible"],
+                )
+                for row in totals
+            ),
+            batch_size=SUMMARY_BATCH_SIZE,
+        )
+        with connections[tenant_database()].cursor() as cursor:
+            cursor.execute(_copy_marks_sql(), [now, academic_year.pk])
+            archived = cursor.rowcount
+            cursor.execute(_delete_marks_sql(), [academic_year.pk])
+        AcademicYear.objects.filter(pk=academic_year.pk).update(is_archived=True, archived_at=now, updated_at=now)
+        academic_year.is_archived = True
+        academic_year.archived_at = now
+        snapshots = freeze_history_snapshots(academic_year)
+
+    result = {
+        "academic_year": academic_year.year,
+        "marks_archived": archived,
+        "summaries": len(summaries),
+        "snapshots": snapshots,
+    }
+    logger.info("academic_year_archived", extra=result)
+    return result
@@ -0,0 +1,35 @@
+from config.backfill import Backfill, register
+
+
+# Frozen copy of the levels 0004_seed_class_offerings was written against; models.ALLOWED_CLASS_LEVELS may move on.
+SEEDED_CLASS_LEVELS = ["6", "7", "8", "9", "10"]
+
+
+@register
+class SeedClassOfferings(Backfill):
+    """Ensure every academic year has a canonically named offering for each class level."""
+
+    name = "seed_class_offerings"
+    model = "academics.AcademicYear"
+    batch_size = 50
+
+    def process_batch(self, apps, using, rows):
+        ClassOffering = apps.get_model("academics", "ClassOffering")
+        offerings = ClassOffering._default_manager.using(using)
+        existing = {
+            (offering.academic_year_id, offering.level): offering
+            for offering in offerings.filter(academic_year__in=rows, level__in=SEEDED_CLASS_LEVELS)
+        }
+        renamed, missing = [], []
+        for year in rows:
+            for level in SEEDED_CLASS_LEVELS:
+                name = f"Class {level}"
+                offering = existing.get((year.pk, level))
+                if offering is None:
+                    missing.append(ClassOffering(academic_year=year, name=name, level=level))
+                elif offering.name != name:
+                    offering.name = name
+                    renamed.append(offering)
+        # Bulk writes skip ClassOffering.save(), whose current-year check never applied to seeding.
+        offerings.bulk_update(renamed, ["name"])
+        offerings.bulk_create(missing)
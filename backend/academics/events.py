@@ -0,0 +1,114 @@
+"""
+Class change feed: "exam scheduled" and "marks published" events for each class offering.
+
+create_exam and save_marks call publish_class_event inside their transactions, so an event row
+exists exactly when the change has committed. Student streams (StudentEventsView) read the rows
+after the client's Last-Event-ID and refetch the dashboard only when something changed. Streams
+in the same process are woken as soon as the event commits. Streams in other processes see it on
+their next poll, every settings.SSE_POLL_SECONDS.
+
+Class offering ids repeat across schools, so listeners are keyed by (tenant, class offering). A
+stream keeps the tenant it was opened under: its body runs after the request's context is gone.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from config.tenancy import get_current_tenant, tenant_context, tenant_database
+
+from .models import ClassEvent, Exam
+
+
+# Client reconnect delay sent with every stream (EventSource "retry" field).
+RECONNECT_MS = 3000
+EVENT_BATCH_SIZE = 100
+
+ListenerKey = Tuple[Optional[str], int]
+
+_listeners: Dict[ListenerKey, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = defaultdict(set)
+_listeners_lock = threading.Lock()
+
+
+def publish_class_event(exam: Exam, kind: str) -> ClassEvent:
+    """Record `kind` for the exam's class; call inside the transaction that made the change."""
+    class_offering_id = exam.assignment.class_offering_id
+    event = ClassEvent.objects.create(
+        class_offering_id=class_offering_id,
+        kind=kind,
+        exam=exam,
+        payload={
+            "exam_id": exam.id,
+            "title": exam.title,
+            "subject": exam.assignment.subject.name,
+            "date": exam.date.isoformat(),
+        },
+    )
+    key = (get_current_tenant(), class_offering_id)
+    transaction.on_commit(lambda: _wake_listeners(key), using=tenant_database())
+    return event
+
+
+def _wake_listeners(key: ListenerKey):
+    with _listeners_lock:
+        listeners = list(_listeners.get(key, ()))
+    for loop, wake in listeners:
+        loop.call_soon_threadsafe(wake.set)
+
+
+def format_event(event: ClassEvent) -> str:
+    data = json.dumps({**event.payload, "class_offering_id": event.class_offering_id}, separators=(",", ":"))
+    return f"id: {event.id}\nevent: {event.kind}\ndata: {data}\n\n"
+
+
+def class_event_stream(class_offering_id: int, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+    """
+    Server-sent events for one class of the active tenant until settings.SSE_STREAM_SECONDS
+    elapse; the client then reconnects with Last-Event-ID. Without a last id the stream starts at
+    the newest event.
+    """
+    return _event_stream(get_current_tenant(), class_offering_id, last_event_id)
+
+
+async def _event_stream(tenant: Optional[str], class_offering_id: int, last_event_id: Optional[int]) -> AsyncIterator[str]:
+    loop = asyncio.get_running_loop()
+    key = (tenant, class_offering_id)
+    listener = (loop, asyncio.Event())
+    with _listeners_lock:
+        _listeners[key].add(listener)
+    try:
+        feed = ClassEvent.objects.filter(class_offering_id=class_offering_id).order_by("id")
+        if last_event_id is None:
+            with tenant_context(tenant):
+                last_event_id = (await feed.aaggregate(last=Max("id")))["last"] or 0
+        yield f"retry: {RECONNECT_MS}\n\n"
+
+        deadline = loop.time() + settings.SSE_STREAM_SECONDS
+        while (remaining := deadline - loop.time()) > 0:
+            # Cleared before reading so a commit that lands mid-query still wakes the next wait.
+            listener[1].clear()
+            with tenant_context(tenant):
+                events = [event async for event in feed.filter(id__gt=last_event_id)[:EVENT_BATCH_SIZE]]
+            for event in events:
+                last_event_id = event.id
+                yield format_event(event)
+            if len(events) == EVENT_BATCH_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(listener[1].wait(), timeout=min(settings.SSE_POLL_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle connection.
+                yield ": keepalive\n\n"
+    finally:
+        with _listeners_lock:
+            _listeners[key].discard(listener)
+            if not _listeners[key]:
+                del _listeners[key]
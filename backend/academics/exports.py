@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import csv
+import json
+from itertools import chain
+from typing import Iterable, Iterator, Sequence, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, IntegerField, QuerySet, Sum
+from django.db.models.functions import Cast
+from django.http import StreamingHttpResponse
+
+from .models import AcademicYear, ArchivedMark, ClassOffering, Enrollment, Exam, Mark
+from .services import exam_roster_queryset, student_name_expression
+
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+ROSTER_HEADER = ["exam_id", "exam_title", "roll_number", "student_id", "student_name", "marks_obtained", "max_marks"]
+MARKS_HEADER = [
+    "academic_year",
+    "class_name",
+    "roll_number",
+    "student_id",
+    "student_name",
+    "subject",
+    "exam_id",
+    "exam_title",
+    "exam_date",
+    "marks_obtained",
+    "max_marks",
+]
+RESULTS_HEADER = [
+    "academic_year",
+    "class_name",
+    "roll_number",
+    "student_id",
+    "student_name",
+    "exams_taken",
+    "total_scored",
+    "total_possible",
+    "percent",
+    "grade",
+]
+
+Export = Tuple[Sequence[str], Iterable[Sequence]]
+
+
+class _Echo:
+    """File-like object whose write() hands the formatted line back to the generator."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header: Sequence[str], rows: Iterable[Sequence]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(header: Sequence[str], rows: Iterable[Sequence]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def export_response(export: Export, *, export_format: str, filename: str) -> StreamingHttpResponse:
+    """Wrap an export in a StreamingHttpResponse so rows are written as the DB cursor yields them."""
+    header, rows = export
+    stream = stream_ndjson if export_format == "ndjson" else stream_csv
+    extension = "ndjson" if export_format == "ndjson" else "csv"
+    response = StreamingHttpResponse(stream(header, rows), content_type=EXPORT_FORMATS.get(export_format, "text/csv"))
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{extension}"'
+    return response
+
+
+def _exam_roster_rows(exam: Exam) -> Iterator[Sequence]:
+    rows = (
+        exam_roster_queryset(exam)
+        .values_list("roll_number", "student__student_id", "student_name", "existing_mark")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for row in rows:
+        yield (exam.id, exam.title, *row, exam.max_marks)
+
+
+def exam_roster_export(exams: Iterable[Exam]) -> Export:
+    """Roster of each exam (every enrolled student, with their mark or blank)."""
+
+    def rows():
+        for exam in exams:
+            yield from _exam_roster_rows(exam)
+
+    return ROSTER_HEADER, rows()
+
+
+def marks_export(marks: QuerySet) -> Export:
+    rows = (
+        marks.annotate(student_name=student_name_expression("enrollment__student__"))
+        .order_by(
+            Cast("enrollment__class_offering__level", IntegerField()), "exam__date", "exam_id", "enrollment__roll_number"
+        )
+        .values_list(
+            "enrollment__academic_year__year",
+            "enrollment__class_offering__name",
+            "enrollment__roll_number",
+            "enrollment__student__student_id",
+            "student_name",
+            "exam__assignment__subject__name",
+            "exam_id",
+            "exam__title",
+            "exam__date",
+            "marks_obtained",
+            "exam__max_marks",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return MARKS_HEADER, rows
+
+
+def class_marks_export(class_offering: ClassOffering) -> Export:
+    marks = class_offering.academic_year.marks_model.objects
+    return marks_export(marks.filter(enrollment__class_offering=class_offering))
+
+
+def enrollment_marks_export(enrollments: QuerySet) -> Export:
+    """Marks of arbitrary enrollments; live and archived years are streamed one after the other."""
+    live_header, live_rows = marks_export(Mark.objects.filter(enrollment__in=enrollments))
+    _, archived_rows = marks_export(ArchivedMark.objects.filter(enrollment__in=enrollments))
+    return live_header, chain(live_rows, archived_rows)
+
+
+def year_results_export(academic_year: AcademicYear) -> Export:
+    """One row per enrollment with totals aggregated in the database."""
+    marks = academic_year.marks_relation
+    rows = (
+        Enrollment.objects.filter(academic_year=academic_year)
+        .annotate(
+            student_name=student_name_expression(),
+            exams_taken=Count(marks),
+            total_scored=Sum(f"{marks}__marks_obtained"),
+            total_possible=Sum(f"{marks}__exam__max_marks"),
+        )
+        .order_by(Cast("class_offering__level", IntegerField()), "roll_number", "id")
+        .values_list(
+            "academic_year__year",
+            "class_offering__name",
+            "roll_number",
+            "student__student_id",
+            "student_name",
+            "exams_taken",
+            "total_scored",
+            "total_possible",
+            "grade",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    def with_percent():
+        for *head, scored, possible, grade in rows:
+            percent = round((scored / possible) * 100, 2) if possible else None
+            yield (*head, scored or 0, possible or 0, percent, grade)
+
+    return RESULTS_HEADER, with_percent()
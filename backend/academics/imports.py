@@ -0,0 +1,636 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.db.models.functions import Lower
+
+from authentication.models import StudentProfile, TeacherProfile
+from config.tenancy import tenant_database
+
+from .models import ALLOWED_CLASS_LEVELS, AcademicYear, Assignment, ClassOffering, Enrollment, Exam, Subject
+from .services import ServiceError, can_edit_marks, get_current_academic_year, save_marks
+
+
+User = get_user_model()
+
+DEFAULT_BATCH_SIZE = 500
+MIN_PASSWORD_LENGTH = 8
+
+
+def _text_stream(fileobj: IO) -> IO[str]:
+    """Wrap uploaded/binary file objects so csv can read them lazily."""
+    raw = getattr(fileobj, "file", fileobj)
+    if isinstance(raw.read(0), bytes):
+        return io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+    return raw
+
+
+def _header(name) -> str:
+    return "_".join(str(name).strip().lower().split())
+
+
+def iter_csv_rows(fileobj: IO) -> Iterator[Tuple[int, dict]]:
+    """Yield (line_number, row) pairs with snake_cased headers and stripped values."""
+    reader = csv.DictReader(_text_stream(fileobj))
+    for line_no, row in enumerate(reader, start=2):
+        yield line_no, {
+            _header(key): (value or "").strip()
+            for key, value in row.items()
+            if key is not None and not isinstance(value, list)
+        }
+
+
+def _normalize_row(row: dict) -> dict:
+    return {
+        _header(key): "" if value is None else str(value).strip()
+        for key, value in row.items()
+    }
+
+
+def iter_json_rows(source) -> Iterator[Tuple[int, dict]]:
+    """Yield (position, row) pairs from a JSON list of objects (or {"rows": [...]}) file or already-parsed list."""
+    data = source if isinstance(source, list) else json.load(_text_stream(source))
+    if isinstance(data, dict):
+        data = data.get("rows")
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise ServiceError("JSON imports must contain a list of row objects.")
+    for position, row in enumerate(data, start=1):
+        yield position, _normalize_row(row)
+
+
+def iter_xlsx_rows(fileobj: IO) -> Iterator[Tuple[int, dict]]:
+    """Yield (row_number, row) pairs from the first worksheet, using its first row as headers."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise ServiceError("XLSX uploads require the openpyxl package.") from exc
+
+    try:
+        workbook = load_workbook(getattr(fileobj, "file", fileobj), read_only=True, data_only=True)
+    except Exception as exc:
+        raise ServiceError("Could not read the XLSX file.") from exc
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [_header(cell or "") for cell in next(rows, ())]
+        for row_no, values in enumerate(rows, start=2):
+            if not any(value not in (None, "") for value in values):
+                continue
+            yield row_no, _normalize_row(dict(zip(headers, values)))
+    finally:
+        workbook.close()
+
+
+def _resolve_academic_year(year: Optional[str]) -> AcademicYear:
+    if not year:
+        academic_year = get_current_academic_year()
+        if not academic_year:
+            raise ServiceError("No current academic year configured.")
+        return academic_year
+    academic_year = AcademicYear.objects.filter(year=year).first()
+    if not academic_year:
+        raise ServiceError(f"Academic year {year} is not configured.")
+    return academic_year
+
+
+def _resolve_assignment_year(year: Optional[str]) -> AcademicYear:
+    """Like _resolve_academic_year, but refuses ended years; bulk_create skips Assignment.clean."""
+    academic_year = _resolve_academic_year(year)
+    if academic_year.is_closed:
+        raise ServiceError(f"Assignments cannot be added to academic year {academic_year.year}; it has ended.")
+    return academic_year
+
+
+def _batched(rows: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _hash_passwords(passwords: List[Optional[str]], pool: Optional[Executor]) -> List[str]:
+    if pool is None or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (os.cpu_count() or 1))
+    return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def _password_pool(workers: Optional[int]):
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers <= 1:
+        return nullcontext(None)
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+class _RosterState:
+    """Import-wide lookups loaded once so each batch only checks its own rows against the DB."""
+
+    def __init__(self, academic_year: AcademicYear):
+        self.academic_year = academic_year
+        self.classes_by_level = {
+            offering.level: offering
+            for offering in ClassOffering.objects.filter(academic_year=academic_year)
+        }
+        self.taken_rolls = {
+            (class_id, roll)
+            for class_id, roll in Enrollment.objects.filter(
+                academic_year=academic_year, roll_number__isnull=False
+            ).values_list("class_offering_id", "roll_number")
+        }
+        max_rolls = (
+            Enrollment.objects.filter(academic_year=academic_year)
+            .values("class_offering_id")
+            .annotate(max_roll=Max("roll_number"))
+        )
+        self.next_roll = {row["class_offering_id"]: (row["max_roll"] or 0) + 1 for row in max_rolls}
+        self.seen_usernames = set()
+        self.seen_emails = set()
+
+    def allocate_roll(self, class_offering_id: int) -> int:
+        roll = self.next_roll.get(class_offering_id, 1)
+        while (class_offering_id, roll) in self.taken_rolls:
+            roll += 1
+        self.next_roll[class_offering_id] = roll + 1
+        self.taken_rolls.add((class_offering_id, roll))
+        return roll
+
+
+def _account_errors(username: str, email: str, password: Optional[str], seen_usernames: set, seen_emails: set) -> dict:
+    """Field checks shared by the account-creating imports; DB uniqueness is checked per batch."""
+    errors = {}
+    if not username:
+        errors["username"] = ["This field is required."]
+    elif len(username) > 150:
+        errors["username"] = ["Ensure this field has no more than 150 characters."]
+    elif username.lower() in seen_usernames:
+        errors["username"] = ["Duplicate username in file"]
+    else:
+        try:
+            User.username_validator(username)
+        except ValidationError as exc:
+            errors["username"] = exc.messages
+
+    if not email:
+        errors["email"] = ["This field is required."]
+    else:
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors["email"] = ["Enter a valid email address."]
+        else:
+            if email.lower() in seen_emails:
+                errors["email"] = ["Duplicate email in file"]
+
+    if password is not None and len(password) < MIN_PASSWORD_LENGTH:
+        errors["password"] = [f"Ensure this field has at least {MIN_PASSWORD_LENGTH} characters."]
+
+    if username:
+        seen_usernames.add(username.lower())
+    if email:
+        seen_emails.add(email.lower())
+    return errors
+
+
+def _existing_folded(field: str, values: Iterable[str]) -> set:
+    """Lowercased `field` values already taken in the DB; same case rule as the in-file duplicate checks."""
+    folded = {value.lower() for value in values}
+    if not folded:
+        return set()
+    return set(User.objects.annotate(folded=Lower(field)).filter(folded__in=folded).values_list("folded", flat=True))
+
+
+def _class_for_level(level: str, classes_by_level: dict, academic_year: AcademicYear):
+    if level not in ALLOWED_CLASS_LEVELS:
+        return None, "Class level must be between 6 and 10."
+    class_offering = classes_by_level.get(level)
+    if class_offering is None:
+        return None, f"Class {level} is not configured for {academic_year.year}."
+    return class_offering, None
+
+
+def _validate_roster_row(row: dict, state: _RosterState) -> Tuple[dict, dict]:
+    username = row.get("username", "")
+    email = row.get("email", "")
+    password = row.get("password") or None
+    roll_value = row.get("roll_number", "")
+
+    errors = _account_errors(username, email, password, state.seen_usernames, state.seen_emails)
+    class_offering, class_error = _class_for_level(
+        row.get("class_level", ""), state.classes_by_level, state.academic_year
+    )
+    if class_error:
+        errors["class_level"] = [class_error]
+
+    roll_number = None
+    if roll_value:
+        try:
+            roll_number = int(roll_value)
+            if roll_number <= 0:
+                raise ValueError
+        except ValueError:
+            errors["roll_number"] = ["Roll number must be a positive integer."]
+        else:
+            if class_offering and (class_offering.id, roll_number) in state.taken_rolls:
+                errors["roll_number"] = ["Roll number already taken in this class."]
+
+    cleaned = {
+        "username": username,
+        "email": email,
+        "full_name": row.get("full_name") or username,
+        "password": password,
+        "class_offering": class_offering,
+        "roll_number": roll_number,
+    }
+    return cleaned, errors
+
+
+def _write_roster_batch(valid_rows: List[Tuple[int, dict]], state: _RosterState, pool) -> None:
+    hashed = _hash_passwords([cleaned["password"] for _, cleaned in valid_rows], pool)
+    with transaction.atomic(using=tenant_database()):
+        users = User.objects.bulk_create(
+            [
+                User(username=cleaned["username"], email=cleaned["email"], password=password_hash)
+                for (_, cleaned), password_hash in zip(valid_rows, hashed)
+            ]
+        )
+        if any(user.pk is None for user in users):
+            # Backends without RETURNING support: resolve primary keys in one lookup.
+            ids = dict(
+                User.objects.filter(username__in=[user.username for user in users]).values_list("username", "id")
+            )
+            for user in users:
+                user.pk = ids[user.username]
+
+        student_ids = StudentProfile.allocate_student_ids(len(valid_rows))
+        profiles = StudentProfile.objects.bulk_create(
+            [
+                StudentProfile(user_id=user.pk, full_name=cleaned["full_name"], student_id=student_id)
+                for (_, cleaned), user, student_id in zip(valid_rows, users, student_ids)
+            ]
+        )
+        if any(profile.pk is None for profile in profiles):
+            ids = dict(StudentProfile.objects.filter(student_id__in=student_ids).values_list("student_id", "id"))
+            for profile in profiles:
+                profile.pk = ids[profile.student_id]
+
+        Enrollment.objects.bulk_create(
+            [
+                Enrollment(
+                    student_id=profile.pk,
+                    academic_year=state.academic_year,
+                    class_offering=cleaned["class_offering"],
+                    roll_number=cleaned["roll_number"],
+                )
+                for (_, cleaned), profile in zip(valid_rows, profiles)
+            ]
+        )
+
+
+def import_roster(
+    fileobj: IO,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: Optional[int] = None,
+) -> dict:
+    """
+    Stream a student roster CSV into users, student profiles and current-year enrollments.
+
+    Expected columns: username, email, full_name, password, class_level, roll_number
+    (full_name, password and roll_number are optional). Rows are validated and written in
+    batches; invalid rows are reported and skipped instead of failing the whole file.
+    """
+    academic_year = get_current_academic_year()
+    if not academic_year:
+        raise ServiceError("No current academic year configured.")
+
+    state = _RosterState(academic_year)
+    report = {"total_rows": 0, "created": 0, "failed": 0, "errors": []}
+
+    with _password_pool(workers) as pool:
+        for batch in _batched(iter_csv_rows(fileobj), batch_size):
+            report["total_rows"] += len(batch)
+            validated = [(line_no, *_validate_roster_row(row, state)) for line_no, row in batch]
+
+            usernames = [cleaned["username"] for _, cleaned, errors in validated if not errors]
+            emails = [cleaned["email"] for _, cleaned, errors in validated if not errors]
+            existing_usernames = _existing_folded("username", usernames)
+            existing_emails = _existing_folded("email", emails)
+
+            valid_rows = []
+            for line_no, cleaned, errors in validated:
+                if not errors:
+                    if cleaned["username"].lower() in existing_usernames:
+                        errors["username"] = ["Username already exists"]
+                    if cleaned["email"].lower() in existing_emails:
+                        errors["email"] = ["Email already exists"]
+                if errors:
+                    report["errors"].append({"row": line_no, "username": cleaned["username"], "errors": errors})
+                    continue
+                if cleaned["roll_number"] is None:
+                    cleaned["roll_number"] = state.allocate_roll(cleaned["class_offering"].id)
+                else:
+                    state.taken_rolls.add((cleaned["class_offering"].id, cleaned["roll_number"]))
+                valid_rows.append((line_no, cleaned))
+
+            if not valid_rows:
+                continue
+            try:
+                _write_roster_batch(valid_rows, state, pool)
+            except IntegrityError:
+                for line_no, cleaned in valid_rows:
+                    report["errors"].append(
+                        {
+                            "row": line_no,
+                            "username": cleaned["username"],
+                            "errors": {"non_field_errors": ["Conflicted with a concurrent change; re-run this row."]},
+                        }
+                    )
+                continue
+            report["created"] += len(valid_rows)
+
+    report["failed"] = len(report["errors"])
+    return report
+
+
+def _write_teacher_import(new_accounts: dict, planned: List[dict], academic_year: AcademicYear, pool) -> None:
+    accounts = list(new_accounts.values())
+    hashed = _hash_passwords([account["password"] for account in accounts], pool)
+    with transaction.atomic(using=tenant_database()):
+        users = User.objects.bulk_create(
+            [
+                User(username=account["username"], email=account["email"], password=password_hash)
+                for account, password_hash in zip(accounts, hashed)
+            ]
+        )
+        if any(user.pk is None for user in users):
+            ids = dict(
+                User.objects.filter(username__in=[user.username for user in users]).values_list("username", "id")
+            )
+            for user in users:
+                user.pk = ids[user.username]
+
+        codes = TeacherProfile.allocate_employee_codes(len(accounts))
+        profiles = TeacherProfile.objects.bulk_create(
+            [
+                TeacherProfile(user_id=user.pk, full_name=account["full_name"], employee_code=code)
+                for account, user, code in zip(accounts, users, codes)
+            ]
+        )
+        if any(profile.pk is None for profile in profiles):
+            ids = dict(TeacherProfile.objects.filter(employee_code__in=codes).values_list("employee_code", "id"))
+            for profile in profiles:
+                profile.pk = ids[profile.employee_code]
+        for account, profile in zip(accounts, profiles):
+            account["teacher_id"] = profile.pk
+
+        Assignment.objects.bulk_create(
+            [
+                Assignment(
+                    teacher_id=item["account"]["teacher_id"],
+                    academic_year=academic_year,
+                    class_offering=item["class_offering"],
+                    subject=item["subject"],
+                )
+                for item in planned
+            ]
+        )
+
+
+def import_teachers(rows: Iterable[Tuple[int, dict]], *, year: Optional[str] = None, workers: Optional[int] = None) -> dict:
+    """
+    Create teacher accounts and their class+subject assignments in bulk.
+
+    Each row carries username, email, full_name, password, class_level and subject (name or code).
+    A username may repeat to give one teacher several assignments; rows naming an existing teacher
+    only add assignments. The unique class+subject+year constraint is checked in memory before any
+    write, and failing rows are reported while the rest are created. A new account with valid
+    details is created even if its row's assignment is rejected, so later rows can still attach to it.
+    """
+    academic_year = _resolve_assignment_year(year)
+    rows = list(rows)
+    classes_by_level = {
+        offering.level: offering for offering in ClassOffering.objects.filter(academic_year=academic_year)
+    }
+    subjects = {}
+    for subject in Subject.objects.all():
+        subjects[subject.name.upper()] = subject
+        subjects[subject.code.upper()] = subject
+    taken = set(
+        Assignment.objects.filter(academic_year=academic_year).values_list("class_offering_id", "subject_id")
+    )
+    usernames = {row.get("username") for _, row in rows if row.get("username")}
+    existing_users = {
+        user.username: user for user in User.objects.filter(username__in=usernames).select_related("teacher_profile")
+    }
+    existing_emails = _existing_folded("email", (row.get("email") for _, row in rows if row.get("email")))
+
+    report = {"total_rows": len(rows), "teachers_created": 0, "assignments_created": 0, "failed": 0, "errors": []}
+    new_accounts = {}
+    failed_usernames = set()
+    seen_usernames, seen_emails = set(), set()
+    planned = []
+
+    for line_no, row in rows:
+        username = row.get("username", "")
+        # Kept apart: a valid new account is created even when this row's assignment is rejected.
+        account_errors, errors = {}, {}
+        account = None
+        if username in existing_users:
+            teacher_profile = getattr(existing_users[username], "teacher_profile", None)
+            if teacher_profile is None:
+                account_errors["username"] = ["User exists but is not a teacher"]
+            else:
+                account = {"username": username, "teacher_id": teacher_profile.id}
+        elif username in new_accounts:
+            account = new_accounts[username]
+        elif username in failed_usernames:
+            account_errors["username"] = ["Teacher account on an earlier row failed validation"]
+        else:
+            email = row.get("email", "")
+            password = row.get("password") or None
+            account_errors = _account_errors(username, email, password, seen_usernames, seen_emails)
+            if not account_errors and email.lower() in existing_emails:
+                account_errors["email"] = ["Email already exists"]
+            if account_errors:
+                failed_usernames.add(username)
+            else:
+                account = {
+                    "username": username,
+                    "email": email,
+                    "full_name": row.get("full_name") or username,
+                    "password": password,
+                }
+                new_accounts[username] = account
+
+        level, subject_value = row.get("class_level", ""), row.get("subject", "")
+        item = None
+        if level or subject_value:
+            class_offering, class_error = _class_for_level(level, classes_by_level, academic_year)
+            subject = subjects.get(subject_value.upper())
+            if class_error:
+                errors["class_level"] = [class_error]
+            if subject is None:
+                errors["subject"] = ["Subject must be one of the approved subjects."]
+            if class_offering and subject:
+                if (class_offering.id, subject.id) in taken:
+                    errors["non_field_errors"] = [
+                        f"{class_offering.name} {subject.name} already has a teacher for {academic_year.year}."
+                    ]
+                elif not errors and account is not None:
+                    item = {"account": account, "class_offering": class_offering, "subject": subject}
+
+        errors = {**account_errors, **errors}
+        if errors:
+            report["errors"].append({"row": line_no, "username": username, "errors": errors})
+            continue
+        if item:
+            taken.add((item["class_offering"].id, item["subject"].id))
+            planned.append(item)
+
+    if new_accounts or planned:
+        with _password_pool(workers) as pool:
+            try:
+                _write_teacher_import(new_accounts, planned, academic_year, pool)
+            except IntegrityError as exc:
+                raise ServiceError("Import conflicted with a concurrent change; nothing was written.") from exc
+        report["teachers_created"] = len(new_accounts)
+        report["assignments_created"] = len(planned)
+
+    report["failed"] = len(report["errors"])
+    return report
+
+
+def clone_assignments(*, source_year: str, target_year: str) -> dict:
+    """Copy every assignment of `source_year` onto the matching class offerings of `target_year` in one transaction."""
+    source = _resolve_academic_year(source_year)
+    target = _resolve_assignment_year(target_year)
+    if source.pk == target.pk:
+        raise ServiceError("Source and target academic years must differ.")
+    if target.start_date < source.start_date:
+        raise ServiceError(f"Target academic year {target.year} must come after {source.year}.")
+
+    with transaction.atomic(using=tenant_database()):
+        target_classes = {offering.level: offering for offering in ClassOffering.objects.filter(academic_year=target)}
+        taken = set(Assignment.objects.filter(academic_year=target).values_list("class_offering_id", "subject_id"))
+        created, skipped = [], []
+        source_assignments = (
+            Assignment.objects.filter(academic_year=source)
+            .select_related("class_offering", "subject")
+            .order_by("class_offering__level", "subject__name")
+        )
+        for assignment in source_assignments:
+            target_class = target_classes.get(assignment.class_offering.level)
+            label = {"class_level": assignment.class_offering.level, "subject": assignment.subject.name}
+            if target_class is None:
+                skipped.append({**label, "reason": f"Class {label['class_level']} is not configured for {target.year}."})
+                continue
+            if (target_class.id, assignment.subject_id) in taken:
+                skipped.append({**label, "reason": "Already assigned"})
+                continue
+            taken.add((target_class.id, assignment.subject_id))
+            created.append(
+                Assignment(
+                    teacher_id=assignment.teacher_id,
+                    academic_year=target,
+                    class_offering=target_class,
+                    subject_id=assignment.subject_id,
+                )
+            )
+        Assignment.objects.bulk_create(created)
+
+    return {"source_year": source.year, "target_year": target.year, "created": len(created), "skipped": skipped}
+
+
+def _int_cell(value: str) -> Optional[int]:
+    """Parse spreadsheet cells such as "80", "80.0" or 221002001.0 into ints; None if not integral."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(number) if number.is_integer() else None
+
+
+def import_exam_marks(
+    exam: Exam,
+    fileobj: IO,
+    *,
+    filename: str,
+    actor: Optional[TeacherProfile],
+    is_admin: bool = False,
+) -> dict:
+    """
+    Validate a CSV/XLSX marks sheet for `exam` and save it through the bulk marks path.
+
+    Rows are keyed by roll_number (or roll) or student_id, with marks in marks_obtained (or marks).
+    Every row is resolved against the exam roster in a single query and checked before anything is
+    written; if any row fails, nothing is saved and the row-level errors are returned.
+    """
+    if not can_edit_marks(exam):
+        raise ServiceError("Marks already entered and cannot be modified")
+
+    rows = iter_xlsx_rows(fileobj) if filename.lower().endswith(".xlsx") else iter_csv_rows(fileobj)
+    roster = Enrollment.objects.filter(
+        class_offering=exam.assignment.class_offering, academic_year=exam.academic_year
+    ).values_list("id", "roll_number", "student__student_id")
+    by_roll, by_student_id = {}, {}
+    for enrollment_id, roll_number, student_id in roster:
+        if roll_number is not None:
+            by_roll[roll_number] = enrollment_id
+        if student_id:
+            by_student_id[student_id] = enrollment_id
+
+    report = {"total_rows": 0, "saved": 0, "failed": 0, "errors": []}
+    entries = []
+    seen = {}
+    for line_no, row in rows:
+        report["total_rows"] += 1
+        errors = {}
+        roll_value = row.get("roll_number") or row.get("roll")
+        student_value = row.get("student_id", "")
+        enrollment_id = None
+        if roll_value:
+            roll_number = _int_cell(roll_value)
+            enrollment_id = by_roll.get(roll_number)
+            if enrollment_id is None:
+                errors["roll_number"] = ["No student with this roll number in the exam roster."]
+        elif student_value:
+            student_id = str(_int_cell(student_value) or student_value).zfill(9)
+            enrollment_id = by_student_id.get(student_id)
+            if enrollment_id is None:
+                errors["student_id"] = ["No student with this student ID in the exam roster."]
+        else:
+            errors["roll_number"] = ["Provide roll_number or student_id."]
+
+        if enrollment_id is not None and enrollment_id in seen:
+            errors["non_field_errors"] = [f"Duplicate of row {seen[enrollment_id]}."]
+
+        marks_value = row.get("marks_obtained") or row.get("marks")
+        marks_obtained = _int_cell(marks_value)
+        if marks_obtained is None or not 0 <= marks_obtained <= exam.max_marks:
+            errors["marks_obtained"] = [f"Marks obtained must be a whole number between 0 and {exam.max_marks}."]
+
+        if errors:
+            report["errors"].append({"row": line_no, "errors": errors})
+            continue
+        seen[enrollment_id] = line_no
+        entries.append({"student_enrollment_id": enrollment_id, "marks_obtained": marks_obtained})
+
+    report["failed"] = len(report["errors"])
+    if report["failed"] or not entries:
+        return report
+    report["saved"] = save_marks(exam, entries, actor=actor, is_admin=is_admin)
+    return report
@@ -0,0 +1,486 @@
+from __future__ import annotations
+
+import io
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from config.db_routers import primary_db
+from config.sqlite import serialized_write
+from config.tenancy import get_current_tenant, tenant_context, tenant_database
+
+from .archive import close_academic_year, freeze_history_snapshots
+from .exports import marks_export, stream_csv
+from .models import AcademicYear, BackgroundJob, ClassOffering, Enrollment, Mark
+from .reports import collect_report_cards, report_card_enrollments, write_report_cards
+from .services import ServiceError, _update_enrollment_grades, promote_class
+
+
+logger = logging.getLogger(__name__)
+
+GRADE_BATCH_SIZE = 500
+EXPORT_PROGRESS_EVERY = 1000
+
+_handlers: Dict[str, Callable] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class JobContext:
+    """Handed to job handlers so they can report progress without touching other job fields."""
+
+    def __init__(self, job: BackgroundJob):
+        self.job = job
+
+    def set_total(self, total: int):
+        self.job.total = total
+        BackgroundJob.objects.filter(pk=self.job.pk).update(total=total, **self._touched())
+
+    def advance(self, step: int = 1, *, flush: bool = True):
+        self.job.progress += step
+        if flush:
+            self.flush()
+
+    def flush(self):
+        BackgroundJob.objects.filter(pk=self.job.pk).update(progress=self.job.progress, **self._touched())
+
+    def _touched(self) -> dict:
+        # Progress doubles as a heartbeat, so requeue_stale_jobs leaves a job that is still reporting alone.
+        now = timezone.now()
+        return {"updated_at": now, "locked_at": now} if self.job.locked_by else {"updated_at": now}
+
+    def write_output(self, name: str, content: str):
+        self.job.output_name = name
+        self.job.output = content
+
+
+def job_handler(name: str):
+    def register(func):
+        _handlers[name] = func
+        return func
+
+    return register
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.JOB_WORKERS, thread_name_prefix="academics-job")
+        return _executor
+
+
+def enqueue_job(
+    name: str,
+    *,
+    params: Optional[dict] = None,
+    user=None,
+    run_after: Optional[datetime] = None,
+    max_attempts: Optional[int] = None,
+) -> BackgroundJob:
+    """
+    Record a job. With settings.JOB_BACKEND = "db" the row is the queue entry and `run_worker`
+    picks it up once the surrounding transaction commits; `run_after` delays it and failures are
+    retried up to `max_attempts` times. Otherwise the job runs once, in this process's executor,
+    as soon as the transaction commits.
+    """
+    if name not in _handlers:
+        raise ServiceError(f"Unknown job {name}.")
+    queued = settings.JOB_BACKEND == "db" and not settings.JOBS_EAGER
+    job = BackgroundJob.objects.create(
+        name=name,
+        params=params or {},
+        created_by=user,
+        run_after=run_after or timezone.now(),
+        max_attempts=(max_attempts or settings.JOB_MAX_ATTEMPTS) if queued else 1,
+    )
+    tenant = get_current_tenant()
+    if settings.JOBS_EAGER:
+        transaction.on_commit(lambda: run_job(job.pk), using=tenant_database())
+    elif not queued:
+        # Worker threads do not inherit context variables, so the tenant is handed over explicitly.
+        transaction.on_commit(
+            lambda: _get_executor().submit(_run_in_worker, job.pk, tenant), using=tenant_database()
+        )
+    logger.info("job_queued", extra={"job_id": job.pk, "job_name": name})
+    return job
+
+
+def _run_in_worker(job_id: int, tenant: Optional[str] = None):
+    close_old_connections()
+    try:
+        with tenant_context(tenant):
+            run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def _process_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@primary_db
+def run_job(job_id: int) -> BackgroundJob:
+    """
+    Run a queued job in this process (thread backend and JOBS_EAGER). The row is claimed and locked
+    like a queue worker's claim, so a job orphaned by a restart is recovered by `run_worker`, and a
+    job `run_worker` already took is not run a second time.
+    """
+    now = timezone.now()
+    with serialized_write():
+        claimed = BackgroundJob.objects.filter(pk=job_id, status=BackgroundJob.STATUS_QUEUED).update(
+            status=BackgroundJob.STATUS_RUNNING,
+            attempts=F("attempts") + 1,
+            locked_by=f"{_process_name()}/thread",
+            locked_at=now,
+            started_at=now,
+            updated_at=now,
+        )
+    job = BackgroundJob.objects.get(pk=job_id)
+    if not claimed:
+        logger.info("job_already_taken", extra={"job_id": job.pk, "job_name": job.name, "status": job.status})
+        return job
+    return _execute(job)
+
+
+def _execute(job: BackgroundJob) -> BackgroundJob:
+    """Run a job already marked running; a failure with attempts left goes back on the queue."""
+    context = JobContext(job)
+    try:
+        with _Heartbeat(job):
+            job.result = _handlers[job.name](context, **job.params)
+        job.status = BackgroundJob.STATUS_SUCCEEDED
+        job.error = ""
+    except Exception as exc:  # noqa: BLE001 - any failure is recorded on the job row
+        logger.exception("job_failed", extra={"job_id": job.pk, "job_name": job.name, "attempt": job.attempts})
+        job.error = str(exc)
+        if job.attempts < job.max_attempts:
+            job.status = BackgroundJob.STATUS_QUEUED
+            job.run_after = timezone.now() + _retry_delay(job.attempts)
+        else:
+            job.status = BackgroundJob.STATUS_FAILED
+    job.finished_at = timezone.now() if job.status != BackgroundJob.STATUS_QUEUED else None
+    job.locked_by, job.locked_at = "", None
+    job.save(
+        update_fields=[
+            "status",
+            "result",
+            "error",
+            "output",
+            "output_name",
+            "finished_at",
+            "run_after",
+            "locked_by",
+            "locked_at",
+            "updated_at",
+        ]
+    )
+    return job
+
+
+def heartbeat(job: BackgroundJob) -> bool:
+    """Refresh the lock on a job this worker is still running; False if it no longer holds it."""
+    with serialized_write():
+        return bool(
+            BackgroundJob.objects.filter(
+                pk=job.pk, status=BackgroundJob.STATUS_RUNNING, locked_by=job.locked_by
+            ).update(locked_at=timezone.now())
+        )
+
+
+class _Heartbeat:
+    """
+    Calls heartbeat() every settings.JOB_HEARTBEAT_SECONDS while a handler runs, for long steps
+    (a whole-year report card render, a promotion) that report no progress in between.
+    """
+
+    def __init__(self, job: BackgroundJob):
+        self.job = job
+        self.tenant = get_current_tenant()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        if self.job.locked_by and settings.JOB_HEARTBEAT_SECONDS > 0:
+            self._thread = threading.Thread(target=self._run, name=f"job-heartbeat-{self.job.pk}", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        try:
+            with tenant_context(self.tenant):
+                while not self._stop.wait(settings.JOB_HEARTBEAT_SECONDS):
+                    try:
+                        heartbeat(self.job)
+                    except Exception:  # noqa: BLE001 - the next beat tries again
+                        logger.exception("job_heartbeat_failed", extra={"job_id": self.job.pk})
+        finally:
+            connections.close_all()
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff: JOB_RETRY_BACKOFF_SECONDS after the first failure, doubling after each one."""
+    return timedelta(seconds=settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1))
+
+
+@primary_db
+def claim_job(worker_id: str) -> Optional[BackgroundJob]:
+    """
+    Take the oldest due job off the queue and mark it running for `worker_id`.
+
+    On PostgreSQL the candidate row is locked with SELECT ... FOR UPDATE SKIP LOCKED, so workers
+    never wait on each other or pick the same job. SQLite has no row locks; writers in this process
+    queue on serialized_write and the status check in the UPDATE stops a second process from
+    claiming a job that was taken between its read and its write.
+    """
+    using = tenant_database()
+    now = timezone.now()
+    with serialized_write(), transaction.atomic(using=using):
+        due = BackgroundJob.objects.filter(status=BackgroundJob.STATUS_QUEUED, run_after__lte=now)
+        if connections[using].features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        job = due.order_by("run_after", "pk").first()
+        if job is None:
+            return None
+        claimed = BackgroundJob.objects.filter(pk=job.pk, status=BackgroundJob.STATUS_QUEUED).update(
+            status=BackgroundJob.STATUS_RUNNING,
+            attempts=F("attempts") + 1,
+            locked_by=worker_id,
+            locked_at=now,
+            started_at=now,
+            updated_at=now,
+        )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    logger.info("job_claimed", extra={"job_id": job.pk, "job_name": job.name, "worker": worker_id})
+    return job
+
+
+@primary_db
+def requeue_stale_jobs() -> int:
+    """
+    Recover jobs left running by a worker that died: requeue them if attempts remain, otherwise
+    fail them. Running jobs refresh locked_at (see heartbeat), so a lock older than
+    settings.JOB_LOCK_TIMEOUT_SECONDS counts as abandoned.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+    # Rows started before run_job recorded a lock only have started_at to go by.
+    stale = BackgroundJob.objects.filter(status=BackgroundJob.STATUS_RUNNING).filter(
+        Q(locked_at__lt=cutoff) | Q(locked_at__isnull=True, started_at__lt=cutoff)
+    )
+    with serialized_write():
+        failed = stale.filter(attempts__gte=F("max_attempts")).update(
+            status=BackgroundJob.STATUS_FAILED,
+            error="Worker stopped before the job finished.",
+            locked_by="",
+            locked_at=None,
+            finished_at=now,
+            updated_at=now,
+        )
+        requeued = stale.update(
+            status=BackgroundJob.STATUS_QUEUED, locked_by="", locked_at=None, run_after=now, updated_at=now
+        )
+    if failed or requeued:
+        logger.warning("jobs_recovered", extra={"requeued": requeued, "failed": failed})
+    return requeued
+
+
+class Worker:
+    """
+    Pulls jobs from the database queue (settings.JOB_BACKEND = "db") until stopped. Each of the
+    `concurrency` loops claims and runs one job at a time on its own thread and connection.
+    With the thread backend, a burst run recovers jobs a restarted web process left queued or running.
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = 1,
+        poll_interval: Optional[float] = None,
+        burst: bool = False,
+        max_jobs: Optional[int] = None,
+        name: Optional[str] = None,
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = settings.JOB_POLL_SECONDS if poll_interval is None else poll_interval
+        self.burst = burst
+        self.max_jobs = max_jobs
+        self.name = name or _process_name()
+        self.processed = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def stop(self):
+        """Finish the jobs in hand, then return from run()."""
+        self._stop.set()
+
+    def run(self) -> int:
+        requeue_stale_jobs()
+        if self.concurrency == 1:
+            self._loop(f"{self.name}/0")
+            return self.processed
+
+        tenant = get_current_tenant()
+        threads = [
+            threading.Thread(target=self._thread_loop, args=(f"{self.name}/{index}", tenant), daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.processed
+
+    def _thread_loop(self, worker_id: str, tenant: Optional[str]):
+        try:
+            with tenant_context(tenant):
+                self._loop(worker_id)
+        finally:
+            connections.close_all()
+
+    def _loop(self, worker_id: str):
+        while not self._stop.is_set():
+            close_old_connections()
+            job = claim_job(worker_id)
+            if job is None:
+                if self.burst:
+                    return
+                self._stop.wait(self.poll_interval)
+                requeue_stale_jobs()
+                continue
+            _execute(job)
+            with self._lock:
+                self.processed += 1
+                if self.max_jobs and self.processed >= self.max_jobs:
+                    self._stop.set()
+
+
+def _chunks(ids: List[int], size: int) -> Iterable[List[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def _scoped_marks(*, enrollment_ids=None, class_offering_ids=None, exam_ids=None):
+    """Marks selected by whichever admin changelist queued the job."""
+    if exam_ids is not None:
+        return Mark.objects.filter(exam_id__in=exam_ids)
+    if class_offering_ids is not None:
+        return Mark.objects.filter(enrollment__class_offering_id__in=class_offering_ids)
+    return Mark.objects.filter(enrollment_id__in=enrollment_ids or [])
+
+
+def _scoped_enrollment_ids(*, enrollment_ids=None, class_offering_ids=None, exam_ids=None) -> List[int]:
+    if exam_ids is not None:
+        return sorted(set(Mark.objects.filter(exam_id__in=exam_ids).values_list("enrollment_id", flat=True)))
+    if class_offering_ids is not None:
+        enrollments = Enrollment.objects.filter(class_offering_id__in=class_offering_ids).order_by("pk")
+        return list(enrollments.values_list("pk", flat=True))
+    return sorted(enrollment_ids or [])
+
+
+@job_handler("recompute_grades")
+def recompute_grades(context: JobContext, **scope) -> dict:
+    enrollment_ids = _scoped_enrollment_ids(**scope)
+    context.set_total(len(enrollment_ids))
+    for batch in _chunks(enrollment_ids, GRADE_BATCH_SIZE):
+        with transaction.atomic(using=tenant_database()):
+            _update_enrollment_grades(batch)
+        context.advance(len(batch))
+    return {"enrollments": len(enrollment_ids)}
+
+
+@job_handler("export_marks")
+def export_marks(context: JobContext, *, filename: str = "marks", **scope) -> dict:
+    marks = _scoped_marks(**scope)
+    context.set_total(marks.count())
+    buffer = io.StringIO()
+    header, rows = marks_export(marks)
+    lines = stream_csv(header, rows)
+    buffer.write(next(lines))
+    for line in lines:
+        buffer.write(line)
+        context.advance(flush=context.job.progress % EXPORT_PROGRESS_EVERY == 0)
+    context.flush()
+    context.write_output(f"{filename}.csv", buffer.getvalue())
+    return {"rows": context.job.progress}
+
+
+@job_handler("promote_classes")
+def promote_classes(context: JobContext, *, class_offering_ids: List[int], user_id: Optional[int] = None) -> dict:
+    actor = get_user_model().objects.filter(pk=user_id).first() if user_id else None
+    classes = list(ClassOffering.objects.filter(pk__in=class_offering_ids).order_by("pk"))
+    context.set_total(len(classes))
+    promoted, failed = [], []
+    for class_offering in classes:
+        try:
+            with transaction.atomic(using=tenant_database()):
+                record = promote_class(class_offering, actor=actor, notes="Promoted from admin background job")
+            promoted.append(
+                {
+                    "class": str(class_offering),
+                    "record_id": record.pk,
+                    "promoted": record.promoted_count,
+                    "retained": record.retained_count,
+                }
+            )
+        except ServiceError as exc:
+            failed.append({"class": str(class_offering), "error": exc.messages[0]})
+        context.advance()
+    return {"promoted": promoted, "failed": failed}
+
+
+@job_handler("archive_years")
+def archive_years(context: JobContext, *, academic_year_ids: List[int]) -> dict:
+    years = list(AcademicYear.objects.filter(pk__in=academic_year_ids).order_by("start_date"))
+    context.set_total(len(years))
+    archived, failed = [], []
+    for academic_year in years:
+        try:
+            archived.append(close_academic_year(academic_year))
+        except ServiceError as exc:
+            failed.append({"academic_year": academic_year.year, "error": exc.messages[0]})
+        context.advance()
+    return {"archived": archived, "failed": failed}
+
+
+@job_handler("freeze_history")
+def freeze_history(context: JobContext, *, academic_year_ids: List[int]) -> dict:
+    years = list(AcademicYear.objects.filter(pk__in=academic_year_ids).order_by("start_date"))
+    context.set_total(len(years))
+    frozen, failed = [], []
+    for academic_year in years:
+        try:
+            frozen.append({"academic_year": academic_year.year, "snapshots": freeze_history_snapshots(academic_year)})
+        except ServiceError as exc:
+            failed.append({"academic_year": academic_year.year, "error": exc.messages[0]})
+        context.advance()
+    return {"frozen": frozen, "failed": failed}
+
+
+@job_handler("generate_report_cards")
+def generate_report_cards(
+    context: JobContext, *, year: str, output: str, class_level: Optional[str] = None, workers: Optional[int] = None
+) -> dict:
+    """Render report cards into `output` (a directory or .zip path on the worker's filesystem)."""
+    cards = collect_report_cards(report_card_enrollments(year, class_level))
+    context.set_total(len(cards))
+    count = write_report_cards(cards, output, workers)
+    context.advance(count)
+    return {"report_cards": count, "output": output}
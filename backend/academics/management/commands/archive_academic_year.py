@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.archive import close_academic_year
+from academics.models import AcademicYear
+from academics.services import ServiceError
+from config.tenancy import TenantCommandMixin
+
+
+class Command(TenantCommandMixin, BaseCommand):
+    help = "Close a finished academic year: move its marks to the archive table and keep per-subject summaries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", required=True, help="Academic year (YYYY)")
+
+    def handle(self, *args, **options):
+        academic_year = AcademicYear.objects.filter(year=options["year"]).first()
+        if not academic_year:
+            raise CommandError(f"Academic year {options['year']} is not configured.")
+        try:
+            result = close_academic_year(academic_year)
+        except ServiceError as exc:
+            raise CommandError(exc.messages[0]) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {result['marks_archived']} marks and wrote {result['summaries']} subject summaries "
+                f"for {result['academic_year']}."
+            )
+        )
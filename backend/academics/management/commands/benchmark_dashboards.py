@@ -0,0 +1,150 @@
+import asyncio
+import io
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from authentication.api.views import _generate_tokens, _get_role
+from config.tenancy import TenantCommandMixin
+
+
+DASHBOARD_ROUTES = {
+    "student": ("student-dashboard", "student-dashboard-async"),
+    "teacher": ("teacher-dashboard", "teacher-dashboard-async"),
+    "admin": ("teacher-dashboard", "teacher-dashboard-async"),
+}
+
+
+class Command(TenantCommandMixin, BaseCommand):
+    help = (
+        "Compare dashboard latency under concurrent load: the sync view through Django's WSGI handler "
+        "(one thread per in-flight request) against the async view through the ASGI handler (one event loop). "
+        "Requests go straight into the handlers, so server and network overhead are not included."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", required=True, help="Student or teacher to request the dashboard as")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per handler")
+        parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once")
+        parser.add_argument("--host", default="localhost", help="Host header (selects the tenant when hostnames are configured)")
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(username=options["username"]).first()
+        if not user:
+            raise CommandError(f"User {options['username']} does not exist.")
+        routes = DASHBOARD_ROUTES.get(_get_role(user))
+        if not routes:
+            raise CommandError(f"User {user.username} has no dashboard.")
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be at least 1.")
+
+        headers = {"HOST": options["host"], "AUTHORIZATION": f"Bearer {_generate_tokens(user)['access']}"}
+        total, concurrency = options["requests"], options["concurrency"]
+        sync_path, async_path = (reverse(name) for name in routes)
+
+        results = [
+            ("WSGI", sync_path, self.run_wsgi(sync_path, headers, total, concurrency)),
+            ("ASGI", async_path, async_to_sync(self.run_asgi)(async_path, headers, total, concurrency)),
+        ]
+
+        self.stdout.write(f"{total} requests per handler, {concurrency} concurrent, as {user.username}")
+        self.stdout.write(f"{'handler':8}{'path':36}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'errors':>8}")
+        for label, path, (latencies, errors, elapsed) in results:
+            p50, p95, p99 = self.percentiles(latencies)
+            self.stdout.write(
+                f"{label:8}{path:36}{p50:9.1f}{p95:9.1f}{p99:9.1f}{len(latencies) / elapsed:9.1f}{errors:8d}"
+            )
+
+    @staticmethod
+    def percentiles(latencies):
+        if len(latencies) < 2:
+            value = latencies[0] * 1000 if latencies else 0.0
+            return value, value, value
+        cuts = statistics.quantiles([latency * 1000 for latency in latencies], n=100, method="inclusive")
+        return cuts[49], cuts[94], cuts[98]
+
+    def run_wsgi(self, path, headers, total, concurrency):
+        handler = WSGIHandler()
+
+        def request(_):
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": "",
+                "SERVER_NAME": headers["HOST"],
+                "SERVER_PORT": "80",
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "wsgi.version": (1, 0),
+                "wsgi.url_scheme": "http",
+                "wsgi.input": io.BytesIO(b""),
+                "wsgi.errors": sys.stderr,
+                "wsgi.multithread": True,
+                "wsgi.multiprocess": False,
+                "wsgi.run_once": False,
+                **{f"HTTP_{name}": value for name, value in headers.items()},
+            }
+            statuses = []
+            started = time.perf_counter()
+            response = handler(environ, lambda status, response_headers, exc_info=None: statuses.append(status))
+            try:
+                b"".join(response)
+            finally:
+                # Fires request_finished, which returns the thread's connection like a real server would.
+                response.close()
+            return time.perf_counter() - started, int(statuses[0].split()[0])
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(request, range(total)))
+        return self.summarize(outcomes, time.perf_counter() - started)
+
+    async def run_asgi(self, path, headers, total, concurrency):
+        handler = ASGIHandler()
+        slots = asyncio.Semaphore(concurrency)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+            "client": ("127.0.0.1", 0),
+            "server": (headers["HOST"], 80),
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def request():
+            statuses = []
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            async with slots:
+                started = time.perf_counter()
+                await handler(dict(scope), receive, send)
+                return time.perf_counter() - started, statuses[0]
+
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(request() for _ in range(total)))
+        return self.summarize(outcomes, time.perf_counter() - started)
+
+    @staticmethod
+    def summarize(outcomes, elapsed):
+        latencies = [latency for latency, status in outcomes]
+        errors = sum(1 for _, status in outcomes if status >= 400)
+        return latencies, errors, elapsed
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.imports import clone_assignments
+from academics.services import ServiceError
+from config.tenancy import TenantCommandMixin
+
+
+class Command(TenantCommandMixin, BaseCommand):
+    help = "Copy last year's teacher assignments onto the new academic year's class offerings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="source_year", required=True, help="Source academic year (YYYY)")
+        parser.add_argument("--to", dest="target_year", required=True, help="Target academic year (YYYY)")
+
+    def handle(self, *args, **options):
+        try:
+            report = clone_assignments(source_year=options["source_year"], target_year=options["target_year"])
+        except ServiceError as exc:
+            raise CommandError(exc.messages[0]) from exc
+
+        for skipped in report["skipped"]:
+            self.stderr.write(f"skipped Class {skipped['class_level']} {skipped['subject']}: {skipped['reason']}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Cloned {report['created']} assignments from {report['source_year']} to {report['target_year']}.")
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.archive import freeze_history_snapshots
+from academics.models import AcademicYear
+from academics.services import ServiceError
+from config.tenancy import TenantCommandMixin
+
+
+class Command(TenantCommandMixin, BaseCommand):
+    help = "Rewrite the frozen dashboard history snapshots for a closed academic year."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", required=True, help="Academic year (YYYY)")
+
+    def handle(self, *args, **options):
+        academic_year = AcademicYear.objects.filter(year=options["year"]).first()
+        if not academic_year:
+            raise CommandError(f"Academic year {options['year']} is not configured.")
+        try:
+            count = freeze_history_snapshots(academic_year)
+        except ServiceError as exc:
+            raise CommandError(exc.messages[0]) from exc
+
+        self.stdout.write(self.style.SUCCESS(f"Froze {count} history snapshots for {academic_year.year}."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.reports import generate_report_cards, report_card_enrollments
+from academics.services import ServiceError
+from config.tenancy import TenantCommandMixin
+
+
+class Command(TenantCommandMixin, BaseCommand):
+    help = "Render HTML + JSON report cards for a class or a whole academic year into a directory or .zip."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", required=True, help="Academic year (YYYY)")
+        parser.add_argument("--class-level", help="Limit to one class level (6-10)")
+        parser.add_argument("--output", required=True, help="Target directory, or a path ending in .zip")
+        parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPU count)")
+
+    def handle(self, *args, **options):
+        try:
+            enrollments = report_card_enrollments(options["year"], options["class_level"])
+        except ServiceError as exc:
+            raise CommandError(exc.messages[0]) from exc
+
+        count = generate_report_cards(enrollments, options["output"], workers=options["workers"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} report cards to {options['output']}."))
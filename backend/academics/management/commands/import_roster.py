@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.imports import DEFAULT_BATCH_SIZE, import_roster
+from academics.services import ServiceError
+from config.tenancy import TenantCommandMixin
+
+
+class Command(TenantCommandMixin, BaseCommand):
+    help = "Bulk-import students (accounts, profiles and current-year enrollments) from a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV with username, email, full_name, password, class_level, roll_number")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--workers", type=int, default=None, help="Password hashing processes (default: CPU count)")
+        parser.add_argument("--report", help="Optional path to write the JSON error report")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as handle:
+                report = import_roster(handle, batch_size=options["batch_size"], workers=options["workers"])
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}") from exc
+        except ServiceError as exc:
+            raise CommandError(exc.messages[0]) from exc
+
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8") as handle:
+                json.dump(report, handle, indent=2)
+
+        for error in report["errors"]:
+            self.stderr.write(f"row {error['row']} ({error['username'] or '-'}): {json.dumps(error['errors'])}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {report['total_rows']} rows: {report['created']} created, {report['failed']} failed."
+            )
+        )
@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.imports import import_teachers, iter_csv_rows, iter_json_rows
+from academics.services import ServiceError
+from config.tenancy import TenantCommandMixin
+
+
+class Command(TenantCommandMixin, BaseCommand):
+    help = "Bulk-create teacher accounts and class+subject assignments from a CSV or JSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV/JSON rows with username, email, full_name, password, class_level, subject")
+        parser.add_argument("--format", choices=["csv", "json"], help="Defaults to the file extension")
+        parser.add_argument("--year", help="Academic year for the assignments (default: current)")
+        parser.add_argument("--workers", type=int, default=None, help="Password hashing processes (default: CPU count)")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or ("json" if path.lower().endswith(".json") else "csv")
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as handle:
+                rows = iter_json_rows(handle) if file_format == "json" else iter_csv_rows(handle)
+                report = import_teachers(rows, year=options["year"], workers=options["workers"])
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}") from exc
+        except (ServiceError, json.JSONDecodeError) as exc:
+            raise CommandError(exc.messages[0] if isinstance(exc, ServiceError) else str(exc)) from exc
+
+        for error in report["errors"]:
+            self.stderr.write(f"row {error['row']} ({error['username'] or '-'}): {json.dumps(error['errors'])}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {report['total_rows']} rows: {report['teachers_created']} teachers and "
+                f"{report['assignments_created']} assignments created, {report['failed']} failed."
+            )
+        )
@@ -0,0 +1,55 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.jobs import Worker
+from config.tenancy import TenantCommandMixin
+
+
+class Command(TenantCommandMixin, BaseCommand):
+    help = (
+        "Run background jobs from the database queue (JOB_BACKEND=db). Failed jobs are retried with "
+        "backoff up to JOB_MAX_ATTEMPTS; SIGINT/SIGTERM let the jobs in hand finish before exiting. "
+        "With the thread backend, run with --burst after a restart to recover jobs the old process lost."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=1, help="Jobs to run at once (one thread each)")
+        parser.add_argument("--poll", type=float, help="Seconds between queue checks when idle (default: JOB_POLL_SECONDS)")
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is due instead of waiting for more")
+        parser.add_argument("--max-jobs", type=int, help="Exit after running this many jobs")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+        if settings.JOB_BACKEND != "db":
+            self.stderr.write(
+                self.style.WARNING("JOB_BACKEND is not 'db'; only jobs left behind by restarted processes are picked up.")
+            )
+
+        worker = Worker(
+            concurrency=options["concurrency"],
+            poll_interval=options["poll"],
+            burst=options["burst"],
+            max_jobs=options["max_jobs"],
+        )
+        previous = self.install_signal_handlers(worker)
+        self.stdout.write(f"Worker {worker.name} started with concurrency {worker.concurrency}.")
+        try:
+            processed = worker.run()
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker.name} stopped after {processed} jobs."))
+
+    @staticmethod
+    def install_signal_handlers(worker):
+        # Signal handlers can only be set from the main thread (not the case under some test runners).
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+        previous = {}
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous[signum] = signal.signal(signum, lambda *_: worker.stop())
+        return previous
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0004_seed_class_offerings'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['academic_year', 'grade'], name='enrollment_year_grade_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['date'], name='exam_date_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0006_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='academicyear',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='academicyear',
+            name='is_archived',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='EnrollmentSubjectSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exams_taken', models.PositiveIntegerField()),
+                ('scored', models.PositiveIntegerField()),
+                ('possible', models.PositiveIntegerField()),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_summaries', to='academics.academicyear')),
+                ('enrollment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_summaries', to='academics.enrollment')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollment_summaries', to='academics.subject')),
+            ],
+            options={
+                'ordering': ['subject__name'],
+                'unique_together': {('enrollment', 'subject')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedMark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('marks_obtained', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_marks', to='academics.academicyear')),
+                ('enrollment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_marks', to='academics.enrollment')),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_marks', to='academics.exam')),
+            ],
+            options={
+                'ordering': ['exam__date'],
+                'unique_together': {('exam', 'enrollment')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.11 on 2026-10-19 04:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_normalize_student_ids'),
+        ('academics', '0007_academic_year_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrollmentHistorySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year_start', models.DateField()),
+                ('payload', models.JSONField()),
+                ('frozen_at', models.DateTimeField()),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history_snapshots', to='academics.academicyear')),
+                ('enrollment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='history_snapshot', to='academics.enrollment')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history_snapshots', to='authentication.studentprofile')),
+            ],
+            options={
+                'ordering': ['-year_start'],
+                'indexes': [models.Index(fields=['student', '-year_start'], name='history_student_year_idx')],
+            },
+        ),
+    ]
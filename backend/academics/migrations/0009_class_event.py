@@ -0,0 +1,29 @@
+# Generated by Django 4.2.11 on 2026-10-19 05:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0008_enrollment_history_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('exam_scheduled', 'Exam scheduled'), ('marks_published', 'Marks published')], max_length=30)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('class_offering', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='academics.classoffering')),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='academics.exam')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['class_offering', 'id'], name='class_event_feed_idx')],
+            },
+        ),
+    ]
@@ -18,6 +18,8 @@ HARDCODED_SUBJECTS = {
     "SCIENCE": "SCE-101",
     "ISLAMIC STUDIES": "ISL-101",
 }
+# Minimum overall percentage to pass (promotion and analytics pass rate).
+PASS_PERCENT = 40
 
 
 class TimestampedModel(models.Model):
@@ -33,6 +35,8 @@ class AcademicYear(TimestampedModel):
     start_date = models.DateField()
     end_date = models.DateField()
     is_current = models.BooleanField(default=False)
+    is_archived = models.BooleanField(default=False)
+    archived_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-start_date"]
@@ -40,6 +44,21 @@ class AcademicYear(TimestampedModel):
     def __str__(self) -> str:
         return self.year
 
+    @property
+    def is_closed(self) -> bool:
+        """Not current and already ended; only closed years may be archived or frozen."""
+        return not self.is_current and self.end_date < timezone.localdate()
+
+    @property
+    def marks_model(self):
+        """Mark for live years, ArchivedMark once the year has been closed (same field names)."""
+        return ArchivedMark if self.is_archived else Mark
+
+    @property
+    def marks_relation(self) -> str:
+        """Reverse accessor from Enrollment/Exam to this year's marks."""
+        return "archived_marks" if self.is_archived else "marks"
+
     def clean(self):
         super().clean()
         if self.year not in ALLOWED_ACADEMIC_YEARS:
@@ -55,6 +74,9 @@ class AcademicYear(TimestampedModel):
         if self.is_current and year_int != timezone.localdate().year:
             raise ValidationError("Only the running calendar year can be marked as current.")
 
+        if self.is_current and self.is_archived:
+            raise ValidationError("The current academic year cannot be archived.")
+
         if self.is_current and AcademicYear.objects.exclude(pk=self.pk).filter(is_current=True).exists():
             raise ValidationError("Only one academic year can be marked as current.")
 
@@ -184,6 +206,7 @@ class Enrollment(TimestampedModel):
                 name="unique_student_per_academic_year",
             ),
         ]
+        indexes = [models.Index(fields=["academic_year", "grade"], name="enrollment_year_grade_idx")]
 
     def __str__(self) -> str:
         return f"{self.student} - {self.class_offering}"
@@ -238,6 +261,7 @@ class Exam(TimestampedModel):
 
     class Meta:
         ordering = ["-date"]
+        indexes = [models.Index(fields=["date"], name="exam_date_idx")]
 
     def __str__(self) -> str:
         return self.title
@@ -289,6 +313,62 @@ class Mark(TimestampedModel):
         super().save(*args, **kwargs)
 
 
+class ArchivedMark(models.Model):
+    """Marks of a closed academic year, moved out of the hot Mark table by academics.archive."""
+
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name="archived_marks")
+    enrollment = models.ForeignKey(Enrollment, on_delete=models.CASCADE, related_name="archived_marks")
+    academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE, related_name="archived_marks")
+    marks_obtained = models.PositiveIntegerField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("exam", "enrollment")
+        ordering = ["exam__date"]
+
+    def __str__(self) -> str:
+        return f"{self.enrollment} - {self.exam} ({self.marks_obtained})"
+
+
+class EnrollmentSubjectSummary(models.Model):
+    """Per-subject totals left behind for history queries when a year is archived."""
+
+    enrollment = models.ForeignKey(Enrollment, on_delete=models.CASCADE, related_name="subject_summaries")
+    academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE, related_name="subject_summaries")
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="enrollment_summaries")
+    exams_taken = models.PositiveIntegerField()
+    scored = models.PositiveIntegerField()
+    possible = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ("enrollment", "subject")
+        ordering = ["subject__name"]
+
+    def __str__(self) -> str:
+        return f"{self.enrollment} - {self.subject} ({self.scored}/{self.possible})"
+
+
+class EnrollmentHistorySnapshot(models.Model):
+    """Pre-rendered dashboard history entry for an enrollment in a closed year, written by academics.archive."""
+
+    enrollment = models.OneToOneField(Enrollment, on_delete=models.CASCADE, related_name="history_snapshot")
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="history_snapshots")
+    academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE, related_name="history_snapshots")
+    # Copied from the academic year so a student's history is read and ordered from this table's index alone.
+    year_start = models.DateField()
+    payload = models.JSONField()
+    frozen_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-year_start"]
+        indexes = [models.Index(fields=["student", "-year_start"], name="history_student_year_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.enrollment} (frozen {self.frozen_at:%Y-%m-%d})"
+
+
 class PromotionRecord(TimestampedModel):
     source_academic_year = models.ForeignKey(
         AcademicYear, on_delete=models.CASCADE, related_name="promotion_sources"
@@ -310,3 +390,74 @@ class PromotionRecord(TimestampedModel):
 
     def __str__(self) -> str:
         return f"Promotion {self.source_class} -> {self.target_class} ({self.promoted_count} promoted)"
+
+
+class BackgroundJob(TimestampedModel):
+    """Admin bulk work handed to academics.jobs; the admin changelist doubles as the status page."""
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    output = models.TextField(blank=True)
+    output_name = models.CharField(max_length=255, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="background_jobs"
+    )
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Queue bookkeeping for `manage.py run_worker` (settings.JOB_BACKEND = "db").
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=1)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="job_status_created_idx"),
+            models.Index(fields=["status", "run_after"], name="job_status_run_after_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class ClassEvent(models.Model):
+    """Change feed for a class offering, read by the student SSE stream (academics.events)."""
+
+    KIND_EXAM_SCHEDULED = "exam_scheduled"
+    KIND_MARKS_PUBLISHED = "marks_published"
+    KIND_CHOICES = [
+        (KIND_EXAM_SCHEDULED, "Exam scheduled"),
+        (KIND_MARKS_PUBLISHED, "Marks published"),
+    ]
+
+    class_offering = models.ForeignKey(ClassOffering, on_delete=models.CASCADE, related_name="events")
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name="events")
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        # Streams read "events for this class after id N".
+        indexes = [models.Index(fields=["class_offering", "id"], name="class_event_feed_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.kind} for {self.class_offering} (#{self.pk})"
@@ -0,0 +1,148 @@
+"""
+PostgreSQL-native payload builders for the student dashboard and the exam roster.
+
+The nested lists are assembled by the database (jsonb_build_object inside ARRAY(...) subqueries
+and jsonb_agg), so each payload comes back as one row instead of one row per mark, exam or
+student. services.py only calls these when json_payloads_enabled() and keeps the ORM path for
+SQLite; both paths return identical structures (see test_pg_payloads).
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import BoolOr, JSONBAgg
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import connections
+from django.db.models import Count, Exists, F, Max, Min, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import JSONObject
+
+from .models import Assignment, Enrollment, Exam, Subject
+
+
+def json_payloads_enabled() -> bool:
+    return settings.PG_JSON_PAYLOADS and connections[Enrollment.objects.db].vendor == "postgresql"
+
+
+def roster_payload(roster: QuerySet) -> Tuple[List[dict], Optional[bool]]:
+    """
+    Aggregate an exam_roster_queryset() into (roster rows, locked) with one jsonb_agg.
+    `locked` is None for an empty class, matching the ORM path's "no rows" case.
+    """
+    row = roster.order_by().aggregate(
+        roster=JSONBAgg(
+            JSONObject(
+                student_enrollment_id=F("pk"),
+                student_name=F("student_name"),
+                student_id=F("student__student_id"),
+                roll=F("roll_number"),
+                existing_mark=F("existing_mark"),
+            ),
+            ordering=("roll_number", "pk"),
+        ),
+        locked=BoolOr("locked"),
+    )
+    rows = [
+        {
+            "student_enrollment_id": item["student_enrollment_id"],
+            "student_name": item["student_name"],
+            "student_id": item["student_id"],
+            "roll": item["roll"],
+            "existing_mark": item["existing_mark"],
+        }
+        for item in row["roster"] or []
+    ]
+    return rows, row["locked"]
+
+
+def _exam_stat(marks_model, aggregate):
+    """Scalar aggregate over every mark of the outer mark's exam."""
+    same_exam = marks_model.objects.filter(exam_id=OuterRef("exam_id")).order_by().values("exam_id")
+    return Subquery(same_exam.annotate(value=aggregate).values("value"))
+
+
+def dashboard_sections(enrollment: Enrollment, today: date) -> dict:
+    """
+    Subjects, upcoming exams and marks (with per-exam highest/lowest/rank/percentile) for one
+    enrollment, fetched as three jsonb arrays on a single row.
+    """
+    marks_model = enrollment.academic_year.marks_model
+    own_mark = OuterRef("marks_obtained")
+    taught_in_class = Assignment.objects.filter(
+        subject=OuterRef("pk"), class_offering=OuterRef(OuterRef("class_offering_id"))
+    )
+    subjects = (
+        Subject.objects.filter(Exists(taught_in_class))
+        .order_by("name")
+        .values(payload=JSONObject(id="id", name="name", code="code"))
+    )
+    upcoming = (
+        Exam.objects.filter(assignment__class_offering=OuterRef("class_offering_id"), date__gte=today)
+        .order_by("date")
+        .values(
+            payload=JSONObject(
+                id="id", title="title", subject="assignment__subject__name", date="date", max_marks="max_marks"
+            )
+        )
+    )
+    marks = (
+        marks_model.objects.filter(enrollment_id=OuterRef("pk"))
+        .order_by("-exam__date")
+        .values(
+            payload=JSONObject(
+                exam_id="exam_id",
+                exam_title="exam__title",
+                subject="exam__assignment__subject__name",
+                date="exam__date",
+                marks_obtained="marks_obtained",
+                max_marks="exam__max_marks",
+                highest_mark=_exam_stat(marks_model, Max("marks_obtained")),
+                lowest_mark=_exam_stat(marks_model, Min("marks_obtained")),
+                above=_exam_stat(marks_model, Count("pk", filter=Q(marks_obtained__gt=own_mark))),
+                below=_exam_stat(marks_model, Count("pk", filter=Q(marks_obtained__lt=own_mark))),
+                taken=_exam_stat(marks_model, Count("pk")),
+            )
+        )
+    )
+    row = (
+        Enrollment.objects.filter(pk=enrollment.pk)
+        .annotate(
+            subjects_payload=ArraySubquery(subjects),
+            upcoming_payload=ArraySubquery(upcoming),
+            marks_payload=ArraySubquery(marks),
+        )
+        .values("subjects_payload", "upcoming_payload", "marks_payload")
+        .get()
+    )
+
+    return {
+        "subjects": [{"id": item["id"], "name": item["name"], "code": item["code"]} for item in row["subjects_payload"]],
+        "upcoming_exams": [
+            {
+                "id": item["id"],
+                "title": item["title"],
+                "subject": item["subject"],
+                "date": date.fromisoformat(item["date"]),
+                "max_marks": item["max_marks"],
+            }
+            for item in row["upcoming_payload"]
+        ],
+        "marks": [
+            {
+                "exam_id": item["exam_id"],
+                "exam_title": item["exam_title"],
+                "subject": item["subject"],
+                "date": date.fromisoformat(item["date"]),
+                "marks_obtained": item["marks_obtained"],
+                "max_marks": item["max_marks"],
+                "highest_mark": item["highest_mark"],
+                "lowest_mark": item["lowest_mark"],
+                # Same values as RANK() / PERCENT_RANK() over the exam's marks in get_exam_standings.
+                "rank": item["above"] + 1,
+                "percentile": round(item["below"] / (item["taken"] - 1) * 100, 2) if item["taken"] > 1 else 0.0,
+            }
+            for item in row["marks_payload"]
+        ],
+    }
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Tuple, Union
+
+import django
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, QuerySet, Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import AcademicYear, ClassOffering, Enrollment, EnrollmentSubjectSummary, Mark
+from .services import ServiceError, _grade_from_percent
+
+
+RENDER_CHUNK_SIZE = 16
+
+
+def _percent(scored, possible) -> Optional[float]:
+    return round((scored / possible) * 100, 2) if possible else None
+
+
+def _competition_ranks(totals: dict) -> dict:
+    """Map enrollment_id -> rank within its class ("1224" ranking, ties share a position)."""
+    by_class = {}
+    for enrollment_id, (class_id, percent) in totals.items():
+        by_class.setdefault(class_id, []).append((percent, enrollment_id))
+    ranks = {}
+    for rows in by_class.values():
+        rows.sort(key=lambda item: -item[0])
+        previous, position = None, 0
+        for index, (percent, enrollment_id) in enumerate(rows, start=1):
+            if percent != previous:
+                position, previous = index, percent
+            ranks[enrollment_id] = {"rank": position, "class_size": len(rows)}
+    return ranks
+
+
+def collect_report_cards(enrollments: QuerySet) -> List[dict]:
+    """
+    Build report-card payloads for `enrollments` with a fixed number of set-based queries:
+    the enrollments themselves, per-subject totals, class totals for ranking and prior-year history
+    (live marks plus the subject summaries left behind by archived years).
+    Totals are read from ArchivedMark instead of Mark for archived target years.
+    """
+    targets = list(
+        enrollments.select_related("student__user", "class_offering", "academic_year").order_by(
+            "academic_year__start_date", "class_offering__name", "roll_number", "id"
+        )
+    )
+    if not targets:
+        return []
+    target_ids = [enrollment.id for enrollment in targets]
+    marks_models = sorted({enrollment.academic_year.marks_model for enrollment in targets}, key=lambda m: m.__name__)
+
+    subjects = {}
+    subject_rows = chain.from_iterable(
+        model.objects.filter(enrollment_id__in=target_ids)
+        .values(
+            "enrollment_id",
+            "exam__assignment__subject_id",
+            "exam__assignment__subject__name",
+            "exam__assignment__subject__code",
+        )
+        .annotate(scored=Sum("marks_obtained"), possible=Sum("exam__max_marks"), exams=Count("id"))
+        .order_by("exam__assignment__subject__name")
+        for model in marks_models
+    )
+    for row in subject_rows:
+        percent = _percent(row["scored"], row["possible"])
+        subjects.setdefault(row["enrollment_id"], []).append(
+            {
+                "id": row["exam__assignment__subject_id"],
+                "name": row["exam__assignment__subject__name"],
+                "code": row["exam__assignment__subject__code"],
+                "exams": row["exams"],
+                "scored": row["scored"],
+                "possible": row["possible"],
+                "percent": percent,
+                "grade": _grade_from_percent(percent),
+            }
+        )
+
+    class_ids = {enrollment.class_offering_id for enrollment in targets}
+    class_totals = {
+        row["enrollment_id"]: (row["enrollment__class_offering_id"], _percent(row["scored"], row["possible"]) or 0.0)
+        for model in marks_models
+        for row in model.objects.filter(enrollment__class_offering_id__in=class_ids)
+        .values("enrollment_id", "enrollment__class_offering_id")
+        .annotate(scored=Sum("marks_obtained"), possible=Sum("exam__max_marks"))
+    }
+    ranks = _competition_ranks(class_totals)
+
+    history = {}
+    history_fields = (
+        "enrollment__student_id",
+        "enrollment__academic_year__year",
+        "enrollment__academic_year__start_date",
+        "enrollment__class_offering__name",
+    )
+    student_ids = {enrollment.student_id for enrollment in targets}
+    live_history = (
+        Mark.objects.filter(enrollment__student_id__in=student_ids)
+        .values(*history_fields)
+        .annotate(scored=Sum("marks_obtained"), possible=Sum("exam__max_marks"))
+    )
+    archived_history = (
+        EnrollmentSubjectSummary.objects.filter(enrollment__student_id__in=student_ids)
+        .values(*history_fields)
+        .annotate(scored=Sum("scored"), possible=Sum("possible"))
+    )
+    history_rows = sorted(
+        chain(live_history, archived_history), key=lambda row: row["enrollment__academic_year__start_date"]
+    )
+    for row in history_rows:
+        percent = _percent(row["scored"], row["possible"])
+        history.setdefault(row["enrollment__student_id"], []).append(
+            {
+                "academic_year": row["enrollment__academic_year__year"],
+                "start_date": row["enrollment__academic_year__start_date"],
+                "class_name": row["enrollment__class_offering__name"],
+                "percent": percent,
+                "grade": _grade_from_percent(percent),
+            }
+        )
+
+    generated_at = timezone.now()
+    cards = []
+    for enrollment in targets:
+        subject_list = subjects.get(enrollment.id, [])
+        scored = sum(subject["scored"] for subject in subject_list)
+        possible = sum(subject["possible"] for subject in subject_list)
+        overall = _percent(scored, possible)
+        position = ranks.get(enrollment.id)
+        cards.append(
+            {
+                "enrollment_id": enrollment.id,
+                "academic_year": enrollment.academic_year.year,
+                "class_name": enrollment.class_offering.name,
+                "class_level": enrollment.class_offering.level,
+                "roll_number": enrollment.roll_number,
+                "student": {
+                    "id": enrollment.student_id,
+                    "student_id": enrollment.student.student_id,
+                    "full_name": enrollment.student.full_name or enrollment.student.user.username,
+                },
+                "subjects": subject_list,
+                "total_scored": scored,
+                "total_possible": possible,
+                "overall_percent": overall,
+                "overall_grade": _grade_from_percent(overall),
+                "class_rank": position["rank"] if position else None,
+                "class_size": position["class_size"] if position else None,
+                "history": [
+                    {key: value for key, value in entry.items() if key != "start_date"}
+                    for entry in history.get(enrollment.student_id, [])
+                    if entry["start_date"] < enrollment.academic_year.start_date
+                ],
+                "generated_at": generated_at,
+            }
+        )
+    return cards
+
+
+def report_card_basename(card: dict) -> str:
+    roll = f"{card['roll_number']:03d}" if card["roll_number"] is not None else "000"
+    return f"{card['academic_year']}-class-{card['class_level']}-roll-{roll}-{card['student']['student_id']}"
+
+
+def render_report_card(card: dict) -> Tuple[str, str, str]:
+    """Render one card to (basename, html, json). Runs inside worker processes."""
+    return (
+        report_card_basename(card),
+        render_to_string("academics/report_card.html", {"card": card}),
+        json.dumps(card, cls=DjangoJSONEncoder, indent=2),
+    )
+
+
+def _init_render_worker():
+    # Forked workers inherit a configured Django; spawned ones need setup before templates load.
+    django.setup()
+
+
+def render_report_cards(cards: List[dict], workers: Optional[int] = None) -> Iterator[Tuple[str, str, str]]:
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers <= 1 or len(cards) < 2:
+        yield from map(render_report_card, cards)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker) as pool:
+        yield from pool.map(render_report_card, cards, chunksize=RENDER_CHUNK_SIZE)
+
+
+def write_report_cards(cards: List[dict], destination: Union[str, Path, IO[bytes]], workers: Optional[int] = None) -> int:
+    """Write HTML + JSON for each card into a directory, or a zip when `destination` ends in .zip or is a file object."""
+    rendered = render_report_cards(cards, workers)
+    as_zip = not isinstance(destination, (str, Path)) or str(destination).lower().endswith(".zip")
+    count = 0
+    if as_zip:
+        with zipfile.ZipFile(destination, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for basename, html, payload in rendered:
+                archive.writestr(f"{basename}.html", html)
+                archive.writestr(f"{basename}.json", payload)
+                count += 1
+        return count
+
+    directory = Path(destination)
+    directory.mkdir(parents=True, exist_ok=True)
+    for basename, html, payload in rendered:
+        (directory / f"{basename}.html").write_text(html, encoding="utf-8")
+        (directory / f"{basename}.json").write_text(payload, encoding="utf-8")
+        count += 1
+    return count
+
+
+def report_card_enrollments(year: str, class_level: Optional[str] = None) -> QuerySet:
+    academic_year = AcademicYear.objects.filter(year=year).first()
+    if not academic_year:
+        raise ServiceError(f"Academic year {year} is not configured.")
+    enrollments = Enrollment.objects.filter(academic_year=academic_year)
+    if class_level:
+        class_offering = ClassOffering.objects.filter(academic_year=academic_year, level=str(class_level)).first()
+        if not class_offering:
+            raise ServiceError(f"Class {class_level} is not configured for {year}.")
+        enrollments = enrollments.filter(class_offering=class_offering)
+    return enrollments
+
+
+def generate_report_cards(
+    enrollments: QuerySet, destination: Union[str, Path, IO[bytes]], *, workers: Optional[int] = None
+) -> int:
+    return write_report_cards(collect_report_cards(enrollments), destination, workers)
@@ -1,24 +1,56 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Tuple
 
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import transaction, models
-from django.db.models import Count, Max, Min, Sum
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    Exists,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    IntegerField,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+    Window,
+)
+from django.db.models.functions import Coalesce, NullIf, PercentRank, Rank
 from django.utils import timezone
 
 from authentication.models import StudentProfile, TeacherProfile
-
+from config.async_support import gather_sections
+from config.db_routers import primary_db
+from config.sqlite import serialized_write
+from config.tenancy import tenant_database
+
+from .analytics import invalidate_exam_analytics
+from .events import publish_class_event
+from .pg_payloads import dashboard_sections, json_payloads_enabled, roster_payload
 from .models import (
     AcademicYear,
     ALLOWED_ACADEMIC_YEARS,
     ALLOWED_CLASS_LEVELS,
     Assignment,
+    BackgroundJob,
+    ClassEvent,
     ClassOffering,
     Enrollment,
+    EnrollmentHistorySnapshot,
+    EnrollmentSubjectSummary,
     Exam,
     Mark,
+    PASS_PERCENT,
     PromotionRecord,
     Subject,
 )
@@ -32,7 +64,7 @@ def get_current_academic_year() -> Optional[AcademicYear]:
     return AcademicYear.objects.filter(is_current=True).order_by("-start_date").first()
 
 
-def _get_enrollment(student: StudentProfile, year: Optional[str] = None) -> Optional[Enrollment]:
+def _enrollment_queryset(student: StudentProfile, year: Optional[str], current_year: Optional[AcademicYear]):
     qs = (
         Enrollment.objects.select_related("academic_year", "class_offering")
         .filter(student=student)
@@ -40,11 +72,21 @@ def _get_enrollment(student: StudentProfile, year: Optional[str] = None) -> Opti
     )
     if year:
         qs = qs.filter(academic_year__year=year)
-    else:
-        current_year = get_current_academic_year()
-        if current_year:
-            qs = qs.filter(academic_year=current_year)
-    return qs.first()
+    elif current_year:
+        qs = qs.filter(academic_year=current_year)
+    return qs
+
+
+def _get_enrollment(student: StudentProfile, year: Optional[str] = None) -> Optional[Enrollment]:
+    current_year = None if year else get_current_academic_year()
+    return _enrollment_queryset(student, year, current_year).first()
+
+
+async def _aget_enrollment(student: StudentProfile, year: Optional[str] = None) -> Optional[Enrollment]:
+    current_year = None
+    if not year:
+        current_year = await AcademicYear.objects.filter(is_current=True).order_by("-start_date").afirst()
+    return await _enrollment_queryset(student, year, current_year).afirst()
 
 
 def _calculate_grade(marks: Iterable[Mark]) -> Optional[str]:
@@ -92,24 +134,195 @@ def _calculate_percentage(marks: Iterable[Mark]) -> float:
     return (total_scored / total_possible) * 100
 
 
-def _update_enrollment_grade(enrollment: Enrollment):
-    marks_qs = Mark.objects.filter(enrollment=enrollment).select_related("exam")
-    grade = _calculate_grade(marks_qs)
-    Enrollment.objects.filter(pk=enrollment.pk).update(grade=grade, updated_at=timezone.now())
+def _update_enrollment_grades(enrollment_ids: Iterable[int]):
+    """Recompute cached grades for many enrollments with one aggregate and one bulk update."""
+    enrollment_ids = set(enrollment_ids)
+    totals = {
+        row["enrollment_id"]: row
+        for row in Mark.objects.filter(enrollment_id__in=enrollment_ids)
+        .values("enrollment_id")
+        .annotate(scored=Sum("marks_obtained"), possible=Sum("exam__max_marks"))
+    }
+    now = timezone.now()
+    updates = []
+    for enrollment_id in enrollment_ids:
+        row = totals.get(enrollment_id)
+        percent = (row["scored"] / row["possible"]) * 100 if row and row["possible"] else None
+        updates.append(Enrollment(pk=enrollment_id, grade=_grade_from_percent(percent), updated_at=now))
+    Enrollment.objects.bulk_update(updates, ["grade", "updated_at"])
+
+
+def _own_row(field: str, value) -> Window:
+    """
+    Window flagging the row that matches `field=value`. Filtering on it is applied after the other
+    window functions are evaluated, so ranks still cover the whole partition.
+    """
+    flag = Case(When(**{field: value}, then=Value(1)), default=Value(0), output_field=IntegerField())
+    return Window(Max(flag), partition_by=[F("pk")])
+
+
+def get_exam_standings(enrollment: Enrollment, exam_ids: Iterable[int]) -> dict:
+    """Highest/lowest plus the enrollment's rank and percentile for each exam, in one windowed query."""
+    exam_ids = list(exam_ids)
+    if not exam_ids:
+        return {}
+    by_exam = [F("exam_id")]
+    rows = (
+        enrollment.academic_year.marks_model.objects.filter(exam_id__in=exam_ids)
+        .annotate(
+            highest=Window(Max("marks_obtained"), partition_by=by_exam),
+            lowest=Window(Min("marks_obtained"), partition_by=by_exam),
+            rank=Window(Rank(), partition_by=by_exam, order_by=F("marks_obtained").desc()),
+            percent_rank=Window(PercentRank(), partition_by=by_exam, order_by=F("marks_obtained").asc()),
+            own=_own_row("enrollment_id", enrollment.id),
+        )
+        .filter(own=1)
+        .order_by()
+        .values("exam_id", "highest", "lowest", "rank", "percent_rank")
+    )
+    return {
+        row["exam_id"]: {
+            "highest": row["highest"],
+            "lowest": row["lowest"],
+            "rank": row["rank"],
+            "percentile": round(row["percent_rank"] * 100, 2),
+        }
+        for row in rows
+    }
 
 
-def get_student_dashboard(student: StudentProfile, year: Optional[str] = None) -> dict:
-    enrollment = _get_enrollment(student, year)
+def get_class_standing(enrollment: Enrollment) -> dict:
+    """Overall rank of the enrollment among classmates with marks, ranked by percent in SQL."""
+    marks = enrollment.academic_year.marks_relation
+    row = (
+        Enrollment.objects.filter(
+            class_offering_id=enrollment.class_offering_id, academic_year_id=enrollment.academic_year_id
+        )
+        .annotate(scored=Sum(f"{marks}__marks_obtained"), possible=Sum(f"{marks}__exam__max_marks"))
+        .filter(possible__gt=0)
+        .annotate(percent=ExpressionWrapper(F("scored") * 1.0 / F("possible"), output_field=FloatField()))
+        .annotate(
+            class_rank=Window(Rank(), order_by=F("percent").desc()),
+            class_size=Window(Count("pk")),
+            own=_own_row("pk", enrollment.id),
+        )
+        .filter(own=1)
+        .order_by()
+        .values("class_rank", "class_size")
+        .first()
+    )
+    return row or {"class_rank": None, "class_size": None}
+
+
+def _archived_history_entry(enrollment: Enrollment) -> dict:
+    """History entry for an archived year, built from the summaries left by academics.archive."""
+    summaries = list(enrollment.subject_summaries.select_related("subject"))
+    total_scored = sum(summary.scored for summary in summaries)
+    total_possible = sum(summary.possible for summary in summaries)
+    subjects = []
+    for summary in summaries:
+        percent = round((summary.scored / summary.possible) * 100, 2) if summary.possible else None
+        subjects.append(
+            {
+                "id": summary.subject_id,
+                "name": summary.subject.name,
+                "code": summary.subject.code,
+                "percent": percent,
+                "grade": _grade_from_percent(percent),
+            }
+        )
+    overall_percent = round((total_scored / total_possible) * 100, 2) if total_possible else None
+    return {
+        "academic_year": enrollment.academic_year.year,
+        "class_name": enrollment.class_offering.name,
+        "roll_number": enrollment.roll_number,
+        "total_exams": sum(summary.exams_taken for summary in summaries),
+        "overall_percent": overall_percent,
+        "overall_grade": enrollment.grade or _grade_from_percent(overall_percent),
+        "subjects": subjects,
+    }
+
+
+def _dashboard_sections(enrollment: Enrollment) -> dict:
+    """ORM path for the current-year dashboard lists; academics.pg_payloads builds the same on PostgreSQL."""
+    subjects_qs = (
+        Subject.objects.filter(assignments__class_offering=enrollment.class_offering)
+        .distinct()
+        .order_by("name")
+    )
+
+    today = timezone.localdate()
+    upcoming_exams_qs = (
+        Exam.objects.filter(
+            assignment__class_offering=enrollment.class_offering,
+            assignment__subject__in=subjects_qs,
+            date__gte=today,
+        )
+        .select_related("assignment__subject")
+        .order_by("date")
+    )
+
+    marks_qs = list(
+        enrollment.academic_year.marks_model.objects.filter(enrollment=enrollment)
+        .select_related("exam__assignment__subject")
+        .order_by("-exam__date")
+    )
 
-    # Aggregate lifetime history across all enrollments
+    exam_stats_map = get_exam_standings(enrollment, [mark.exam_id for mark in marks_qs])
+
+    subjects = [
+        {"id": subject.id, "name": subject.name, "code": subject.code} for subject in subjects_qs
+    ]
+    upcoming_exams = [
+        {
+            "id": exam.id,
+            "title": exam.title,
+            "subject": exam.assignment.subject.name,
+            "date": exam.date,
+            "max_marks": exam.max_marks,
+        }
+        for exam in upcoming_exams_qs
+    ]
+    marks = [
+        {
+            "exam_id": mark.exam_id,
+            "exam_title": mark.exam.title,
+            "subject": mark.exam.assignment.subject.name,
+            "date": mark.exam.date,
+            "marks_obtained": mark.marks_obtained,
+            "max_marks": mark.exam.max_marks,
+            "highest_mark": exam_stats_map.get(mark.exam_id, {}).get("highest"),
+            "lowest_mark": exam_stats_map.get(mark.exam_id, {}).get("lowest"),
+            "rank": exam_stats_map.get(mark.exam_id, {}).get("rank"),
+            "percentile": exam_stats_map.get(mark.exam_id, {}).get("percentile"),
+        }
+        for mark in marks_qs
+    ]
+
+    return {"subjects": subjects, "upcoming_exams": upcoming_exams, "marks": marks}
+
+
+def _student_history(student: StudentProfile) -> List[dict]:
+    """Lifetime history across all enrollments, newest year first."""
     enrollments = (
         Enrollment.objects.filter(student=student)
         .select_related("academic_year", "class_offering")
         .order_by("-academic_year__start_date")
     )
 
+    # Closed years are read from frozen snapshots (academics.archive); only open years are recomputed.
+    snapshots = dict(
+        EnrollmentHistorySnapshot.objects.filter(student=student).values_list("enrollment_id", "payload")
+    )
     history_entries = []
     for enr in enrollments:
+        # A snapshot left on a year that has since become current would hide its live marks.
+        if enr.id in snapshots and not enr.academic_year.is_current:
+            history_entries.append(snapshots[enr.id])
+            continue
+        if enr.academic_year.is_archived:
+            history_entries.append(_archived_history_entry(enr))
+            continue
         enr_marks_qs = (
             Mark.objects.filter(enrollment=enr)
             .select_related("exam__assignment__subject")
@@ -156,116 +369,204 @@ def get_student_dashboard(student: StudentProfile, year: Optional[str] = None) -
             }
         )
 
-    # Current enrollment-specific data
-    if enrollment:
-        subjects_qs = (
-            Subject.objects.filter(assignments__class_offering=enrollment.class_offering)
-            .distinct()
-            .order_by("name")
-        )
-
-        today = timezone.localdate()
-        upcoming_exams_qs = (
-            Exam.objects.filter(
-                assignment__class_offering=enrollment.class_offering,
-                assignment__subject__in=subjects_qs,
-                date__gte=today,
-            )
-            .select_related("assignment__subject")
-            .order_by("date")
-        )
-
-        marks_qs = list(
-            Mark.objects.filter(enrollment=enrollment)
-            .select_related("exam__assignment__subject")
-            .order_by("-exam__date")
-        )
-
-        exam_stats_map = {}
-        if marks_qs:
-            exam_stats = (
-                Mark.objects.filter(exam_id__in=[mark.exam_id for mark in marks_qs])
-                .values("exam_id")
-                .annotate(highest=Max("marks_obtained"), lowest=Min("marks_obtained"))
-            )
-            exam_stats_map = {
-                row["exam_id"]: {"highest": row["highest"], "lowest": row["lowest"]} for row in exam_stats
-            }
-
-        subjects = [
-            {"id": subject.id, "name": subject.name, "code": subject.code} for subject in subjects_qs
-        ]
-        upcoming_exams = [
-            {
-                "id": exam.id,
-                "title": exam.title,
-                "subject": exam.assignment.subject.name,
-                "date": exam.date,
-                "max_marks": exam.max_marks,
-            }
-            for exam in upcoming_exams_qs
-        ]
-        marks = [
-            {
-                "exam_id": mark.exam_id,
-                "exam_title": mark.exam.title,
-                "subject": mark.exam.assignment.subject.name,
-                "date": mark.exam.date,
-                "marks_obtained": mark.marks_obtained,
-                "max_marks": mark.exam.max_marks,
-                "highest_mark": exam_stats_map.get(mark.exam_id, {}).get("highest"),
-                "lowest_mark": exam_stats_map.get(mark.exam_id, {}).get("lowest"),
-            }
-            for mark in marks_qs
-        ]
-
-        current_grade = enrollment.grade or _calculate_grade(marks_qs)
-
+    return history_entries
+
+
+def _current_sections(enrollment: Enrollment) -> dict:
+    if json_payloads_enabled():
+        return dashboard_sections(enrollment, timezone.localdate())
+    return _dashboard_sections(enrollment)
+
+
+def _student_dashboard_payload(
+    student: StudentProfile,
+    enrollment: Optional[Enrollment],
+    history_entries: List[dict],
+    sections: Optional[dict] = None,
+    class_standing: Optional[dict] = None,
+) -> dict:
+    """Assemble the dashboard from already-fetched sections; runs no queries."""
+    profile = {
+        "id": student.id,
+        "user_id": student.user_id,
+        "full_name": student.full_name,
+        "username": student.user.username,
+        "student_id": student.student_id,
+    }
+    if not enrollment:
+        # No enrollment at all; return history only and empty current sections
         return {
-            "profile": {
-            "id": enrollment.student.id,
-            "user_id": enrollment.student.user_id,
-            "full_name": enrollment.student.full_name,
-            "username": enrollment.student.user.username,
-            "student_id": enrollment.student.student_id,
-        },
-            "enrollment": {
-                "id": enrollment.id,
-                "academic_year": enrollment.academic_year.year,
-                "class_offering": {
-                    "id": enrollment.class_offering.id,
-                    "name": enrollment.class_offering.name,
-                    "level": enrollment.class_offering.level,
-                },
-                "roll_number": enrollment.roll_number,
-                "student_id": enrollment.student.student_id,
-                "grade": current_grade,
-            },
-            "subjects": subjects,
-            "upcoming_exams": upcoming_exams,
-            "marks": marks,
-            "current_grade": current_grade,
+            "profile": profile,
+            "enrollment": None,
+            "subjects": [],
+            "upcoming_exams": [],
+            "marks": [],
+            "current_grade": None,
             "history": history_entries,
         }
 
-    # No enrollment at all; return history only and empty current sections
+    marks = sections["marks"]
+    total_possible = sum(mark["max_marks"] for mark in marks)
+    current_grade = enrollment.grade or (
+        _grade_from_percent(sum(mark["marks_obtained"] for mark in marks) / total_possible * 100)
+        if total_possible
+        else None
+    )
     return {
-        "profile": {
-            "id": student.id,
-            "user_id": student.user_id,
-            "full_name": student.full_name,
-            "username": student.user.username,
+        "profile": profile,
+        "enrollment": {
+            "id": enrollment.id,
+            "academic_year": enrollment.academic_year.year,
+            "class_offering": {
+                "id": enrollment.class_offering.id,
+                "name": enrollment.class_offering.name,
+                "level": enrollment.class_offering.level,
+            },
+            "roll_number": enrollment.roll_number,
             "student_id": student.student_id,
+            "grade": current_grade,
+            "class_rank": class_standing["class_rank"],
+            "class_size": class_standing["class_size"],
         },
-        "enrollment": None,
-        "subjects": [],
-        "upcoming_exams": [],
-        "marks": [],
-        "current_grade": None,
+        "subjects": sections["subjects"],
+        "upcoming_exams": sections["upcoming_exams"],
+        "marks": marks,
+        "current_grade": current_grade,
         "history": history_entries,
     }
 
 
+def get_student_dashboard(student: StudentProfile, year: Optional[str] = None) -> dict:
+    enrollment = _get_enrollment(student, year)
+    history_entries = _student_history(student)
+    if not enrollment:
+        return _student_dashboard_payload(student, None, history_entries)
+    return _student_dashboard_payload(
+        student, enrollment, history_entries, _current_sections(enrollment), get_class_standing(enrollment)
+    )
+
+
+async def aget_student_dashboard(
+    student: StudentProfile, year: Optional[str] = None, *, statement_budget: Optional[int] = None
+) -> dict:
+    """
+    get_student_dashboard for async views: history, the current-year lists and the class standing
+    are independent, so they are fetched at the same time (see gather_sections).
+    """
+    enrollment = await _aget_enrollment(student, year)
+    if not enrollment:
+        (history_entries,) = await gather_sections((_student_history, student), statement_budget=statement_budget)
+        return _student_dashboard_payload(student, None, history_entries)
+    history_entries, sections, class_standing = await gather_sections(
+        (_student_history, student),
+        (_current_sections, enrollment),
+        (get_class_standing, enrollment),
+        statement_budget=statement_budget,
+    )
+    return _student_dashboard_payload(student, enrollment, history_entries, sections, class_standing)
+
+
+def _trend_cache_key(student_id: int, year: str) -> str:
+    return f"academics:trends:{student_id}:{year}"
+
+
+def invalidate_student_trends(student_ids: Iterable[int], year: str):
+    """Drop the cached trend rows of a closed year, e.g. when its history is re-frozen after a correction."""
+    cache.delete_many([_trend_cache_key(student_id, year) for student_id in set(student_ids)])
+
+
+def get_student_trends(student: StudentProfile) -> dict:
+    """
+    Per-subject percent series across every academic year the student was enrolled in.
+    Subject totals come from one grouped aggregate; years that are closed (not current and
+    already ended) only change through the archive/freeze steps, so their rows are cached
+    without expiry until freeze_history_snapshots invalidates them.
+    """
+    today = timezone.localdate()
+    years = list(
+        Enrollment.objects.filter(student=student)
+        .order_by("academic_year__start_date")
+        .values_list(
+            "academic_year__year", "academic_year__is_current", "academic_year__end_date", "academic_year__is_archived"
+        )
+    )
+    closed = [year for year, is_current, end_date, _ in years if not is_current and end_date < today]
+    archived = {year for year, _, _, is_archived in years if is_archived}
+    keys = {year: _trend_cache_key(student.id, year) for year in closed}
+    cached = cache.get_many(list(keys.values()))
+    rows_by_year = {year: cached[key] for year, key in keys.items() if key in cached}
+
+    pending = [year for year, _, _, _ in years if year not in rows_by_year]
+    if pending:
+        fresh = {year: [] for year in pending}
+        live = [year for year in pending if year not in archived]
+        if live:
+            aggregated = (
+                Mark.objects.filter(enrollment__student=student, enrollment__academic_year__year__in=live)
+                .values(
+                    "enrollment__academic_year__year",
+                    "exam__assignment__subject_id",
+                    "exam__assignment__subject__name",
+                    "exam__assignment__subject__code",
+                )
+                .annotate(scored=Sum("marks_obtained"), possible=Sum("exam__max_marks"))
+                .order_by()
+            )
+            for row in aggregated:
+                fresh[row["enrollment__academic_year__year"]].append(
+                    {
+                        "id": row["exam__assignment__subject_id"],
+                        "name": row["exam__assignment__subject__name"],
+                        "code": row["exam__assignment__subject__code"],
+                        "scored": row["scored"],
+                        "possible": row["possible"],
+                    }
+                )
+        if archived.intersection(pending):
+            summaries = EnrollmentSubjectSummary.objects.filter(
+                enrollment__student=student, academic_year__year__in=archived.intersection(pending)
+            ).values("academic_year__year", "subject_id", "subject__name", "subject__code", "scored", "possible")
+            for row in summaries:
+                fresh[row["academic_year__year"]].append(
+                    {
+                        "id": row["subject_id"],
+                        "name": row["subject__name"],
+                        "code": row["subject__code"],
+                        "scored": row["scored"],
+                        "possible": row["possible"],
+                    }
+                )
+        rows_by_year.update(fresh)
+        cache.set_many({keys[year]: fresh[year] for year in pending if year in keys}, timeout=None)
+
+    def point(year, scored, possible, previous):
+        percent = round((scored / possible) * 100, 2) if possible else None
+        delta = round(percent - previous, 2) if percent is not None and previous is not None else None
+        return {"academic_year": year, "percent": percent, "grade": _grade_from_percent(percent), "delta": delta}
+
+    subjects = {}
+    overall = []
+    for year, _, _, _ in years:
+        rows = rows_by_year.get(year, [])
+        for row in rows:
+            entry = subjects.setdefault(
+                row["id"], {"id": row["id"], "name": row["name"], "code": row["code"], "series": []}
+            )
+            previous = entry["series"][-1]["percent"] if entry["series"] else None
+            entry["series"].append(point(year, row["scored"], row["possible"], previous))
+        if rows:
+            previous = overall[-1]["percent"] if overall else None
+            overall.append(
+                point(year, sum(row["scored"] for row in rows), sum(row["possible"] for row in rows), previous)
+            )
+
+    return {
+        "years": [year for year, _, _, _ in years],
+        "overall": overall,
+        "subjects": sorted(subjects.values(), key=lambda subject: subject["name"]),
+    }
+
+
 def _ensure_assignment_current_year(assignment: Assignment):
     current_year = get_current_academic_year()
     if not current_year or assignment.academic_year_id != current_year.id:
@@ -290,6 +591,8 @@ def _ensure_exam_limits(assignment: Assignment):
         raise ServiceError("Maximum 3 exams per class and subject")
 
 
+@primary_db
+@serialized_write()
 def create_exam(
     *,
     assignment: Assignment,
@@ -313,15 +616,18 @@ def create_exam(
 
     _ensure_exam_limits(assignment)
 
-    return Exam.objects.create(
-        assignment=assignment,
-        academic_year=assignment.academic_year,
-        title=title,
-        date=exam_date,
-        max_marks=max_marks,
-        status=status,
-        created_by=teacher or assignment.teacher,
-    )
+    with transaction.atomic(using=tenant_database()):
+        exam = Exam.objects.create(
+            assignment=assignment,
+            academic_year=assignment.academic_year,
+            title=title,
+            date=exam_date,
+            max_marks=max_marks,
+            status=status,
+            created_by=teacher or assignment.teacher,
+        )
+        publish_class_event(exam, ClassEvent.KIND_EXAM_SCHEDULED)
+    return exam
 
 
 def list_teacher_exams(teacher: TeacherProfile, year_filter: Optional[str] = None):
@@ -370,17 +676,47 @@ def list_teacher_exams_for_class(teacher: TeacherProfile, class_offering_id: int
     )
 
 
-def get_teacher_dashboard(teacher: TeacherProfile) -> dict:
-    current_year = get_current_academic_year()
+# Dashboard exam lists are capped; exam_counts carries the full totals.
+DASHBOARD_RECENT_EXAMS = 10
+
+
+def _count_subquery(queryset, group_field: str):
+    counted = queryset.order_by().values(group_field).annotate(n=Count("pk")).values("n")
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def _teacher_assignments(teacher: TeacherProfile, current_year: Optional[AcademicYear]) -> List[dict]:
+    """Assignments carry their own aggregates as correlated subqueries (one query)."""
+    today = timezone.localdate()
     assignments_qs = Assignment.objects.filter(teacher=teacher)
     if current_year:
         assignments_qs = assignments_qs.filter(academic_year=current_year)
 
-    assignments_qs = assignments_qs.select_related(
-        "academic_year", "class_offering", "subject"
-    ).annotate(student_count=Count("class_offering__enrollments"))
+    exam_percent = ExpressionWrapper(F("marks_obtained") * 100.0 / F("exam__max_marks"), output_field=FloatField())
+    class_average = (
+        Mark.objects.filter(exam__assignment=OuterRef("pk"))
+        .order_by()
+        .values("exam__assignment")
+        .annotate(average=Avg(exam_percent))
+        .values("average")
+    )
+    assignment_exams = Exam.objects.filter(assignment=OuterRef("pk"))
+    assignments_qs = (
+        assignments_qs.select_related("academic_year", "class_offering", "subject")
+        .annotate(
+            student_count=_count_subquery(
+                Enrollment.objects.filter(class_offering=OuterRef("class_offering")), "class_offering"
+            ),
+            exams_held=_count_subquery(assignment_exams.filter(date__lte=today), "assignment"),
+            exams_awaiting_marks=_count_subquery(
+                assignment_exams.filter(~Exists(Mark.objects.filter(exam=OuterRef("pk")))), "assignment"
+            ),
+            class_average=Subquery(class_average, output_field=FloatField()),
+        )
+        .order_by("class_offering__name", "subject__name")
+    )
 
-    assignments = [
+    return [
         {
             "id": assignment.id,
             "academic_year": assignment.academic_year.year,
@@ -395,23 +731,38 @@ def get_teacher_dashboard(teacher: TeacherProfile) -> dict:
                 "code": assignment.subject.code,
             },
             "student_count": assignment.student_count,
+            "exams_held": assignment.exams_held,
+            "exams_awaiting_marks": assignment.exams_awaiting_marks,
+            "class_average": round(assignment.class_average, 2) if assignment.class_average is not None else None,
         }
         for assignment in assignments_qs
     ]
 
+
+def _teacher_exam_lists(teacher: TeacherProfile) -> dict:
+    """Exam lists are capped at DASHBOARD_RECENT_EXAMS; totals come from one filtered aggregate."""
+    today = timezone.localdate()
+    teacher_exams = Exam.objects.filter(created_by=teacher)
     current_exams = list(
-        Exam.objects.filter(created_by=teacher, date__gte=timezone.localdate())
-        .order_by("date")
-        .values("id", "title", "date", "status")
+        teacher_exams.filter(date__gte=today).order_by("date").values("id", "title", "date", "status")[
+            :DASHBOARD_RECENT_EXAMS
+        ]
     )
     past_exams = list(
-        Exam.objects.filter(created_by=teacher, date__lt=timezone.localdate())
-        .order_by("-date")
-        .values("id", "title", "date")
+        teacher_exams.filter(date__lt=today).order_by("-date").values("id", "title", "date")[:DASHBOARD_RECENT_EXAMS]
+    )
+    exam_counts = teacher_exams.aggregate(
+        current=Count("pk", filter=Q(date__gte=today)),
+        past=Count("pk", filter=Q(date__lt=today)),
+        total=Count("pk"),
     )
 
-    subject_count = assignments_qs.values("subject").distinct().count()
+    return {"current_exams": current_exams, "past_exams": past_exams, "exam_counts": exam_counts}
 
+
+def _teacher_dashboard_payload(
+    teacher: TeacherProfile, current_year: Optional[AcademicYear], assignments: List[dict], exam_lists: dict
+) -> dict:
     return {
         "teacher_profile": {
             "id": teacher.id,
@@ -421,63 +772,126 @@ def get_teacher_dashboard(teacher: TeacherProfile) -> dict:
             "username": teacher.user.username,
         },
         "assignments": assignments,
-        "current_exams": current_exams,
-        "past_exams": past_exams,
-        "subject_count": subject_count,
+        **exam_lists,
+        "subject_count": len({assignment["subject"]["id"] for assignment in assignments}),
         "current_year": {"id": current_year.id, "year": current_year.year} if current_year else None,
     }
 
 
-def get_exam_roster(exam: Exam) -> List[dict]:
-    enrollments = Enrollment.objects.filter(
-        class_offering=exam.assignment.class_offering, academic_year=exam.academic_year
-    ).select_related("student__user")
-    marks_by_enrollment = {mark.enrollment_id: mark for mark in exam.marks.all()}
-    roster = []
-    for enrollment in enrollments:
-        mark = marks_by_enrollment.get(enrollment.id)
-        roster.append(
-            {
-                "student_enrollment_id": enrollment.id,
-                "student_name": enrollment.student.full_name or enrollment.student.user.username,
-                "student_id": enrollment.student.student_id,
-                "roll": enrollment.roll_number,
-                "existing_mark": mark.marks_obtained if mark else None,
-            }
+def get_teacher_dashboard(teacher: TeacherProfile) -> dict:
+    """Teacher overview in a fixed number of queries."""
+    current_year = get_current_academic_year()
+    return _teacher_dashboard_payload(
+        teacher, current_year, _teacher_assignments(teacher, current_year), _teacher_exam_lists(teacher)
+    )
+
+
+async def aget_teacher_dashboard(teacher: TeacherProfile, *, statement_budget: Optional[int] = None) -> dict:
+    """get_teacher_dashboard for async views; assignments and exam lists are fetched concurrently."""
+    current_year = await AcademicYear.objects.filter(is_current=True).order_by("-start_date").afirst()
+    assignments, exam_lists = await gather_sections(
+        (_teacher_assignments, teacher, current_year),
+        (_teacher_exam_lists, teacher),
+        statement_budget=statement_budget,
+    )
+    return _teacher_dashboard_payload(teacher, current_year, assignments, exam_lists)
+
+
+def student_name_expression(prefix: str = "student__"):
+    """Display name used across rosters and exports: full name, falling back to the username."""
+    return Coalesce(NullIf(F(f"{prefix}full_name"), Value("")), F(f"{prefix}user__username"))
+
+
+ROSTER_FIELDS = ("student_enrollment_id", "student_name", "student_id", "roll", "existing_mark")
+ROSTER_COLUMNS = ("pk", "student_name", "student__student_id", "roll_number", "existing_mark")
+
+
+def exam_roster_queryset(exam: Exam):
+    """
+    Enrollments for the exam's class annotated with their mark (NULL when missing) and the
+    exam's lock state, so the roster and allow_edit come back in one round trip.
+    """
+    marks = exam.academic_year.marks_model.objects
+    mark = marks.filter(exam_id=exam.id, enrollment=OuterRef("pk")).values("marks_obtained")[:1]
+    return (
+        Enrollment.objects.filter(
+            class_offering_id=exam.assignment.class_offering_id, academic_year_id=exam.academic_year_id
+        )
+        .annotate(
+            student_name=student_name_expression(),
+            existing_mark=Subquery(mark),
+            locked=Value(True) if exam.academic_year.is_archived else Exists(marks.filter(exam_id=exam.id)),
         )
-    return roster
+        .order_by("roll_number", "pk")
+    )
+
+
+def get_exam_roster(exam: Exam) -> List[dict]:
+    return get_exam_roster_with_lock(exam)[0]
+
+
+def get_exam_roster_with_lock(exam: Exam) -> Tuple[List[dict], bool]:
+    """Roster plus allow_edit; only an empty class needs the separate can_edit_marks check."""
+    if json_payloads_enabled():
+        roster, locked = roster_payload(exam_roster_queryset(exam))
+    else:
+        rows = list(exam_roster_queryset(exam).values_list(*ROSTER_COLUMNS, "locked"))
+        roster = [dict(zip(ROSTER_FIELDS, row)) for row in rows]
+        locked = rows[0][-1] if rows else None
+    if locked is None:
+        return [], can_edit_marks(exam)
+    return roster, not locked
 
 
 def can_edit_marks(exam: Exam) -> bool:
-    return not exam.marks.exists()
+    return not exam.academic_year.is_archived and not exam.marks.exists()
 
 
+@primary_db
+@serialized_write()
 def save_marks(exam: Exam, marks: List[dict], *, actor: TeacherProfile, is_admin: bool = False) -> int:
     if not can_edit_marks(exam):
         raise ServiceError("Marks already entered and cannot be modified")
     _ensure_teacher_assignment(exam.assignment, actor, is_admin)
 
-    with transaction.atomic():
-        created = 0
-        touched_enrollments = set()
-        for entry in marks:
-            enrollment_id = entry.get("student_enrollment_id")
-            marks_obtained = entry.get("marks_obtained")
-            try:
-                enrollment = Enrollment.objects.get(id=enrollment_id, class_offering=exam.assignment.class_offering)
-            except Enrollment.DoesNotExist as exc:
-                raise ServiceError("Invalid student enrollment") from exc
-
-            if marks_obtained is None or marks_obtained > exam.max_marks or marks_obtained < 0:
-                raise ServiceError("Marks obtained must be between 0 and the exam maximum.")
-
-            Mark.objects.create(exam=exam, enrollment=enrollment, marks_obtained=marks_obtained)
-            created += 1
-            touched_enrollments.add(enrollment)
+    requested_ids = []
+    for entry in marks:
+        try:
+            requested_ids.append(int(entry.get("student_enrollment_id")))
+        except (TypeError, ValueError) as exc:
+            raise ServiceError("Invalid student enrollment") from exc
+    valid_ids = set(
+        Enrollment.objects.filter(
+            id__in=requested_ids, class_offering=exam.assignment.class_offering
+        ).values_list("id", flat=True)
+    )
 
-        for enrollment in touched_enrollments:
-            _update_enrollment_grade(enrollment)
-    return created
+    new_marks = []
+    seen_ids = set()
+    for enrollment_id, entry in zip(requested_ids, marks):
+        if enrollment_id not in valid_ids:
+            raise ServiceError("Invalid student enrollment")
+        if enrollment_id in seen_ids:
+            raise ServiceError("Duplicate marks for the same student enrollment")
+        marks_obtained = entry.get("marks_obtained")
+        if (
+            not isinstance(marks_obtained, int)
+            or isinstance(marks_obtained, bool)
+            or not 0 <= marks_obtained <= exam.max_marks
+        ):
+            raise ServiceError("Marks obtained must be between 0 and the exam maximum.")
+        seen_ids.add(enrollment_id)
+        new_marks.append(Mark(exam=exam, enrollment_id=enrollment_id, marks_obtained=marks_obtained))
+
+    with transaction.atomic(using=tenant_database()):
+        Mark.objects.bulk_create(new_marks)
+        _update_enrollment_grades(seen_ids)
+        if new_marks:
+            publish_class_event(exam, ClassEvent.KIND_MARKS_PUBLISHED)
+        transaction.on_commit(
+            lambda: invalidate_exam_analytics(exam.id, exam.assignment_id), using=tenant_database()
+        )
+    return len(new_marks)
 
 
 def _get_or_create_class_for_year(academic_year: AcademicYear, level: str) -> ClassOffering:
@@ -496,6 +910,7 @@ def _get_or_create_class_for_year(academic_year: AcademicYear, level: str) -> Cl
     return class_offering
 
 
+@primary_db
 def promote_class(
     class_offering: ClassOffering, *, actor=None, notes: str = ""
 ) -> PromotionRecord:
@@ -531,7 +946,7 @@ def promote_class(
     for enrollment in enrollments:
         marks = Mark.objects.filter(enrollment=enrollment).select_related("exam")
         percentage = _calculate_percentage(marks)
-        target_class = promoted_class if percentage >= 40 else repeat_class
+        target_class = promoted_class if percentage >= PASS_PERCENT else repeat_class
 
         target_enrollment = Enrollment.objects.filter(
             student=enrollment.student, academic_year=target_year
@@ -551,7 +966,7 @@ def promote_class(
         target_enrollment._allow_promotion = True
         target_enrollment.save()
 
-        if percentage >= 40:
+        if percentage >= PASS_PERCENT:
             promoted_count += 1
         else:
             retained_count += 1
@@ -566,3 +981,13 @@ def promote_class(
         notes=notes or "",
         performed_by=actor,
     )
+
+
+def enqueue(name: str, *, user=None, run_after=None, max_attempts=None, **params) -> BackgroundJob:
+    """
+    Queue the academics.jobs handler `name` with keyword `params` instead of doing the work inline.
+    The job starts after the current transaction commits; follow it on the returned row.
+    """
+    from .jobs import enqueue_job  # jobs builds on this module
+
+    return enqueue_job(name, params=params, user=user, run_after=run_after, max_attempts=max_attempts)
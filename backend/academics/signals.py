@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .analytics import invalidate_exam_analytics
+from .models import Mark
+
+
+@receiver(post_save, sender=Mark)
+@receiver(post_delete, sender=Mark)
+def mark_changed(sender, instance, **kwargs):
+    # save_marks uses bulk_create and invalidates explicitly; this covers admin edits and deletes.
+    invalidate_exam_analytics(instance.exam_id)
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from authentication.tests.fixtures import create_student, create_teacher
+from academics.admin import EstimatedCountPaginator
+from academics.models import Enrollment, Mark
+from academics.tests.fixtures import (
+    create_academic_year,
+    create_assignment,
+    create_class_offering,
+    create_exam,
+    create_subject,
+    enroll_student,
+)
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        admin_user = get_user_model().objects.create_superuser(username="admin", email="admin@example.com", password="x")
+        self.client.force_login(admin_user)
+        _, self.teacher = create_teacher()
+        self.year = create_academic_year()
+        self.class_offering = create_class_offering(self.year)
+        subjects = [create_subject(), create_subject("ENGLISH", "ENG-101"), create_subject("MATH", "MAT-101")]
+        self.exams = [
+            create_exam(create_assignment(self.teacher, self.year, self.class_offering, subject)) for subject in subjects
+        ]
+        self.students = 0
+        self.add_students(2)
+
+    def add_students(self, count):
+        for _ in range(count):
+            self.students += 1
+            _, student = create_student(username=f"admin{self.students}", email=f"admin{self.students}@example.com")
+            enrollment = enroll_student(student, self.year, self.class_offering, roll_number=str(self.students))
+            Mark.objects.bulk_create(Mark(exam=exam, enrollment=enrollment, marks_obtained=50) for exam in self.exams)
+
+    def assert_constant_queries(self, url):
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.add_students(4)
+        with self.assertNumQueries(len(small)):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_mark_changelist_query_count_is_constant(self):
+        response = self.assert_constant_queries(reverse("admin:academics_mark_changelist"))
+        self.assertContains(response, "Admin6")
+
+    def test_enrollment_changelist_query_count_is_constant(self):
+        self.assert_constant_queries(reverse("admin:academics_enrollment_changelist"))
+
+    def test_exam_changelist_query_count_is_constant(self):
+        self.assert_constant_queries(reverse("admin:academics_exam_changelist"))
+
+    def test_change_forms_use_autocomplete_widgets(self):
+        mark = Mark.objects.first()
+        response = self.client.get(reverse("admin:academics_mark_change", args=[mark.pk]))
+        self.assertContains(response, "admin-autocomplete")
+
+    def test_paginator_counts_exactly_outside_postgresql(self):
+        paginator = EstimatedCountPaginator(Enrollment.objects.order_by("pk"), 1)
+        self.assertEqual(paginator.count, 2)
@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.tests.fixtures import create_student, create_teacher
+from academics.analytics import get_exam_analytics
+from academics.models import Mark
+from academics.services import save_marks
+from academics.tests.fixtures import (
+    create_academic_year,
+    create_assignment,
+    create_class_offering,
+    create_exam,
+    create_subject,
+    enroll_student,
+)
+
+
+class AnalyticsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher_user, self.teacher_profile = create_teacher()
+        login = self.client.post(reverse("auth_login"), {"username": self.teacher_user.username, "password": "password123"}, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['access']}")
+
+        year = create_academic_year()
+        class_offering = create_class_offering(year)
+        self.assignment = create_assignment(self.teacher_profile, year, class_offering, create_subject())
+        self.exam = create_exam(self.assignment)
+        self.enrollments = []
+        for index in range(1, 7):
+            _, student = create_student(username=f"stats{index}", email=f"stats{index}@example.com")
+            self.enrollments.append(enroll_student(student, year, class_offering, roll_number=str(index)))
+        with self.captureOnCommitCallbacks(execute=True):
+            save_marks(
+                self.exam,
+                [
+                    {"student_enrollment_id": enrollment.id, "marks_obtained": score}
+                    for enrollment, score in zip(self.enrollments, (20, 40, 60, 80, 100))
+                ],
+                actor=self.teacher_profile,
+            )
+
+    def test_exam_analytics(self):
+        response = self.client.get(reverse("teacher-exam-analytics", args=[self.exam.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data["count"], 5)
+        self.assertEqual((data["mean"], data["median"], data["std_dev"]), (60.0, 60.0, 28.28))
+        self.assertEqual(data["percentiles"], {"p25": 40.0, "p50": 60.0, "p75": 80.0, "p90": 92.0})
+        self.assertEqual((data["passed"], data["pass_rate"]), (4, 80.0))
+        self.assertEqual([bucket["count"] for bucket in data["histogram"]], [0, 0, 1, 0, 1, 0, 1, 0, 1, 1])
+
+    def test_results_are_cached_until_marks_change(self):
+        url = reverse("teacher-assignment-analytics", args=[self.assignment.id])
+        self.assertEqual(self.client.get(url).data["exams"][0]["count"], 5)
+        self.client.get(reverse("teacher-exam-analytics", args=[self.exam.id]))
+
+        with self.assertNumQueries(0):
+            get_exam_analytics(self.exam)
+
+        Mark.objects.create(exam=self.exam, enrollment=self.enrollments[5], marks_obtained=10)
+        self.assertEqual(self.client.get(url).data["count"], 6)
+        self.assertEqual(self.client.get(reverse("teacher-exam-analytics", args=[self.exam.id])).data["passed"], 4)
+
+    def test_other_teacher_is_forbidden(self):
+        other_user, _ = create_teacher(username="other", email="other@example.com")
+        self.client.force_authenticate(other_user)
+        response = self.client.get(reverse("teacher-assignment-analytics", args=[self.assignment.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
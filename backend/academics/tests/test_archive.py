@@ -0,0 +1,177 @@
+import io
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from authentication.tests.fixtures import create_student, create_teacher
+from academics.archive import close_academic_year, freeze_history_snapshots
+from academics.jobs import enqueue_job
+from academics.models import (
+    AcademicYear,
+    ArchivedMark,
+    Assignment,
+    BackgroundJob,
+    ClassOffering,
+    Enrollment,
+    EnrollmentHistorySnapshot,
+    EnrollmentSubjectSummary,
+    Exam,
+    Mark,
+)
+from academics.services import (
+    ServiceError,
+    get_exam_roster_with_lock,
+    get_student_dashboard,
+    get_student_trends,
+    save_marks,
+)
+from academics.tests.fixtures import create_academic_year, create_subject
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        _, self.teacher = create_teacher()
+        self.current = create_academic_year()
+        self.previous = AcademicYear.objects.get(year=str(int(self.current.year) - 1))
+        class_offering = ClassOffering.objects.get(academic_year=self.previous, level="6")
+        subject = create_subject()
+        assignment = Assignment(
+            teacher=self.teacher, academic_year=self.previous, class_offering=class_offering, subject=subject
+        )
+        assignment._allow_future_year = True
+        assignment.save()
+        self.exams = Exam.objects.bulk_create(
+            Exam(
+                assignment=assignment,
+                academic_year=self.previous,
+                title=title,
+                date=date(int(self.previous.year), month, 1),
+                created_by=self.teacher,
+            )
+            for title, month in (("Mid Term", 6), ("Final", 11))
+        )
+        self.enrollments = []
+        for index, scores in enumerate(((80, 60), (40, 50)), start=1):
+            _, student = create_student(username=f"old{index}", email=f"old{index}@example.com")
+            enrollment = Enrollment(
+                student=student, academic_year=self.previous, class_offering=class_offering, roll_number=index
+            )
+            enrollment._allow_promotion = True
+            enrollment.save()
+            self.enrollments.append(enrollment)
+            for exam, score in zip(self.exams, scores):
+                Mark.objects.create(exam=exam, enrollment=enrollment, marks_obtained=score)
+
+    def test_close_moves_marks_and_keeps_reads_working(self):
+        student = self.enrollments[0].student
+        dashboard_before = get_student_dashboard(student, self.previous.year)
+        trends_before = get_student_trends(student)
+        cache.clear()
+
+        result = close_academic_year(self.previous)
+
+        self.assertEqual(
+            result, {"academic_year": self.previous.year, "marks_archived": 4, "summaries": 2, "snapshots": 2}
+        )
+        self.assertFalse(Mark.objects.filter(exam__academic_year=self.previous).exists())
+        self.assertEqual(ArchivedMark.objects.filter(academic_year=self.previous).count(), 4)
+        summary = EnrollmentSubjectSummary.objects.get(enrollment=self.enrollments[0])
+        self.assertEqual((summary.exams_taken, summary.scored, summary.possible), (2, 140, 200))
+        self.previous.refresh_from_db()
+        self.assertTrue(self.previous.is_archived)
+
+        dashboard_after = get_student_dashboard(student, self.previous.year)
+        self.assertEqual(dashboard_after["marks"], dashboard_before["marks"])
+        self.assertEqual(get_student_trends(student), trends_before)
+
+        roster, allow_edit = get_exam_roster_with_lock(self.exams[0])
+        self.assertFalse(allow_edit)
+        self.assertEqual([row["existing_mark"] for row in roster], [80, 40])
+        with self.assertRaises(ServiceError):
+            save_marks(self.exams[0], [], actor=self.teacher, is_admin=True)
+
+    def test_current_and_archived_years_are_rejected(self):
+        with self.assertRaises(ServiceError):
+            close_academic_year(self.current)
+        close_academic_year(self.previous)
+        with self.assertRaisesMessage(CommandError, "already archived"):
+            call_command("archive_academic_year", "--year", self.previous.year, stdout=io.StringIO())
+
+    def test_years_that_have_not_ended_are_not_archived(self):
+        upcoming = create_academic_year(str(int(self.current.year) + 1), is_current=False)
+        with self.assertRaisesMessage(ServiceError, "has not ended yet"):
+            close_academic_year(upcoming)
+        upcoming.refresh_from_db()
+        self.assertFalse(upcoming.is_archived)
+        # Still eligible to become the current year later.
+        upcoming.full_clean()
+
+    def test_admin_action_only_queues_years_that_have_ended(self):
+        upcoming = create_academic_year(str(int(self.current.year) + 1), is_current=False)
+        admin_user = get_user_model().objects.create_superuser(username="admin", email="admin@example.com", password="x")
+        self.client.force_login(admin_user)
+
+        response = self.client.post(
+            reverse("admin:academics_academicyear_changelist"),
+            {"action": "archive_in_background", "_selected_action": [self.previous.pk, upcoming.pk]},
+            follow=True,
+        )
+
+        self.assertContains(response, f"Skipped {upcoming.year}")
+        self.assertEqual(BackgroundJob.objects.get().params, {"academic_year_ids": [self.previous.pk]})
+
+    def test_history_snapshots_replace_recomputation_and_can_be_refreshed(self):
+        student = self.enrollments[0].student
+        live_entry = get_student_dashboard(student)["history"][0]
+        trends_before = get_student_trends(student)
+
+        self.assertEqual(freeze_history_snapshots(self.previous), 2)
+        snapshot = EnrollmentHistorySnapshot.objects.get(enrollment=self.enrollments[0])
+        self.assertEqual(snapshot.payload, live_entry)
+        self.assertEqual(snapshot.payload["overall_percent"], 70.0)
+
+        Mark.objects.filter(enrollment=self.enrollments[0], exam=self.exams[0]).update(marks_obtained=100)
+        self.assertEqual(get_student_dashboard(student)["history"], [live_entry])
+
+        self.assertEqual(get_student_trends(student), trends_before)
+
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("freeze_history_snapshots", "--year", self.previous.year, stdout=out)
+        self.assertIn("Froze 2 history snapshots", out.getvalue())
+        self.assertEqual(EnrollmentHistorySnapshot.objects.filter(academic_year=self.previous).count(), 2)
+        self.assertEqual(get_student_dashboard(student)["history"][0]["overall_percent"], 80.0)
+        # The re-freeze also drops the cached closed-year trends.
+        self.assertNotEqual(get_student_trends(student), trends_before)
+
+        with self.assertRaises(ServiceError):
+            freeze_history_snapshots(self.current)
+        upcoming = create_academic_year(str(int(self.current.year) + 1), is_current=False)
+        with self.assertRaisesMessage(ServiceError, "has not ended yet"):
+            freeze_history_snapshots(upcoming)
+
+    def test_snapshots_are_ignored_once_their_year_is_current(self):
+        student = self.enrollments[0].student
+        freeze_history_snapshots(self.previous)
+        Mark.objects.filter(enrollment=self.enrollments[0], exam=self.exams[0]).update(marks_obtained=100)
+        AcademicYear.objects.filter(pk=self.current.pk).update(is_current=False)
+        AcademicYear.objects.filter(pk=self.previous.pk).update(is_current=True)
+
+        self.assertEqual(get_student_dashboard(student)["history"][0]["overall_percent"], 80.0)
+
+    @override_settings(JOBS_EAGER=True)
+    def test_background_job_archives_selected_years(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = enqueue_job("archive_years", params={"academic_year_ids": [self.previous.pk, self.current.pk]})
+
+        job.refresh_from_db()
+        self.assertEqual(job.result["archived"][0]["marks_archived"], 4)
+        self.assertEqual(
+            job.result["failed"],
+            [{"academic_year": self.current.year, "error": "The current academic year cannot be archived."}],
+        )
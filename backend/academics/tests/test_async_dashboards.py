@@ -0,0 +1,108 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from authentication.tests.fixtures import create_student, create_teacher
+from academics.services import save_marks
+from academics.tests.fixtures import (
+    create_academic_year,
+    create_assignment,
+    create_class_offering,
+    create_exam,
+    create_subject,
+    enroll_student,
+)
+
+
+class DashboardDataMixin:
+    def create_dashboard_data(self):
+        self.student_user, student = create_student()
+        self.teacher_user, teacher = create_teacher()
+        year = create_academic_year()
+        class_offering = create_class_offering(year)
+        enrollments = [enroll_student(student, year, class_offering, roll_number="1")]
+        _, classmate = create_student(username="classmate", email="classmate@example.com")
+        enrollments.append(enroll_student(classmate, year, class_offering, roll_number="2"))
+        for (name, code), scores in ((("BANGLA", "BAN-101"), (70, 90)), (("ENGLISH", "ENG-101"), (95, 60))):
+            exam = create_exam(create_assignment(teacher, year, class_offering, create_subject(name, code)))
+            save_marks(
+                exam,
+                [{"student_enrollment_id": e.id, "marks_obtained": m} for e, m in zip(enrollments, scores)],
+                actor=teacher,
+            )
+
+    def access_token(self, user):
+        login = self.client.post(reverse("auth_login"), {"username": user.username, "password": "password123"}, format="json")
+        return login.data["access"]
+
+
+@override_settings(ASYNC_PARALLEL_SECTIONS=False)
+class AsyncDashboardTests(DashboardDataMixin, APITestCase):
+    def setUp(self):
+        self.create_dashboard_data()
+
+    def assert_async_matches(self, user, sync_name, async_name):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access_token(user)}")
+        expected = self.client.get(reverse(sync_name))
+        response = self.client.get(reverse(async_name))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), expected.json())
+
+    def test_async_dashboards_match_sync_views(self):
+        self.assert_async_matches(self.student_user, "student-dashboard", "student-dashboard-async")
+        self.assert_async_matches(self.teacher_user, "teacher-dashboard", "teacher-dashboard-async")
+
+    def test_permissions_still_apply(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access_token(self.teacher_user)}")
+        self.assertEqual(self.client.get(reverse("student-dashboard-async")).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.credentials()
+        self.assertEqual(self.client.get(reverse("teacher-dashboard-async")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_served_through_asgi_handler(self):
+        access = await self.async_access_token()
+        response = await AsyncClient().get(
+            reverse("student-dashboard-async"), headers={"Authorization": f"Bearer {access}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["enrollment"]["class_rank"], 1)
+
+    async def async_access_token(self):
+        response = await AsyncClient().post(
+            reverse("auth_login"),
+            {"username": self.student_user.username, "password": "password123"},
+            content_type="application/json",
+        )
+        return json.loads(response.content)["access"]
+
+
+class ParallelSectionsTests(DashboardDataMixin, TransactionTestCase):
+    """Sections run on their own threads and connections, so the data has to be committed."""
+
+    serialized_rollback = True
+
+    client_class = APIClient
+
+    def setUp(self):
+        self.create_dashboard_data()
+
+    def test_parallel_sections_return_same_dashboard(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access_token(self.student_user)}")
+        with override_settings(ASYNC_PARALLEL_SECTIONS=False):
+            expected = self.client.get(reverse("student-dashboard-async")).json()
+        self.assertEqual(self.client.get(reverse("student-dashboard-async")).json(), expected)
+
+    def test_benchmark_reports_both_handlers(self):
+        out = io.StringIO()
+        call_command(
+            "benchmark_dashboards", "--username", self.student_user.username, "--requests", "4", "--concurrency", "2",
+            stdout=out,
+        )
+        rows = {line.split()[0]: line.split() for line in out.getvalue().splitlines()[2:]}
+        self.assertEqual(rows["WSGI"][1], reverse("student-dashboard"))
+        self.assertEqual(rows["ASGI"][1], reverse("student-dashboard-async"))
+        self.assertEqual((rows["WSGI"][-1], rows["ASGI"][-1]), ("0", "0"))
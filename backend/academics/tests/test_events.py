@@ -0,0 +1,117 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from authentication.api.views import _generate_tokens
+from authentication.tests.fixtures import create_student, create_teacher
+from academics.events import class_event_stream
+from academics.models import ClassEvent
+from academics.services import ServiceError, create_exam, save_marks
+from academics.tests.fixtures import (
+    create_academic_year,
+    create_assignment,
+    create_class_offering,
+    create_subject,
+    enroll_student,
+)
+from config.tenancy import tenant_context
+from config.tests.test_tenancy import SHARED_TENANTS
+
+
+@override_settings(SSE_POLL_SECONDS=0.05, SSE_STREAM_SECONDS=0.3)
+class ClassEventTests(TestCase):
+    def setUp(self):
+        self.student_user, student = create_student()
+        _, self.teacher = create_teacher()
+        year = create_academic_year()
+        self.class_offering = create_class_offering(year)
+        self.assignment = create_assignment(self.teacher, year, self.class_offering, create_subject())
+        self.enrollment = enroll_student(student, year, self.class_offering)
+        self.access = _generate_tokens(self.student_user)["access"]
+
+    def schedule_exam(self, title="Mid Term"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_exam(
+                assignment=self.assignment, teacher=self.teacher, title=title, exam_date=timezone.localdate()
+            )
+
+    def events_url(self, **params):
+        query = "&".join(f"{key}={value}" for key, value in {"access_token": self.access, **params}.items())
+        return f"{reverse('student-events')}?{query}"
+
+    def test_exam_and_marks_publish_events(self):
+        exam = self.schedule_exam()
+        save_marks(exam, [{"student_enrollment_id": self.enrollment.id, "marks_obtained": 80}], actor=self.teacher)
+        with self.assertRaises(ServiceError):
+            save_marks(exam, [{"student_enrollment_id": self.enrollment.id, "marks_obtained": 90}], actor=self.teacher)
+
+        events = list(ClassEvent.objects.values_list("class_offering_id", "kind", "exam_id"))
+        self.assertEqual(
+            events,
+            [
+                (self.class_offering.id, ClassEvent.KIND_EXAM_SCHEDULED, exam.id),
+                (self.class_offering.id, ClassEvent.KIND_MARKS_PUBLISHED, exam.id),
+            ],
+        )
+
+    async def test_stream_resumes_after_last_event_id(self):
+        first = await sync_to_async(self.schedule_exam)("Mid Term")
+        await sync_to_async(self.schedule_exam)("Final")
+        first_event = await ClassEvent.objects.aget(exam=first)
+
+        response = await AsyncClient().get(self.events_url(last_event_id=first_event.id))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+        self.assertTrue(body.startswith("retry: 3000\n\n"))
+        self.assertNotIn('"title":"Mid Term"', body)
+        self.assertIn("event: exam_scheduled\ndata: ", body)
+        self.assertIn('"title":"Final"', body)
+        self.assertIn(": keepalive", body)
+
+    @override_settings(SSE_POLL_SECONDS=30, SSE_STREAM_SECONDS=30)
+    async def test_commit_wakes_open_stream(self):
+        response = await AsyncClient().get(self.events_url())
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+
+        pending = asyncio.ensure_future(anext(stream))
+        await sync_to_async(self.schedule_exam)()
+        # Far sooner than the 30 second poll: the commit woke the stream.
+        chunk = await asyncio.wait_for(pending, timeout=5)
+        self.assertIn(b"event: exam_scheduled", chunk)
+        await stream.aclose()
+
+    @override_settings(TENANTS=SHARED_TENANTS, SSE_POLL_SECONDS=30, SSE_STREAM_SECONDS=30)
+    async def test_wake_ups_stay_within_the_school(self):
+        def schedule_for(tenant, title):
+            with tenant_context(tenant):
+                self.schedule_exam(title)
+
+        with tenant_context("north"):
+            stream = aiter(class_event_stream(self.class_offering.id))
+        # The stream runs outside the context it was opened in and keeps its school.
+        self.assertEqual(await anext(stream), "retry: 3000\n\n")
+
+        pending = asyncio.ensure_future(anext(stream))
+        # Both schools share the test database; let the stream finish its read and start waiting.
+        await asyncio.sleep(0.2)
+        # Same class offering id, other school: no wake-up, so the 30 second poll is still pending.
+        await sync_to_async(schedule_for)("south", "Mid Term")
+        done, _ = await asyncio.wait({pending}, timeout=0.3)
+        self.assertFalse(done)
+
+        await sync_to_async(schedule_for)("north", "Final")
+        chunk = await asyncio.wait_for(pending, timeout=5)
+        self.assertIn("event: exam_scheduled", chunk)
+        await stream.aclose()
+
+    def test_requires_asgi_and_student(self):
+        client = APIClient()
+        self.assertEqual(client.get(self.events_url()).status_code, status.HTTP_501_NOT_IMPLEMENTED)
+        self.assertEqual(client.get(reverse("student-events")).status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.tests.fixtures import create_student, create_teacher
+from academics.services import save_marks
+from academics.tests.fixtures import (
+    create_academic_year,
+    create_assignment,
+    create_class_offering,
+    create_exam,
+    create_subject,
+    enroll_student,
+)
+
+
+def _read_csv(response):
+    body = b"".join(response.streaming_content).decode()
+    return list(csv.reader(io.StringIO(body)))
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="password123"
+        )
+        login = self.client.post(reverse("auth_login"), {"username": "admin", "password": "password123"}, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['access']}")
+
+        _, teacher = create_teacher()
+        self.year = create_academic_year()
+        self.class_offering = create_class_offering(self.year)
+        self.exam = create_exam(create_assignment(teacher, self.year, self.class_offering, create_subject()))
+        self.enrollments = []
+        for index in range(1, 4):
+            _, student = create_student(username=f"export{index}", email=f"export{index}@example.com")
+            self.enrollments.append(enroll_student(student, self.year, self.class_offering, roll_number=str(index)))
+        save_marks(
+            self.exam,
+            [
+                {"student_enrollment_id": self.enrollments[0].id, "marks_obtained": 90},
+                {"student_enrollment_id": self.enrollments[1].id, "marks_obtained": 45},
+            ],
+            actor=teacher,
+        )
+
+    def test_exam_roster_csv_streams_every_enrolled_student(self):
+        response = self.client.get(reverse("staff-export-exam-roster", args=[self.exam.id]), HTTP_ACCEPT="text/csv")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = _read_csv(response)
+        self.assertEqual(rows[0][2:], ["roll_number", "student_id", "student_name", "marks_obtained", "max_marks"])
+        self.assertEqual([(row[2], row[4], row[5]) for row in rows[1:]], [("1", "Export1", "90"), ("2", "Export2", "45"), ("3", "Export3", "")])
+
+    def test_class_marks_and_year_results_ndjson(self):
+        marks = self.client.get(reverse("staff-export-class-marks", args=[self.class_offering.id]), {"export_format": "ndjson"})
+        lines = [json.loads(line) for line in b"".join(marks.streaming_content).decode().splitlines()]
+        self.assertEqual([line["marks_obtained"] for line in lines], [90, 45])
+
+        results = self.client.get(reverse("staff-export-year-results", args=[self.year.year]), {"export_format": "ndjson"})
+        rows = {row["roll_number"]: row for row in map(json.loads, b"".join(results.streaming_content).decode().splitlines())}
+        self.assertEqual(rows[1]["percent"], 90.0)
+        self.assertEqual(rows[1]["grade"], "A")
+        self.assertEqual(rows[3]["exams_taken"], 0)
+
+        bad = self.client.get(reverse("staff-export-year-results", args=[self.year.year]), {"export_format": "xml"})
+        self.assertEqual(bad.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_changelist_actions_stream_csv(self):
+        self.client.force_login(self.admin)
+        exam_response = self.client.post(
+            reverse("admin:academics_exam_changelist"),
+            {"action": "export_roster_csv", "_selected_action": [self.exam.id]},
+        )
+        self.assertEqual(len(_read_csv(exam_response)), 4)
+
+        enrollment_response = self.client.post(
+            reverse("admin:academics_enrollment_changelist"),
+            {"action": "export_marks_csv", "_selected_action": [self.enrollments[0].id]},
+        )
+        rows = _read_csv(enrollment_response)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][9], "90")
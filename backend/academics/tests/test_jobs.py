@@ -0,0 +1,243 @@
+import io
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from authentication.tests.fixtures import create_student, create_teacher
+from academics.jobs import (
+    JobContext,
+    _execute,
+    claim_job,
+    heartbeat,
+    job_handler,
+    requeue_stale_jobs,
+    run_job,
+)
+from academics.models import BackgroundJob, Enrollment, PromotionRecord
+from academics.services import enqueue, save_marks
+from academics.tests.fixtures import (
+    create_academic_year,
+    create_assignment,
+    create_class_offering,
+    create_exam,
+    create_subject,
+    enroll_student,
+)
+
+
+@job_handler("test_explode")
+def _explode(context: JobContext):
+    context.set_total(1)
+    raise RuntimeError("boom")
+
+
+@job_handler("test_flaky")
+def _flaky(context: JobContext):
+    if context.job.attempts < 2:
+        raise RuntimeError("first try fails")
+    return {"attempt": context.job.attempts}
+
+
+@job_handler("test_lock_holder")
+def _lock_holder(context: JobContext):
+    return {"locked_by": context.job.locked_by}
+
+
+@job_handler("test_slow_step")
+def _slow_step(context: JobContext):
+    time.sleep(0.3)
+
+
+@override_settings(JOBS_EAGER=True)
+class BackgroundJobTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(username="admin", email="admin@example.com", password="x")
+        self.client.force_login(self.admin)
+        _, teacher = create_teacher()
+        year = create_academic_year()
+        self.class_offering = create_class_offering(year)
+        self.top_class = create_class_offering(year, level="10")
+        self.exam = create_exam(create_assignment(teacher, year, self.class_offering, create_subject()))
+        self.enrollments = []
+        for index in (1, 2):
+            _, student = create_student(username=f"job{index}", email=f"job{index}@example.com")
+            self.enrollments.append(enroll_student(student, year, self.class_offering, roll_number=str(index)))
+        save_marks(
+            self.exam,
+            [{"student_enrollment_id": e.id, "marks_obtained": m} for e, m in zip(self.enrollments, (95, 30))],
+            actor=teacher,
+        )
+
+    def run_action(self, changelist, action, ids):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse(changelist), {"action": action, "_selected_action": ids})
+        self.assertEqual(response.status_code, 302)
+        return BackgroundJob.objects.latest("pk")
+
+    def test_recompute_grades_from_exam_admin(self):
+        Enrollment.objects.update(grade=None)
+        job = self.run_action("admin:academics_exam_changelist", "recompute_grades_in_background", [self.exam.id])
+
+        self.assertEqual(job.status, BackgroundJob.STATUS_SUCCEEDED)
+        self.assertEqual((job.progress, job.total), (2, 2))
+        self.assertEqual(sorted(Enrollment.objects.values_list("grade", flat=True)), ["A", "E"])
+
+    def test_export_marks_job_output_is_downloadable(self):
+        job = self.run_action(
+            "admin:academics_classoffering_changelist", "export_marks_in_background", [self.class_offering.id]
+        )
+
+        self.assertEqual(job.result, {"rows": 2})
+        self.assertEqual(job.output_name, "classoffering-marks.csv")
+        status_page = self.client.get(reverse("admin:academics_backgroundjob_changelist"))
+        self.assertContains(status_page, "2/2")
+        download = self.client.get(reverse("admin:academics_backgroundjob_download", args=[job.pk]))
+        self.assertEqual(len(download.content.decode().strip().splitlines()), 3)
+
+    def test_promote_selected_classes_reports_each_class(self):
+        job = self.run_action(
+            "admin:academics_classoffering_changelist",
+            "promote_in_background",
+            [self.class_offering.id, self.top_class.id],
+        )
+
+        self.assertEqual(job.status, BackgroundJob.STATUS_SUCCEEDED)
+        self.assertEqual(job.result["promoted"][0]["promoted"], 1)
+        self.assertEqual(job.result["failed"][0]["error"], "Highest class cannot be promoted further.")
+        self.assertEqual(PromotionRecord.objects.get().performed_by, self.admin)
+
+    def test_handler_errors_are_recorded(self):
+        job = run_job(BackgroundJob.objects.create(name="test_explode").pk)
+        self.assertEqual((job.status, job.error, job.total), (BackgroundJob.STATUS_FAILED, "boom", 1))
+
+    def test_in_process_jobs_hold_a_lock_and_run_once(self):
+        job = run_job(BackgroundJob.objects.create(name="test_lock_holder", max_attempts=1).pk)
+        self.assertTrue(job.result["locked_by"].endswith("/thread"))
+        self.assertEqual((job.status, job.locked_by, job.attempts), (BackgroundJob.STATUS_SUCCEEDED, "", 1))
+
+        # Already taken (here: finished) rows are left alone.
+        self.assertEqual(run_job(job.pk).attempts, 1)
+
+    @override_settings(JOBS_EAGER=False, JOB_BACKEND="thread")
+    def test_run_worker_recovers_jobs_lost_by_a_restarted_process(self):
+        long_ago = timezone.now() - timedelta(days=1)
+        waiting = BackgroundJob.objects.create(name="test_lock_holder", max_attempts=1)
+        interrupted = BackgroundJob.objects.create(
+            name="test_lock_holder",
+            status=BackgroundJob.STATUS_RUNNING,
+            attempts=1,
+            max_attempts=1,
+            locked_by="web-1:42/thread",
+            locked_at=long_ago,
+            started_at=long_ago,
+        )
+
+        err = io.StringIO()
+        call_command("run_worker", "--burst", stdout=io.StringIO(), stderr=err)
+
+        self.assertIn("left behind by restarted processes", err.getvalue())
+        waiting.refresh_from_db()
+        interrupted.refresh_from_db()
+        self.assertEqual(waiting.status, BackgroundJob.STATUS_SUCCEEDED)
+        self.assertEqual(
+            (interrupted.status, interrupted.error),
+            (BackgroundJob.STATUS_FAILED, "Worker stopped before the job finished."),
+        )
+
+
+@override_settings(JOB_BACKEND="db", JOBS_EAGER=False, JOB_MAX_ATTEMPTS=3, JOB_RETRY_BACKOFF_SECONDS=0)
+class DatabaseQueueTests(TestCase):
+    def queue(self, name, **params):
+        with self.captureOnCommitCallbacks(execute=True):
+            return enqueue(name, **params)
+
+    def run_worker(self, *args):
+        out = io.StringIO()
+        call_command("run_worker", "--burst", *args, stdout=out, stderr=io.StringIO())
+        return out.getvalue()
+
+    def test_enqueued_job_waits_for_the_worker(self):
+        _, teacher = create_teacher()
+        year = create_academic_year()
+        exam = create_exam(create_assignment(teacher, year, create_class_offering(year), create_subject()))
+        _, student = create_student()
+        enrollment = enroll_student(student, year, exam.assignment.class_offering)
+        save_marks(exam, [{"student_enrollment_id": enrollment.id, "marks_obtained": 95}], actor=teacher)
+        Enrollment.objects.update(grade=None)
+
+        job = self.queue("recompute_grades", exam_ids=[exam.id])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.max_attempts), (BackgroundJob.STATUS_QUEUED, 3))
+
+        self.assertIn("stopped after 1 jobs", self.run_worker())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (BackgroundJob.STATUS_SUCCEEDED, 1, ""))
+        self.assertEqual(job.result, {"enrollments": 1})
+        self.assertEqual(Enrollment.objects.get().grade, "A")
+
+    def test_failed_attempt_is_retried(self):
+        job = self.queue("test_flaky")
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.error), (BackgroundJob.STATUS_SUCCEEDED, 2, ""))
+        self.assertEqual(job.result, {"attempt": 2})
+
+    @override_settings(JOB_RETRY_BACKOFF_SECONDS=60)
+    def test_retries_back_off_then_fail(self):
+        job = self.queue("test_explode", max_attempts=2)
+
+        job = _execute(claim_job("w1"))
+        self.assertEqual((job.status, job.error), (BackgroundJob.STATUS_QUEUED, "boom"))
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=50))
+        self.assertIsNone(claim_job("w1"))
+
+        BackgroundJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (BackgroundJob.STATUS_FAILED, 2))
+
+    def test_claimed_job_is_exclusive_until_its_lock_expires(self):
+        job = self.queue("test_flaky")
+        self.assertEqual(claim_job("w1").locked_by, "w1")
+        self.assertIsNone(claim_job("w2"))
+
+        # w1 died mid-job: once the lock is stale the job goes back on the queue.
+        BackgroundJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        job = claim_job("w2")
+        self.assertEqual((job.locked_by, job.attempts), ("w2", 2))
+
+    def test_job_that_is_still_running_keeps_its_lock(self):
+        self.queue("test_flaky")
+        job = claim_job("w1")
+        stale = timezone.now() - timedelta(days=1)
+
+        BackgroundJob.objects.filter(pk=job.pk).update(locked_at=stale)
+        JobContext(job).advance()
+        self.assertEqual(requeue_stale_jobs(), 0)
+
+        BackgroundJob.objects.filter(pk=job.pk).update(locked_at=stale)
+        self.assertTrue(heartbeat(job))
+        self.assertEqual(requeue_stale_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (BackgroundJob.STATUS_RUNNING, "w1"))
+
+        # Once the job has been taken over, the old worker's heartbeat no longer refreshes it.
+        BackgroundJob.objects.filter(pk=job.pk).update(locked_by="w2")
+        self.assertFalse(heartbeat(job))
+
+    @override_settings(JOB_HEARTBEAT_SECONDS=0.05)
+    def test_long_step_without_progress_still_beats(self):
+        self.queue("test_slow_step")
+        with mock.patch("academics.jobs.heartbeat") as beat:
+            job = _execute(claim_job("w1"))
+
+        self.assertEqual(job.status, BackgroundJob.STATUS_SUCCEEDED)
+        self.assertGreaterEqual(beat.call_count, 2)
+        self.assertEqual(beat.call_args.args[0].pk, job.pk)
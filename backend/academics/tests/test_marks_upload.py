@@ -0,0 +1,84 @@
+import io
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from openpyxl import Workbook
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.tests.fixtures import create_student, create_teacher
+from academics.models import Enrollment, Mark
+from academics.tests.fixtures import (
+    create_academic_year,
+    create_assignment,
+    create_class_offering,
+    create_exam,
+    create_subject,
+    enroll_student,
+)
+
+
+class MarksUploadTests(APITestCase):
+    def setUp(self):
+        self.teacher_user, self.teacher_profile = create_teacher()
+        login = self.client.post(reverse("auth_login"), {"username": self.teacher_user.username, "password": "password123"}, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['access']}")
+
+        year = create_academic_year()
+        class_offering = create_class_offering(year)
+        assignment = create_assignment(self.teacher_profile, year, class_offering, create_subject())
+        self.exam = create_exam(assignment)
+        self.enrollments = []
+        for index in range(1, 4):
+            _, student = create_student(username=f"upload{index}", email=f"upload{index}@example.com")
+            self.enrollments.append(enroll_student(student, year, class_offering, roll_number=str(index)))
+        self.url = reverse("teacher-exam-marks-upload", args=[self.exam.id])
+
+    def test_invalid_rows_are_reported_and_nothing_is_saved(self):
+        content = "roll_number,student_id,marks_obtained\n1,,95\n9,,50\n2,,101\n,,40\n1,,70\n"
+        upload = SimpleUploadedFile("marks.csv", content.encode(), content_type="text/csv")
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["saved"], 0)
+        self.assertEqual(
+            [(error["row"], sorted(error["errors"])) for error in response.data["errors"]],
+            [(3, ["roll_number"]), (4, ["marks_obtained"]), (5, ["roll_number"]), (6, ["non_field_errors"])],
+        )
+        self.assertFalse(Mark.objects.filter(exam=self.exam).exists())
+
+    def test_csv_keyed_by_roll_or_student_id_saves_marks_and_grades(self):
+        third_student_id = self.enrollments[2].student.student_id
+        content = f"roll,student_id,marks\n1,,95\n2,,55\n,{third_student_id},80\n"
+        upload = SimpleUploadedFile("marks.csv", content.encode(), content_type="text/csv")
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["saved"], 3)
+        grades = dict(Enrollment.objects.filter(pk__in=[e.pk for e in self.enrollments]).values_list("roll_number", "grade"))
+        self.assertEqual(grades, {1: "A", 2: "E", 3: "B"})
+
+        again = SimpleUploadedFile("marks.csv", content.encode(), content_type="text/csv")
+        locked = self.client.post(self.url, {"file": again}, format="multipart")
+        self.assertEqual(locked.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_xlsx_upload(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["Roll Number", "Marks Obtained"])
+        sheet.append([1, 88])
+        sheet.append([2, 61.0])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        upload = SimpleUploadedFile(
+            "marks.xlsx",
+            buffer.getvalue(),
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            dict(Mark.objects.filter(exam=self.exam).values_list("enrollment__roll_number", "marks_obtained")),
+            {1: 88, 2: 61},
+        )
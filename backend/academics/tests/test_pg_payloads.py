@@ -0,0 +1,65 @@
+import unittest
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from authentication.tests.fixtures import create_student, create_teacher
+from academics.models import HARDCODED_SUBJECTS, Exam, Mark
+from academics.services import get_exam_roster_with_lock, get_student_dashboard
+from academics.tests.fixtures import (
+    create_academic_year,
+    create_assignment,
+    create_class_offering,
+    create_subject,
+    enroll_student,
+)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "JSON payloads are built by PostgreSQL only")
+class PostgresPayloadParityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        _, teacher = create_teacher()
+        year = create_academic_year()
+        class_offering = create_class_offering(year)
+        assignments = [
+            create_assignment(teacher, year, class_offering, create_subject(name, code))
+            for name, code in list(HARDCODED_SUBJECTS.items())[:2]
+        ]
+        today = timezone.localdate()
+        self.exams = Exam.objects.bulk_create(
+            Exam(
+                assignment=assignment,
+                academic_year=year,
+                title=f"Exam {index}",
+                date=today + timedelta(days=index),
+                created_by=teacher,
+            )
+            for index, assignment in enumerate(assignments * 2)
+        )
+        self.enrollments = []
+        for index, scores in enumerate(((80, 60), (80, 75), (35, 90)), start=1):
+            _, student = create_student(username=f"pg{index}", email=f"pg{index}@example.com")
+            enrollment = enroll_student(student, year, class_offering, roll_number=str(index))
+            self.enrollments.append(enrollment)
+            for exam, score in zip(self.exams, scores):
+                Mark.objects.create(exam=exam, enrollment=enrollment, marks_obtained=score)
+
+    def test_dashboard_matches_orm_path(self):
+        for enrollment in self.enrollments:
+            student = enrollment.student
+            with override_settings(PG_JSON_PAYLOADS=False):
+                expected = get_student_dashboard(student)
+            cache.clear()
+            with override_settings(PG_JSON_PAYLOADS=True):
+                self.assertEqual(get_student_dashboard(student), expected)
+
+    def test_roster_matches_orm_path(self):
+        for exam in self.exams:
+            with override_settings(PG_JSON_PAYLOADS=False):
+                expected = get_exam_roster_with_lock(exam)
+            with override_settings(PG_JSON_PAYLOADS=True):
+                self.assertEqual(get_exam_roster_with_lock(exam), expected)
@@ -0,0 +1,113 @@
+import io
+import json
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from authentication.tests.fixtures import create_student, create_teacher
+from academics.models import AcademicYear, ClassOffering, Enrollment, Mark
+from academics.reports import collect_report_cards, write_report_cards
+from academics.services import save_marks
+from academics.tests.fixtures import (
+    create_academic_year,
+    create_assignment,
+    create_class_offering,
+    create_exam,
+    create_subject,
+    enroll_student,
+)
+
+
+class ReportCardTests(TestCase):
+    def setUp(self):
+        _, teacher = create_teacher()
+        self.year = create_academic_year()
+        self.class_offering = create_class_offering(self.year)
+        bangla = create_exam(create_assignment(teacher, self.year, self.class_offering, create_subject()))
+        english = create_exam(
+            create_assignment(teacher, self.year, self.class_offering, create_subject("ENGLISH", "ENG-101"))
+        )
+        self.enrollments = []
+        for index in range(1, 4):
+            _, student = create_student(username=f"card{index}", email=f"card{index}@example.com")
+            self.enrollments.append(enroll_student(student, self.year, self.class_offering, roll_number=str(index)))
+        for exam, scores in ((bangla, (90, 60, 90)), (english, (70, 80, 70))):
+            save_marks(
+                exam,
+                [{"student_enrollment_id": e.id, "marks_obtained": m} for e, m in zip(self.enrollments, scores)],
+                actor=teacher,
+            )
+
+        previous_year = AcademicYear.objects.get(year=str(int(self.year.year) - 1))
+        previous = Enrollment(
+            student=self.enrollments[0].student,
+            academic_year=previous_year,
+            class_offering=ClassOffering.objects.get(academic_year=previous_year, level="6"),
+        )
+        previous._allow_promotion = True
+        previous.save()
+        Mark.objects.create(exam=bangla, enrollment=previous, marks_obtained=55)
+
+    def test_collect_uses_fixed_queries_and_ranks_class(self):
+        with self.assertNumQueries(5):
+            cards = collect_report_cards(Enrollment.objects.filter(class_offering=self.class_offering))
+
+        self.assertEqual([card["roll_number"] for card in cards], [1, 2, 3])
+        self.assertEqual([card["class_rank"] for card in cards], [1, 3, 1])
+        self.assertEqual(cards[0]["overall_percent"], 80.0)
+        self.assertEqual([subject["grade"] for subject in cards[0]["subjects"]], ["A", "C"])
+        self.assertEqual(
+            cards[0]["history"],
+            [{"academic_year": str(int(self.year.year) - 1), "class_name": "Class 6", "percent": 55.0, "grade": "E"}],
+        )
+
+    def test_write_zip_across_process_pool_and_directory(self):
+        cards = collect_report_cards(Enrollment.objects.filter(class_offering=self.class_offering))
+        buffer = io.BytesIO()
+        self.assertEqual(write_report_cards(cards, buffer, workers=2), 3)
+        with zipfile.ZipFile(buffer) as archive:
+            names = sorted(archive.namelist())
+            self.assertEqual(len(names), 6)
+            first_json = json.loads(archive.read(names[1]))
+            self.assertEqual(first_json["roll_number"], 1)
+            self.assertIn("Card1", archive.read(names[0]).decode())
+
+        with tempfile.TemporaryDirectory() as directory:
+            out = io.StringIO()
+            call_command(
+                "generate_report_cards",
+                "--year",
+                self.year.year,
+                "--class-level",
+                "6",
+                "--output",
+                directory,
+                "--workers",
+                "1",
+                stdout=out,
+            )
+            self.assertIn("Wrote 3 report cards", out.getvalue())
+            self.assertEqual(len(list(Path(directory).glob("*.html"))), 3)
+
+    @override_settings(IMPORT_WEB_WORKERS=1)
+    def test_admin_action_downloads_zip(self):
+        admin = get_user_model().objects.create_superuser(username="admin", email="admin@example.com", password="x")
+        self.client.force_login(admin)
+        with mock.patch("academics.reports.write_report_cards", wraps=write_report_cards) as write:
+            response = self.client.post(
+                reverse("admin:academics_enrollment_changelist"),
+                {"action": "download_report_cards", "_selected_action": [self.enrollments[1].id]},
+            )
+
+        # Rendered in the request process, not a process pool.
+        self.assertEqual(write.call_args.args[2], 1)
+
+        self.assertEqual(response["Content-Type"], "application/zip")
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            self.assertEqual(len(archive.namelist()), 2)
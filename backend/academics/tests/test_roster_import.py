@@ -0,0 +1,97 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.models import StudentProfile
+from authentication.tests.fixtures import create_student
+from academics.models import Enrollment
+from academics.tests.fixtures import create_academic_year, create_class_offering, enroll_student
+
+
+ROSTER_CSV = (
+    "username,email,full_name,password,class_level,roll_number\n"
+    "alice,alice@example.com,Alice A,strongpass123,6,\n"
+    "bob,bob@example.com,,,6,5\n"
+    "alice,alice2@example.com,,,6,\n"
+    "carol,not-an-email,,,6,\n"
+    "dave,dave@example.com,,,11,\n"
+    "student1,erin@example.com,,,6,\n"
+)
+
+
+class RosterImportTests(APITestCase):
+    def setUp(self):
+        self.year = create_academic_year()
+        self.class_offering = create_class_offering(self.year, level="6")
+        _, existing = create_student()
+        enroll_student(existing, self.year, self.class_offering, roll_number="1")
+
+        admin = get_user_model().objects.create_user(
+            username="admin", email="admin@example.com", password="password123", is_staff=True
+        )
+        login = self.client.post(reverse("auth_login"), {"username": admin.username, "password": "password123"}, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['access']}")
+
+    def test_staff_endpoint_creates_valid_rows_and_reports_errors(self):
+        upload = SimpleUploadedFile("roster.csv", ROSTER_CSV.encode(), content_type="text/csv")
+        response = self.client.post(reverse("staff-roster-import"), {"file": upload, "batch_size": 2}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_rows"], 6)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(
+            {(error["row"], field) for error in response.data["errors"] for field in error["errors"]},
+            {(4, "username"), (5, "email"), (6, "class_level"), (7, "username")},
+        )
+
+        alice = StudentProfile.objects.get(user__username="alice")
+        bob = StudentProfile.objects.get(user__username="bob")
+        self.assertEqual(int(bob.student_id), int(alice.student_id) + 1)
+        self.assertTrue(alice.user.check_password("strongpass123"))
+        self.assertFalse(bob.user.has_usable_password())
+        rolls = dict(Enrollment.objects.filter(class_offering=self.class_offering).values_list("student__user__username", "roll_number"))
+        self.assertEqual(rolls, {"student1": 1, "alice": 2, "bob": 5})
+
+    def test_existing_accounts_match_case_insensitively_without_forking(self):
+        roster = (
+            "username,email,full_name,password,class_level,roll_number\n"
+            "Student1,new@example.com,,,6,\n"
+            "frank,STUDENT1@example.com,,,6,\n"
+        )
+        upload = SimpleUploadedFile("roster.csv", roster.encode(), content_type="text/csv")
+        with mock.patch("academics.imports.ProcessPoolExecutor") as pool:
+            response = self.client.post(reverse("staff-roster-import"), {"file": upload}, format="multipart")
+
+        pool.assert_not_called()
+        self.assertEqual(response.data["created"], 0)
+        self.assertEqual(
+            [error["errors"] for error in response.data["errors"]],
+            [{"username": ["Username already exists"]}, {"email": ["Email already exists"]}],
+        )
+
+    def test_import_requires_staff(self):
+        user, _ = create_student(username="plain", email="plain@example.com")
+        login = self.client.post(reverse("auth_login"), {"username": user.username, "password": "password123"}, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['access']}")
+        upload = SimpleUploadedFile("roster.csv", ROSTER_CSV.encode(), content_type="text/csv")
+        response = self.client.post(reverse("staff-roster-import"), {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_management_command_hashes_in_process_pool(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as handle:
+            handle.write(ROSTER_CSV)
+        self.addCleanup(os.remove, handle.name)
+
+        out, err = io.StringIO(), io.StringIO()
+        call_command("import_roster", handle.name, "--workers", "2", stdout=out, stderr=err)
+
+        self.assertIn("2 created, 4 failed", out.getvalue())
+        self.assertIn("row 5 (carol)", err.getvalue())
+        self.assertTrue(get_user_model().objects.get(username="alice").check_password("strongpass123"))
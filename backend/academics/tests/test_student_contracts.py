@@ -1,11 +1,14 @@
 from datetime import timedelta
 
+from django.core.cache import cache
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from authentication.tests.fixtures import create_student, create_teacher
+from academics.models import AcademicYear, ClassOffering, Enrollment, Mark
+from academics.services import get_student_trends, save_marks
 from academics.tests.fixtures import (
     create_academic_year,
     create_assignment,
@@ -62,3 +65,66 @@ class StudentContractsTests(APITestCase):
         response = self.client.get(reverse("student-marks"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("results", response.data)
+
+    def test_marks_include_exam_rank_percentile_and_class_rank(self):
+        year = create_academic_year()
+        class_offering = create_class_offering(year)
+        bangla = create_exam(create_assignment(self.teacher_profile, year, class_offering, create_subject()))
+        english = create_exam(
+            create_assignment(self.teacher_profile, year, class_offering, create_subject("ENGLISH", "ENG-101"))
+        )
+        enrollments = [enroll_student(self.student, year, class_offering, roll_number="1")]
+        for index in range(2, 5):
+            _, classmate = create_student(username=f"classmate{index}", email=f"classmate{index}@example.com")
+            enrollments.append(enroll_student(classmate, year, class_offering, roll_number=str(index)))
+        for exam, scores in ((bangla, (70, 90, 70, 40)), (english, (95, 60, 50, 30))):
+            save_marks(
+                exam,
+                [{"student_enrollment_id": e.id, "marks_obtained": m} for e, m in zip(enrollments, scores)],
+                actor=self.teacher_profile,
+            )
+
+        with self.assertNumQueries(9):
+            response = self.client.get(reverse("student-marks"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["class_rank"], response.data["class_size"]), (1, 4))
+        standings = {row["subject"]: (row["rank"], row["percentile"], row["highest_mark"]) for row in response.data["results"]}
+        self.assertEqual(standings, {"Bangla": (2, 33.33, 90), "English": (1, 100.0, 95)})
+
+        dashboard = self.client.get(reverse("student-dashboard"))
+        self.assertEqual(dashboard.data["enrollment"]["class_rank"], 1)
+        self.assertEqual({row["rank"] for row in dashboard.data["marks"]["results"]}, {1, 2})
+
+    def test_trends_series_with_deltas_and_cached_closed_years(self):
+        cache.clear()
+        year = create_academic_year()
+        class_offering = create_class_offering(year, level="7")
+        bangla = create_exam(create_assignment(self.teacher_profile, year, class_offering, create_subject()))
+        english = create_exam(
+            create_assignment(self.teacher_profile, year, class_offering, create_subject("ENGLISH", "ENG-101"))
+        )
+        current = enroll_student(self.student, year, class_offering)
+        Mark.objects.create(exam=bangla, enrollment=current, marks_obtained=80)
+        Mark.objects.create(exam=english, enrollment=current, marks_obtained=70)
+
+        previous_year = AcademicYear.objects.get(year=str(int(year.year) - 1))
+        previous = Enrollment(
+            student=self.student,
+            academic_year=previous_year,
+            class_offering=ClassOffering.objects.get(academic_year=previous_year, level="6"),
+        )
+        previous._allow_promotion = True
+        previous.save()
+        past_mark = Mark.objects.create(exam=bangla, enrollment=previous, marks_obtained=65)
+
+        response = self.client.get(reverse("student-trends"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["years"], [previous_year.year, year.year])
+        bangla_series = response.data["subjects"][0]["series"]
+        self.assertEqual([(p["percent"], p["delta"]) for p in bangla_series], [(65.0, None), (80.0, 15.0)])
+        self.assertEqual([(p["percent"], p["delta"]) for p in response.data["overall"]], [(65.0, None), (75.0, 10.0)])
+
+        Mark.objects.filter(pk=past_mark.pk).update(marks_obtained=10)
+        with self.assertNumQueries(2):
+            trends = get_student_trends(self.student)
+        self.assertEqual(trends["overall"][0]["percent"], 65.0)
@@ -1,9 +1,15 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from authentication.tests.fixtures import create_student, create_teacher
+from academics.models import Exam
+from academics.services import DASHBOARD_RECENT_EXAMS, save_marks
 from academics.tests.fixtures import (
     create_academic_year,
     create_assignment,
@@ -31,6 +37,38 @@ class TeacherContractsTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("assignments", response.data)
 
+    def test_teacher_dashboard_is_bounded_and_aggregated(self):
+        _, student = create_student(username="dash_student", email="dash_student@example.com")
+        enrollment = enroll_student(student, self.year, self.class_offering)
+        marked = create_exam(self.assignment, title="Marked")
+        create_exam(self.assignment, title="Awaiting")
+        save_marks(marked, [{"student_enrollment_id": enrollment.id, "marks_obtained": 72}], actor=self.teacher_profile)
+
+        with CaptureQueriesContext(connection) as short_tenure:
+            self.client.get(reverse("teacher-dashboard"))
+        today = timezone.localdate()
+        Exam.objects.bulk_create(
+            Exam(
+                assignment=self.assignment,
+                academic_year=self.year,
+                title=f"Old {offset}",
+                date=today - timedelta(days=offset),
+                created_by=self.teacher_profile,
+            )
+            for offset in range(1, 31)
+        )
+        with self.assertNumQueries(len(short_tenure)):
+            response = self.client.get(reverse("teacher-dashboard"))
+
+        self.assertEqual(len(response.data["past_exams"]), DASHBOARD_RECENT_EXAMS)
+        self.assertEqual(dict(response.data["exam_counts"]), {"current": 2, "past": 30, "total": 32})
+        assignment = response.data["assignments"][0]
+        self.assertEqual(
+            (assignment["student_count"], assignment["exams_held"], assignment["exams_awaiting_marks"], assignment["class_average"]),
+            (1, 32, 31, 72.0),
+        )
+        self.assertEqual(response.data["subject_count"], 1)
+
     def test_list_exams_and_create_exam(self):
         list_res = self.client.get(reverse("teacher-exams"))
         self.assertEqual(list_res.status_code, status.HTTP_200_OK)
@@ -58,3 +96,27 @@ class TeacherContractsTests(APITestCase):
         marks_res = self.client.post(reverse("teacher-exam-marks", args=[exam.id]), marks_payload, format="json")
         self.assertEqual(marks_res.status_code, status.HTTP_200_OK)
         self.assertEqual(marks_res.data["saved"], 1)
+
+    def test_exam_detail_roster_in_two_queries(self):
+        exam = create_exam(self.assignment, created_by=self.teacher_profile, title="Roster Exam")
+        enrollments = []
+        for index in range(1, 26):
+            _, student = create_student(username=f"roster{index}", email=f"roster{index}@example.com")
+            enrollments.append(enroll_student(student, self.year, self.class_offering, roll_number=str(index)))
+        self.client.force_authenticate(self.teacher_user)
+
+        with self.assertNumQueries(2):
+            open_res = self.client.get(reverse("teacher-exam-detail", args=[exam.id]))
+        self.assertTrue(open_res.data["allow_edit"])
+        self.assertEqual(len(open_res.data["roster"]), 25)
+
+        save_marks(exam, [{"student_enrollment_id": enrollments[1].id, "marks_obtained": 64}], actor=self.teacher_profile)
+        with self.assertNumQueries(2):
+            locked_res = self.client.get(reverse("teacher-exam-detail", args=[exam.id]))
+        self.assertTrue(locked_res.data["read_only"])
+        roster = locked_res.data["roster"]
+        self.assertEqual([row["existing_mark"] for row in roster[:3]], [None, 64, None])
+        self.assertEqual(
+            set(roster[1]), {"student_enrollment_id", "student_name", "student_id", "roll", "existing_mark"}
+        )
+        self.assertEqual((roster[1]["student_name"], roster[1]["roll"]), ("Roster2", 2))
@@ -0,0 +1,121 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.models import TeacherProfile
+from authentication.tests.fixtures import create_teacher
+from academics.imports import clone_assignments
+from academics.models import AcademicYear, Assignment, ClassOffering
+from academics.services import ServiceError
+from academics.tests.fixtures import create_academic_year, create_assignment, create_class_offering, create_subject
+
+
+class TeacherImportTests(APITestCase):
+    def setUp(self):
+        self.year = create_academic_year()
+        self.class_six = create_class_offering(self.year, level="6")
+        self.bangla = create_subject()
+        _, self.existing_teacher = create_teacher()
+        create_assignment(self.existing_teacher, self.year, self.class_six, self.bangla)
+
+        admin = get_user_model().objects.create_user(
+            username="admin", email="admin@example.com", password="password123", is_staff=True
+        )
+        login = self.client.post(reverse("auth_login"), {"username": admin.username, "password": "password123"}, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['access']}")
+
+    def test_json_rows_create_teachers_and_check_constraint_in_memory(self):
+        rows = [
+            {"username": "t_new", "email": "t_new@example.com", "full_name": "New Teacher", "class_level": 7, "subject": "ENG-101"},
+            {"username": "t_new", "class_level": "8", "subject": "math"},
+            {"username": "t_clash", "email": "t_clash@example.com", "class_level": "6", "subject": "Bangla"},
+            {"username": "t_dup", "email": "t_dup@example.com", "class_level": "7", "subject": "English"},
+            {"username": "teacher1", "class_level": "9", "subject": "Science"},
+        ]
+        response = self.client.post(reverse("staff-teacher-import"), {"rows": rows}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # t_clash and t_dup have valid accounts; only their assignments are rejected.
+        self.assertEqual(response.data["teachers_created"], 3)
+        self.assertEqual(response.data["assignments_created"], 3)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [3, 4])
+
+        new_teacher = TeacherProfile.objects.get(user__username="t_new")
+        self.assertEqual(new_teacher.employee_code, "EMP-002")
+        self.assertEqual(
+            set(new_teacher.assignments.values_list("class_offering__level", "subject__code")),
+            {("7", "ENG-101"), ("8", "MAT-101")},
+        )
+        self.assertTrue(self.existing_teacher.assignments.filter(subject__code="SCE-101").exists())
+        self.assertFalse(Assignment.objects.filter(teacher__user__username__in=["t_clash", "t_dup"]).exists())
+
+    def test_bad_assignment_on_first_row_keeps_account_for_later_rows(self):
+        rows = [
+            {"username": "t_new", "email": "t_new@example.com", "class_level": "7", "subject": "Latin"},
+            {"username": "t_new", "class_level": "8", "subject": "math"},
+            {"username": "t_case", "email": "TEACHER1@example.com", "class_level": "9", "subject": "Science"},
+        ]
+        response = self.client.post(reverse("staff-teacher-import"), {"rows": rows}, format="json")
+
+        self.assertEqual((response.data["teachers_created"], response.data["assignments_created"]), (1, 1))
+        self.assertEqual(
+            [error["errors"] for error in response.data["errors"]],
+            [{"subject": ["Subject must be one of the approved subjects."]}, {"email": ["Email already exists"]}],
+        )
+        new_teacher = TeacherProfile.objects.get(user__username="t_new")
+        self.assertEqual(list(new_teacher.assignments.values_list("subject__code", flat=True)), ["MAT-101"])
+
+    def test_clone_assignments_from_previous_year(self):
+        previous = AcademicYear.objects.get(year=str(int(self.year.year) - 1))
+        for level, subject in (("6", self.bangla), ("7", create_subject("ENGLISH", "ENG-101"))):
+            assignment = Assignment(
+                teacher=self.existing_teacher,
+                academic_year=previous,
+                class_offering=ClassOffering.objects.get(academic_year=previous, level=level),
+                subject=subject,
+            )
+            assignment._allow_future_year = True
+            assignment.save()
+
+        out, err = io.StringIO(), io.StringIO()
+        call_command("clone_assignments", "--from", previous.year, "--to", self.year.year, stdout=out, stderr=err)
+
+        self.assertIn("Cloned 1 assignments", out.getvalue())
+        self.assertIn("Already assigned", err.getvalue())
+        self.assertTrue(
+            Assignment.objects.filter(
+                academic_year=self.year, class_offering__level="7", subject__code="ENG-101", teacher=self.existing_teacher
+            ).exists()
+        )
+
+        response = self.client.post(
+            reverse("staff-assignment-clone"), {"source_year": previous.year, "target_year": self.year.year}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 0)
+        self.assertEqual(len(response.data["skipped"]), 2)
+
+    def test_import_refuses_a_past_academic_year(self):
+        previous = AcademicYear.objects.get(year=str(int(self.year.year) - 1))
+        rows = [{"username": "t_old", "email": "t_old@example.com", "class_level": "6", "subject": "English"}]
+        response = self.client.post(
+            reverse("staff-teacher-import"), {"rows": rows, "academic_year": previous.year}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("it has ended", response.data["error"])
+        self.assertFalse(get_user_model().objects.filter(username="t_old").exists())
+
+    def test_clone_refuses_past_targets_and_targets_before_the_source(self):
+        previous = AcademicYear.objects.get(year=str(int(self.year.year) - 1))
+        upcoming = create_academic_year(str(int(self.year.year) + 1), is_current=False)
+
+        with self.assertRaisesMessage(ServiceError, "it has ended"):
+            clone_assignments(source_year=self.year.year, target_year=previous.year)
+        with self.assertRaisesMessage(ServiceError, "must come after"):
+            clone_assignments(source_year=upcoming.year, target_year=self.year.year)
+        self.assertFalse(Assignment.objects.filter(academic_year=previous).exists())
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from authentication.models import StudentProfile, TeacherProfile
+from authentication.models import EmailOutbox, StudentProfile, TeacherProfile
 
 
 @admin.register(StudentProfile)
@@ -15,3 +15,17 @@ class TeacherProfileAdmin(admin.ModelAdmin):
     list_display = ("id", "user", "full_name", "employee_code", "created_at", "updated_at")
     search_fields = ("user__username", "user__email", "full_name", "employee_code")
     list_filter = ("created_at",)
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Delivery status of queued email; rows are written by the app and sent by authentication.outbox."""
+
+    list_display = ("id", "to", "subject", "status", "attempts", "next_attempt_at", "sent_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("to", "subject")
+    fields = ("to", "from_email", "subject", "body", "status", "attempts", "last_error", "next_attempt_at", "sent_at", "created_at")
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
@@ -24,3 +24,13 @@ class IsTeacherOrAdmin(BasePermission):
         if user.is_staff or user.is_superuser:
             return True
         return hasattr(user, "teacher_profile")
+
+
+class IsAdmin(BasePermission):
+    """Allows access only to Django staff or superusers."""
+
+    def has_permission(self, request, view):
+        user = getattr(request, "user", None)
+        if not user or not user.is_authenticated:
+            return False
+        return user.is_staff or user.is_superuser
@@ -2,7 +2,7 @@ import logging
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import PasswordResetForm
+from django.db import transaction
 from rest_framework import status, serializers
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
@@ -12,6 +12,9 @@ from rest_framework_simplejwt.views import TokenRefreshView
 from drf_spectacular.utils import OpenApiResponse, extend_schema, inline_serializer
 
 from academics.services import get_current_academic_year
+from config.db_routers import pin_to_primary
+from config.sqlite import serialized_write
+from config.tenancy import TENANT_CLAIM, get_current_tenant, tenant_database
 from authentication.api.serializers import (
     LoginSerializer,
     PasswordResetConfirmSerializer,
@@ -19,6 +22,7 @@ from authentication.api.serializers import (
     StudentRegistrationSerializer,
     UserSerializer,
 )
+from authentication.outbox import OutboxPasswordResetForm
 
 
 logger = logging.getLogger(__name__)
@@ -27,6 +31,10 @@ User = get_user_model()
 
 def _generate_tokens(user: User) -> dict:
     refresh = RefreshToken.for_user(user)
+    tenant = get_current_tenant()
+    if tenant is not None:
+        # Carried into the access token; TenantJWTAuthentication routes later requests by it.
+        refresh[TENANT_CLAIM] = tenant
     return {"access": str(refresh.access_token), "refresh": str(refresh)}
 
 
@@ -111,9 +119,12 @@ class StudentRegistrationView(APIView):
     def post(self, request):
         serializer = StudentRegistrationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        result = serializer.save()
+        with serialized_write():
+            result = serializer.save()
         user = result["user"]
         tokens = _generate_tokens(user)
+        # The new account is anonymous to the routing middleware; pin it so its first reads see the insert.
+        pin_to_primary(user.pk)
 
         logger.info("auth_registration", extra={"username": user.username, "result": "success"})
 
@@ -204,13 +215,15 @@ class PasswordResetView(APIView):
         serializer.is_valid(raise_exception=True)
         email = serializer.validated_data["email"]
 
-        form = PasswordResetForm({"email": email})
+        # The email goes to the outbox; it is sent after the response, off the request thread.
+        form = OutboxPasswordResetForm({"email": email})
         if form.is_valid():
-            form.save(
-                request=request,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                use_https=False,
-            )
+            with serialized_write(), transaction.atomic(using=tenant_database()):
+                form.save(
+                    request=request,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    use_https=False,
+                )
 
         logger.info("auth_password_reset", extra={"email": email, "result": "requested"})
         return Response({"message": "Password reset email sent"}, status=status.HTTP_200_OK)
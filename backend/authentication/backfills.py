@@ -0,0 +1,32 @@
+from django.db.models import IntegerField, Max
+from django.db.models.functions import Cast
+
+from config.backfill import Backfill, register
+
+
+STUDENT_ID_BASE = 221002001
+STUDENT_ID_LENGTH = 9
+
+
+@register
+class NormalizeStudentIds(Backfill):
+    """Give every student without a full nine-digit ID the next number in the sequence."""
+
+    name = "normalize_student_ids"
+    model = "authentication.StudentProfile"
+
+    def queryset(self, model):
+        return model._default_manager.only("id", "student_id")
+
+    def process_batch(self, apps, using, rows):
+        pending = [student for student in rows if len(student.student_id or "") < STUDENT_ID_LENGTH]
+        if not pending:
+            return
+        StudentProfile = apps.get_model(self.model)
+        profiles = StudentProfile._default_manager.using(using)
+        # Re-read the maximum per batch so an interrupted run resumes from the IDs already handed out.
+        agg = profiles.annotate(num=Cast("student_id", IntegerField())).aggregate(max_num=Max("num"))
+        next_num = max(STUDENT_ID_BASE, (agg["max_num"] or 0) + 1)
+        for offset, student in enumerate(pending):
+            student.student_id = f"{next_num + offset:0{STUDENT_ID_LENGTH}d}"
+        profiles.bulk_update(pending, ["student_id"])
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.outbox import dispatch_outbox
+from config.tenancy import TenantCommandMixin
+
+
+class Command(TenantCommandMixin, BaseCommand):
+    help = (
+        "Send due messages from the email outbox over one mail connection, including retries. "
+        "Run from cron, or with --loop when EMAIL_OUTBOX_SEND_ON_COMMIT is off."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Messages claimed at a time (default: EMAIL_OUTBOX_BATCH_SIZE)")
+        parser.add_argument("--loop", action="store_true", help="Keep running and check the outbox every --poll seconds")
+        parser.add_argument("--poll", type=float, default=5.0, help="Seconds between checks with --loop")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] is not None and options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if not settings.EMAIL_OUTBOX_SEND_ON_COMMIT and not options["loop"]:
+            self.stderr.write(self.style.WARNING("EMAIL_OUTBOX_SEND_ON_COMMIT is off; run with --loop to keep mail flowing."))
+
+        while True:
+            result = dispatch_outbox(batch_size=options["batch_size"])
+            if result.sent or result.retrying or result.failed or not options["loop"]:
+                self.stdout.write(f"Sent {result.sent}, retrying {result.retrying}, failed {result.failed}.")
+            if not options["loop"]:
+                return
+            time.sleep(options["poll"])
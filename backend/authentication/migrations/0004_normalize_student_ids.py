@@ -1,25 +1,16 @@
 from django.db import migrations
-from django.db.models import IntegerField, Max
-from django.db.models.functions import Cast
 
+from authentication.backfills import NormalizeStudentIds
+from config.backfill import run_backfill
 
-def normalize_student_ids(apps, schema_editor):
-    StudentProfile = apps.get_model("authentication", "StudentProfile")
-    base_start = 221002001
-    agg = StudentProfile.objects.annotate(num=Cast("student_id", IntegerField())).aggregate(max_num=Max("num"))
-    current_max = agg.get("max_num") or 0
-    next_num = max(base_start, current_max + 1)
 
-    for student in StudentProfile.objects.order_by("id"):
-        sid = student.student_id or ""
-        if len(str(sid)) >= 9:
-            continue
-        student.student_id = f"{next_num:09d}"
-        next_num += 1
-        student.save(update_fields=["student_id"])
+def normalize_student_ids(apps, schema_editor):
+    run_backfill(NormalizeStudentIds(), apps=apps, using=schema_editor.connection.alias, resume=False)
 
 
 class Migration(migrations.Migration):
+    # Each batch commits on its own (config.backfill); `manage.py run_backfill normalize_student_ids` reruns it online.
+    atomic = False
 
     dependencies = [
         ('authentication', '0003_studentprofile_student_id'),
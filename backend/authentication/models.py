@@ -4,6 +4,7 @@ from django.contrib.auth import get_user_model
 from django.db import models
 from django.db.models import IntegerField, Max
 from django.db.models.functions import Cast, Substr
+from django.utils import timezone
 
 
 User = get_user_model()
@@ -22,13 +23,17 @@ class StudentProfile(TimestampedModel):
     full_name = models.CharField(max_length=255, blank=True)
     student_id = models.CharField(max_length=20, unique=True, null=True, blank=True)
 
-    def _generate_student_id(self) -> str:
+    @classmethod
+    def allocate_student_ids(cls, count: int) -> list[str]:
+        """Reserve `count` sequential student IDs with a single max() scan."""
         base_start = int(os.getenv("STUDENT_ID_START", "221002001"))
-        cls = self.__class__
         agg = cls.objects.annotate(num=Cast("student_id", IntegerField())).aggregate(max_num=Max("num"))
         current_max = agg.get("max_num") or 0
         next_num = max(base_start, current_max + 1)
-        return f"{next_num:09d}"
+        return [f"{num:09d}" for num in range(next_num, next_num + count)]
+
+    def _generate_student_id(self) -> str:
+        return self.allocate_student_ids(1)[0]
 
     def save(self, *args, **kwargs):
         if not self.student_id:
@@ -44,14 +49,18 @@ class TeacherProfile(TimestampedModel):
     full_name = models.CharField(max_length=255, blank=True)
     employee_code = models.CharField(max_length=20, unique=True, null=True, blank=True)
 
-    def _generate_employee_code(self) -> str:
+    @classmethod
+    def allocate_employee_codes(cls, count: int) -> list[str]:
+        """Reserve `count` sequential employee codes with a single max() scan."""
         prefix = "EMP-"
-        cls = self.__class__
         agg = cls.objects.annotate(
             code_num=Cast(Substr("employee_code", len(prefix) + 1), IntegerField())
         ).aggregate(max_num=Max("code_num"))
         next_num = (agg.get("max_num") or 0) + 1
-        return f"{prefix}{next_num:03d}"
+        return [f"{prefix}{num:03d}" for num in range(next_num, next_num + count)]
+
+    def _generate_employee_code(self) -> str:
+        return self.allocate_employee_codes(1)[0]
 
     def save(self, *args, **kwargs):
         # If user is becoming a teacher, remove any existing student profile.
@@ -64,3 +73,38 @@ class TeacherProfile(TimestampedModel):
     def __str__(self) -> str:
         base = self.full_name or self.user.get_username()
         return f"{base} ({self.employee_code})" if self.employee_code else base
+
+
+class EmailOutbox(TimestampedModel):
+    """Email written by a request and delivered later by authentication.outbox (password resets)."""
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    to = models.EmailField()
+    from_email = models.CharField(max_length=255, blank=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # When the message is next due: retry backoff, or the lease of the dispatcher sending it now.
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx")]
+        verbose_name = "outbox email"
+        verbose_name_plural = "email outbox"
+
+    def __str__(self) -> str:
+        return f"{self.subject} -> {self.to} ({self.status})"
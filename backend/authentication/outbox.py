@@ -0,0 +1,187 @@
+"""
+Email outbox: requests write messages to the EmailOutbox table and return; delivery happens later.
+
+queue_email stores a message inside the caller's transaction. Once it commits, this process's
+single dispatcher thread drains the outbox (settings.EMAIL_OUTBOX_SEND_ON_COMMIT). A burst of
+password resets then shares one dispatch and one `get_connection()` instead of an SMTP handshake
+per request. `manage.py send_outbox` runs the same dispatch and retries failed sends that are due.
+
+A claimed batch is leased for EMAIL_OUTBOX_LEASE_SECONDS, so an outbox shared by several processes
+sends each message once. A message is sent again only if its dispatcher died mid-send.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.contrib.auth.forms import PasswordResetForm
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, connections, transaction
+from django.template import loader
+from django.utils import timezone
+
+from config.db_routers import primary_db
+from config.sqlite import serialized_write
+from config.tenancy import get_current_tenant, tenant_context, tenant_database
+
+from .models import EmailOutbox
+
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_scheduled = set()
+_schedule_lock = threading.Lock()
+
+
+@dataclass
+class DispatchResult:
+    sent: int = 0
+    retrying: int = 0
+    failed: int = 0
+
+
+def queue_email(to: str, subject: str, body: str, *, from_email: Optional[str] = None, html_body: str = "") -> EmailOutbox:
+    """Store a message for the dispatcher; call inside the transaction that decided to send it."""
+    message = EmailOutbox.objects.create(
+        to=to, subject=subject, body=body, html_body=html_body or "", from_email=from_email or ""
+    )
+    if settings.EMAIL_OUTBOX_SEND_ON_COMMIT:
+        tenant = get_current_tenant()
+        transaction.on_commit(lambda: _schedule_dispatch(tenant), using=tenant_database())
+    return message
+
+
+class OutboxPasswordResetForm(PasswordResetForm):
+    """PasswordResetForm that queues the reset email instead of sending it during the request."""
+
+    def send_mail(
+        self, subject_template_name, email_template_name, context, from_email, to_email, html_email_template_name=None
+    ):
+        subject = "".join(loader.render_to_string(subject_template_name, context).splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_body = loader.render_to_string(html_email_template_name, context) if html_email_template_name else ""
+        queue_email(to_email, subject, body, from_email=from_email, html_body=html_body)
+
+
+def _schedule_dispatch(tenant: Optional[str]):
+    """Start a drain for `tenant` unless one is already waiting to run."""
+    global _executor
+    with _schedule_lock:
+        if tenant in _scheduled:
+            return
+        _scheduled.add(tenant)
+        if _executor is None:
+            # One thread: drains run one after another and each reuses a single mail connection.
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="email-outbox")
+        executor = _executor
+    executor.submit(_dispatch_in_background, tenant)
+
+
+def _dispatch_in_background(tenant: Optional[str]):
+    # Cleared before draining, so a message committed during this drain schedules the next one.
+    with _schedule_lock:
+        _scheduled.discard(tenant)
+    close_old_connections()
+    try:
+        with tenant_context(tenant):
+            dispatch_outbox()
+    except Exception:  # noqa: BLE001 - the rows stay pending for the next drain
+        logger.exception("outbox_dispatch_failed", extra={"tenant": tenant})
+    finally:
+        close_old_connections()
+
+
+@primary_db
+def _claim_batch(batch_size: int) -> List[EmailOutbox]:
+    using = tenant_database()
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    with serialized_write(), transaction.atomic(using=using):
+        due = EmailOutbox.objects.filter(status=EmailOutbox.STATUS_PENDING, next_attempt_at__lte=now)
+        if connections[using].features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.order_by("next_attempt_at", "pk").values_list("pk", flat=True)[:batch_size])
+        # The due check repeats in the UPDATE; without row locks (SQLite) another process may have won.
+        EmailOutbox.objects.filter(
+            pk__in=ids, status=EmailOutbox.STATUS_PENDING, next_attempt_at__lte=now
+        ).update(
+            claim_token=token,
+            next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS),
+            updated_at=now,
+        )
+    return list(EmailOutbox.objects.filter(pk__in=ids, claim_token=token).order_by("pk"))
+
+
+def _as_email(message: EmailOutbox, connection) -> EmailMultiAlternatives:
+    email = EmailMultiAlternatives(
+        message.subject, message.body, message.from_email or None, [message.to], connection=connection
+    )
+    if message.html_body:
+        email.attach_alternative(message.html_body, "text/html")
+    return email
+
+
+@serialized_write()
+def _record_failure(message: EmailOutbox, exc: Exception, result: DispatchResult):
+    message.attempts += 1
+    message.last_error = str(exc) or exc.__class__.__name__
+    message.claim_token = ""
+    if message.attempts < settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        delay = settings.EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS * 2 ** (message.attempts - 1)
+        message.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        result.retrying += 1
+    else:
+        message.status = EmailOutbox.STATUS_FAILED
+        result.failed += 1
+    message.save(update_fields=["attempts", "last_error", "claim_token", "next_attempt_at", "status", "updated_at"])
+    logger.warning(
+        "outbox_send_failed",
+        extra={"message_id": message.pk, "attempts": message.attempts, "status": message.status},
+    )
+
+
+def dispatch_outbox(*, batch_size: Optional[int] = None) -> DispatchResult:
+    """
+    Send every due message in batches of `batch_size` over one mail connection. A failed send
+    is retried with exponential backoff up to EMAIL_OUTBOX_MAX_ATTEMPTS, then marked failed.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    result = DispatchResult()
+    connection = None
+    try:
+        while batch := _claim_batch(batch_size):
+            sent_ids = []
+            for message in batch:
+                try:
+                    if connection is None:
+                        connection = get_connection(fail_silently=False)
+                        connection.open()
+                    connection.send_messages([_as_email(message, connection)])
+                    sent_ids.append(message.pk)
+                except Exception as exc:  # noqa: BLE001 - recorded on the row and retried
+                    _record_failure(message, exc, result)
+                    # The server may have dropped us; the next message gets a fresh connection.
+                    if connection is not None:
+                        connection.close()
+                        connection = None
+            if sent_ids:
+                with serialized_write():
+                    now = timezone.now()
+                    EmailOutbox.objects.filter(pk__in=sent_ids).update(
+                        status=EmailOutbox.STATUS_SENT, sent_at=now, claim_token="", last_error="", updated_at=now
+                    )
+                result.sent += len(sent_ids)
+    finally:
+        if connection is not None:
+            connection.close()
+    if result.sent or result.retrying or result.failed:
+        logger.info("outbox_dispatched", extra=asdict(result))
+    return result
@@ -0,0 +1,78 @@
+import io
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.models import EmailOutbox
+from authentication.outbox import dispatch_outbox, queue_email
+from authentication.tests.fixtures import create_student
+
+
+class PasswordResetOutboxTests(APITestCase):
+    def test_reset_request_queues_email_and_dispatch_sends_it(self):
+        user, _ = create_student()
+        with mock.patch("authentication.outbox._schedule_dispatch") as schedule, self.captureOnCommitCallbacks(
+            execute=True
+        ):
+            response = self.client.post(reverse("password_reset"), {"email": user.email}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(mail.outbox, [])
+        schedule.assert_called_once_with(None)
+        queued = EmailOutbox.objects.get()
+        self.assertEqual((queued.to, queued.status), (user.email, EmailOutbox.STATUS_PENDING))
+
+        self.assertEqual(dispatch_outbox().sent, 1)
+        self.assertEqual(mail.outbox[0].to, [user.email])
+        self.assertIn("/password-reset/confirm/", mail.outbox[0].body)
+        self.assertEqual(EmailOutbox.objects.get().status, EmailOutbox.STATUS_SENT)
+
+
+@override_settings(EMAIL_OUTBOX_SEND_ON_COMMIT=False, EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS=60)
+class DispatchTests(TestCase):
+    def test_batches_share_one_connection(self):
+        for index in range(5):
+            queue_email(f"user{index}@example.com", "Hello", "Body", html_body="<p>Body</p>")
+
+        with mock.patch("authentication.outbox.get_connection", wraps=get_connection) as opened:
+            result = dispatch_outbox(batch_size=2)
+
+        self.assertEqual(result.sent, 5)
+        opened.assert_called_once()
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].alternatives, [("<p>Body</p>", "text/html")])
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.STATUS_SENT).exists())
+
+    def test_failed_send_backs_off_then_gives_up(self):
+        message = queue_email("user@example.com", "Hello", "Body")
+        connection = mock.Mock()
+        connection.send_messages.side_effect = SMTPServerDisconnected("gone")
+
+        with mock.patch("authentication.outbox.get_connection", return_value=connection):
+            self.assertEqual(dispatch_outbox().retrying, 1)
+            message.refresh_from_db()
+            self.assertEqual((message.status, message.attempts, message.last_error), ("pending", 1, "gone"))
+            self.assertGreater(message.next_attempt_at, timezone.now() + timedelta(seconds=50))
+            # Not due yet.
+            self.assertEqual(dispatch_outbox().retrying, 0)
+
+            EmailOutbox.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+            self.assertEqual(dispatch_outbox().failed, 1)
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (EmailOutbox.STATUS_FAILED, 2))
+
+    def test_send_outbox_command(self):
+        queue_email("user@example.com", "Hello", "Body")
+        out = io.StringIO()
+        call_command("send_outbox", stdout=out, stderr=io.StringIO())
+        self.assertIn("Sent 1, retrying 0, failed 0.", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import BackfillProgress
+
+
+@admin.register(BackfillProgress)
+class BackfillProgressAdmin(admin.ModelAdmin):
+    """Read-only view of `manage.py run_backfill` markers."""
+
+    list_display = ("name", "last_pk", "rows_processed", "batches", "started_at", "updated_at", "completed_at")
+    readonly_fields = list_display
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class ProjectConfig(AppConfig):
+    name = 'config'
+    verbose_name = 'Project configuration'
+
+    def ready(self):
+        from . import sqlite  # noqa: F401
+        from .db_routers import check_pin_cache
+
+        check_pin_cache()
@@ -0,0 +1,84 @@
+"""
+Async building blocks for ASGI deployments (config.asgi).
+
+AsyncAPIView lets a DRF view define `async def get(...)`. Authentication, permissions and throttles
+still use the sync DRF classes, so they run in a worker thread and the event loop is never
+blocked on the database.
+
+gather_sections runs independent sync ORM callables at the same time. Django 4.2's async ORM
+(`aget`, `afirst`, ...) sends every query through one shared thread, so it is fine for single
+lookups, but work that should overlap needs its own threads and connections. With
+settings.ASYNC_PARALLEL_SECTIONS off, the sections run one after another on that shared thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from typing import Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.views import APIView
+
+from config.timeouts import statement_timeout
+
+
+def _section_runner(func: Callable, statement_budget: Optional[int], own_thread: bool):
+    @functools.wraps(func)
+    def run(*args):
+        # Worker threads keep their own connections; treat each section like a request for CONN_MAX_AGE.
+        if own_thread:
+            close_old_connections()
+        try:
+            with statement_timeout(statement_budget):
+                return func(*args)
+        finally:
+            if own_thread:
+                close_old_connections()
+
+    return run
+
+
+async def gather_sections(*calls, statement_budget: Optional[int] = None) -> list:
+    """
+    Await `(func, *args)` calls concurrently and return their results in order. The tenant and
+    primary-routing context variables carry into each worker thread.
+    """
+    parallel = settings.ASYNC_PARALLEL_SECTIONS
+    return await asyncio.gather(
+        *(
+            sync_to_async(_section_runner(func, statement_budget, parallel), thread_sensitive=not parallel)(*args)
+            for func, *args in calls
+        )
+    )
+
+
+class AsyncAPIView(APIView):
+    """APIView whose handlers are coroutines; the request still goes through DRF's policies and exception handler."""
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication and permission checks query the database.
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
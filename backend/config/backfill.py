@@ -0,0 +1,149 @@
+"""
+Online backfills: rewrite a table in small keyset-ordered batches instead of one long transaction.
+
+A backfill names a model and implements process_batch(). run_backfill() walks the model's rows by
+primary key. It commits each batch in its own short transaction and can sleep between batches so
+live traffic keeps getting the write lock. When resume markers are on, every batch's last primary
+key is stored in BackfillProgress in the same transaction. An interrupted run continues after the
+last committed batch.
+
+Data migrations delegate with run_backfill(..., apps=apps, using=schema_editor.connection.alias,
+resume=False) on a non-atomic migration. `manage.py run_backfill <name>` runs the same backfill
+outside the deploy window. Backfills live in each app's `backfills` module and use @register.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from config.models import BackfillProgress
+from config.tenancy import tenant_database
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+_registry: Dict[str, "Backfill"] = {}
+
+
+class Backfill:
+    """
+    `model` is an "app_label.ModelName" label, resolved through the app registry the runner
+    receives: a migration's historical apps, or the live registry. process_batch() should only use
+    models from `apps`, so the same code is safe inside old migrations.
+    """
+
+    name: str = ""
+    model: str = ""
+    batch_size: int = DEFAULT_BATCH_SIZE
+
+    def queryset(self, model):
+        return model._default_manager.all()
+
+    def process_batch(self, apps, using: str, rows: List) -> None:
+        raise NotImplementedError
+
+
+@dataclass
+class BackfillResult:
+    name: str
+    rows: int
+    batches: int
+    last_pk: Optional[int]
+    completed: bool
+
+
+def register(cls):
+    """Class decorator: make a Backfill available to `manage.py run_backfill`."""
+    _registry[cls.name] = cls()
+    return cls
+
+
+def autodiscover():
+    autodiscover_modules("backfills")
+
+
+def get_backfill(name: str) -> Backfill:
+    return _registry[name]
+
+
+def registered_backfills() -> List[Backfill]:
+    return [_registry[name] for name in sorted(_registry)]
+
+
+def run_backfill(
+    backfill: Backfill,
+    *,
+    apps=global_apps,
+    using: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    sleep: float = 0.0,
+    max_batches: Optional[int] = None,
+    resume: bool = True,
+    restart: bool = False,
+    on_batch: Optional[Callable[[BackfillResult], None]] = None,
+) -> BackfillResult:
+    """
+    Process rows after the stored marker (or from the start) until the table is exhausted or
+    `max_batches` have committed. With `resume`, the BackfillProgress row is locked for each batch,
+    so two runners of the same backfill take turns instead of processing the same rows twice.
+    """
+    using = using or tenant_database()
+    batch_size = batch_size or backfill.batch_size
+    model = apps.get_model(backfill.model)
+    rows_qs = backfill.queryset(model).using(using).order_by("pk")
+
+    if resume:
+        progress, _ = BackfillProgress.objects.using(using).get_or_create(name=backfill.name)
+        if restart:
+            BackfillProgress.objects.using(using).filter(pk=progress.pk).update(
+                last_pk=None, rows_processed=0, batches=0, completed_at=None, started_at=timezone.now()
+            )
+
+    result = BackfillResult(name=backfill.name, rows=0, batches=0, last_pk=None, completed=False)
+    while max_batches is None or result.batches < max_batches:
+        with transaction.atomic(using=using):
+            if resume:
+                progress = BackfillProgress.objects.using(using).select_for_update().get(name=backfill.name)
+                result.last_pk = progress.last_pk
+            batch_qs = rows_qs if result.last_pk is None else rows_qs.filter(pk__gt=result.last_pk)
+            rows = list(batch_qs[:batch_size])
+            if rows:
+                backfill.process_batch(apps, using, rows)
+                result.last_pk = rows[-1].pk
+                result.rows += len(rows)
+                result.batches += 1
+            result.completed = len(rows) < batch_size
+            if resume:
+                progress.last_pk = result.last_pk
+                progress.rows_processed += len(rows)
+                progress.batches += 1 if rows else 0
+                progress.completed_at = timezone.now() if result.completed else None
+                progress.save(using=using)
+
+        if rows:
+            logger.info(
+                "backfill_batch",
+                extra={"backfill": backfill.name, "rows": len(rows), "last_pk": result.last_pk, "database": using},
+            )
+            if on_batch:
+                on_batch(result)
+        if result.completed:
+            break
+        if sleep:
+            time.sleep(sleep)
+
+    logger.info(
+        "backfill_finished" if result.completed else "backfill_paused",
+        extra={"backfill": backfill.name, "rows": result.rows, "batches": result.batches, "database": using},
+    )
+    return result
@@ -0,0 +1,90 @@
+"""
+PostgreSQL engine that borrows psycopg2 connections from a process-wide pool.
+
+Enable with ENGINE "config.db_backends.postgresql_pool" and a "POOL" dict in the database settings
+(MAX_SIZE, TIMEOUT, HEALTH_CHECK_AFTER). Django still "closes" the connection at the end of each
+request (CONN_MAX_AGE=0); closing hands it back to the pool instead of disconnecting.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Tuple
+
+import psycopg2.extras
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import DatabaseCreation as PostgreSQLDatabaseCreation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+
+from .pool import ConnectionPool
+
+
+POOL_DEFAULTS = {"MAX_SIZE": 20, "TIMEOUT": 10.0, "HEALTH_CHECK_AFTER": 30.0}
+
+_pools: Dict[Tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(alias: str, conn_params: dict) -> Tuple:
+    return (alias, conn_params.get("dbname"), conn_params.get("host"), conn_params.get("port"), conn_params.get("user"))
+
+
+def get_pool(alias: str, settings_dict: dict, conn_params: dict) -> ConnectionPool:
+    key = _pool_key(alias, conn_params)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            options = {**POOL_DEFAULTS, **(settings_dict.get("POOL") or {})}
+            pool = _pools[key] = ConnectionPool(
+                lambda: base.Database.connect(**conn_params),
+                max_size=int(options["MAX_SIZE"]),
+                timeout=float(options["TIMEOUT"]),
+                health_check_after=float(options["HEALTH_CHECK_AFTER"]),
+            )
+        return pool
+
+
+def pool_stats(alias: str = "default") -> Dict[str, dict]:
+    """Counters for every pool opened for `alias`, keyed by database name."""
+    with _pools_lock:
+        return {key[1]: pool.stats() for key, pool in _pools.items() if key[0] == alias}
+
+
+def close_pools(alias: str):
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items() if key[0] == alias]
+    for pool in pools:
+        pool.close_idle()
+
+
+class DatabaseCreation(PostgreSQLDatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections to the test database would block DROP DATABASE.
+        close_pools(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if is_psycopg3:
+            raise ImproperlyConfigured("config.db_backends.postgresql_pool requires psycopg2.")
+        self._pool = None
+
+    def get_new_connection(self, conn_params):
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level", IsolationLevel.READ_COMMITTED)
+        self.isolation_level = IsolationLevel(isolation_level)
+        self._pool = get_pool(self.alias, self.settings_dict, conn_params)
+        connection = self._pool.acquire()
+        # Pooled connections may carry a previous borrower's session settings; reapply ours.
+        connection.isolation_level = self.isolation_level
+        psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._pool.release(self.connection)
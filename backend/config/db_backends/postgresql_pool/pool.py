@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from psycopg2 import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INERROR, TRANSACTION_STATUS_INTRANS
+
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(OperationalError):
+    """No pooled connection became free within the configured timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections shared by every DatabaseWrapper of one database.
+
+    At most `max_size` connections exist at once; callers beyond that wait up to `timeout` seconds.
+    Idle connections are reused newest-first and pinged with SELECT 1 before reuse once they have
+    been idle for `health_check_after` seconds. Connections come back rolled back to an idle
+    transaction state or are discarded.
+    """
+
+    def __init__(
+        self,
+        connect: Callable,
+        *,
+        max_size: int,
+        timeout: float,
+        health_check_after: float,
+        slow_wait: float = 0.1,
+    ):
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self.slow_wait = slow_wait
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle: List[Tuple[object, float]] = []
+        self._in_use = 0
+        self._counters = {
+            "acquired": 0,
+            "created": 0,
+            "discarded": 0,
+            "timeouts": 0,
+            "waited": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def acquire(self):
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._counters["timeouts"] += 1
+            logger.warning("db_pool_timeout", extra={"max_size": self.max_size, "timeout": self.timeout})
+            raise PoolTimeout(f"No database connection became available within {self.timeout}s.")
+        waited = time.monotonic() - started
+        self._record_wait(waited)
+        try:
+            connection = self._reuse_idle()
+            if connection is None:
+                connection = self._connect()
+                with self._lock:
+                    self._counters["created"] += 1
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use += 1
+        return connection
+
+    def release(self, connection):
+        """Return `connection` to the pool, resetting any open transaction first."""
+        reusable = self._reset(connection)
+        with self._lock:
+            self._in_use -= 1
+            if reusable:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._counters["discarded"] += 1
+        if not reusable:
+            self._close_quietly(connection)
+        self._slots.release()
+
+    def close_idle(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+            }
+
+    def _record_wait(self, waited: float):
+        with self._lock:
+            self._counters["acquired"] += 1
+            if waited >= self.slow_wait:
+                self._counters["waited"] += 1
+            self._counters["wait_seconds"] += waited
+            self._counters["max_wait_seconds"] = max(self._counters["max_wait_seconds"], waited)
+        if waited >= self.slow_wait:
+            logger.warning("db_pool_wait", extra={"wait_ms": round(waited * 1000, 1), "max_size": self.max_size})
+
+    def _reuse_idle(self) -> Optional[object]:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, idle_since = self._idle.pop()
+            if self._healthy(connection, time.monotonic() - idle_since):
+                return connection
+            with self._lock:
+                self._counters["discarded"] += 1
+            self._close_quietly(connection)
+
+    def _healthy(self, connection, idle_for: float) -> bool:
+        if connection.closed:
+            return False
+        if idle_for < self.health_check_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            # The ping opens a transaction when autocommit is off; leave the connection idle again.
+            if connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except Exception:  # noqa: BLE001 - any failure means the connection is not reusable
+            return False
+        return True
+
+    def _reset(self, connection) -> bool:
+        if connection.closed:
+            return False
+        status = connection.get_transaction_status()
+        if status == TRANSACTION_STATUS_IDLE:
+            return True
+        if status in (TRANSACTION_STATUS_INTRANS, TRANSACTION_STATUS_INERROR):
+            try:
+                connection.rollback()
+            except Exception:  # noqa: BLE001
+                return False
+            return True
+        # ACTIVE (a query still running) or UNKNOWN (broken link) cannot be handed to someone else.
+        return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:  # noqa: BLE001
+            pass
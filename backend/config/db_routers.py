@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import functools
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+PRIMARY_DATABASE = "default"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Cache backends whose entries other worker processes cannot see.
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+_force_primary: ContextVar[bool] = ContextVar("force_primary", default=False)
+
+
+def replica_aliases() -> list:
+    return list(getattr(settings, "REPLICA_DATABASES", []))
+
+
+@contextmanager
+def use_primary():
+    """Send every read in the block to the primary (writes always go there)."""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+def primary_db(func):
+    """Decorator for write paths whose validation reads must see the primary, not a lagging replica."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_primary():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def check_pin_cache():
+    """
+    Read-your-writes pins live in the default cache. With a per-process cache the next request
+    usually lands on a process that never saw the pin and reads a lagging replica, so refuse to
+    start with replicas configured unless the cache is shared.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if replica_aliases() and backend in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f"DB_REPLICAS needs a cache shared by all processes for read-your-writes pins; CACHE_BACKEND is {backend}."
+        )
+
+
+def _pin_key(user_id) -> str:
+    return f"db:pin-primary:{user_id}"
+
+
+def pin_to_primary(user_id):
+    """Keep `user_id` on the primary for REPLICA_PIN_SECONDS so they read their own writes."""
+    if replica_aliases() and user_id is not None:
+        cache.set(_pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id) -> bool:
+    return bool(replica_aliases()) and user_id is not None and cache.get(_pin_key(user_id), False)
+
+
+class ReplicaRouter:
+    """
+    Reads go to a random replica from REPLICA_DATABASES unless the current context is forced onto
+    the primary; writes, relations and migrations stay on the primary. Without replicas every
+    query uses `default`.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or _force_primary.get():
+            return PRIMARY_DATABASE
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DATABASE
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Unsafe requests run entirely on the primary and pin the signed-in user there afterwards.
+    Safe requests from a pinned session user are forced onto the primary too; JWT users are
+    checked in PinnedJWTAuthentication because they are only known once DRF authenticates.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+        unsafe = request.method not in SAFE_METHODS
+        token = _force_primary.set(unsafe or is_pinned(_session_user_id(request)))
+        try:
+            response = self.get_response(request)
+        finally:
+            _force_primary.reset(token)
+        self._pin_writer(request, unsafe, response)
+        return response
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+        unsafe = request.method not in SAFE_METHODS
+        # The session user and the pin both hit storage, so they are looked up off the event loop.
+        pinned = unsafe or await sync_to_async(lambda: is_pinned(_session_user_id(request)))()
+        token = _force_primary.set(pinned)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _force_primary.reset(token)
+        await sync_to_async(self._pin_writer)(request, unsafe, response)
+        return response
+
+    @staticmethod
+    def _pin_writer(request, unsafe, response):
+        # DRF copies the authenticated user back onto the Django request, so JWT writers are seen here.
+        user_id = _session_user_id(request)
+        if unsafe and response.status_code < 400 and user_id is not None:
+            pin_to_primary(user_id)
+
+
+def _session_user_id(request):
+    user = getattr(request, "user", None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+class PinnedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that moves the rest of the request onto the primary for pinned users."""
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None and is_pinned(result[0].pk):
+            _force_primary.set(True)
+        return result
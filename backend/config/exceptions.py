@@ -2,7 +2,13 @@ from __future__ import annotations
 
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework.views import exception_handler
+from rest_framework.views import exception_handler, set_rollback
+
+from config.timeouts import is_statement_timeout
+
+
+# Seconds clients are told to wait before retrying a request whose query was cancelled.
+STATEMENT_TIMEOUT_RETRY_AFTER = 30
 
 
 def json_exception_handler(exc, context):
@@ -11,6 +17,14 @@ def json_exception_handler(exc, context):
         response.data = _format_error_payload(response.data, getattr(exc, "default_code", "error"))
         return response
 
+    if is_statement_timeout(exc):
+        set_rollback()
+        return Response(
+            _format_error_payload("The request took too long and was cancelled; narrow it and retry.", "statement_timeout"),
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(STATEMENT_TIMEOUT_RETRY_AFTER)},
+        )
+
     return Response(
         _format_error_payload(str(exc), "server_error"),
         status=status.HTTP_500_INTERNAL_SERVER_ERROR,
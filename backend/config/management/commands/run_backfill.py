@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from config.backfill import autodiscover, get_backfill, registered_backfills, run_backfill
+from config.models import BackfillProgress
+from config.tenancy import TenantCommandMixin, tenant_database
+
+
+class Command(TenantCommandMixin, BaseCommand):
+    help = "Run a registered data backfill in short batches, resuming after the last committed batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", nargs="?", help="Backfill name; omit with --list")
+        parser.add_argument("--list", action="store_true", help="Show registered backfills and their progress")
+        parser.add_argument("--batch-size", type=int, help="Rows per transaction (default: the backfill's own)")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between batches")
+        parser.add_argument("--max-batches", type=int, help="Stop after this many batches; rerun to continue")
+        parser.add_argument("--restart", action="store_true", help="Ignore the stored marker and start from the first row")
+
+    def handle(self, *args, **options):
+        autodiscover()
+        if options["list"]:
+            progress = {row.name: row for row in BackfillProgress.objects.using(tenant_database())}
+            for backfill in registered_backfills():
+                state = progress.get(backfill.name, "not started")
+                self.stdout.write(f"{backfill.name}: {backfill.model} - {state}")
+            return
+        if not options["name"]:
+            raise CommandError("Give a backfill name or --list.")
+        try:
+            backfill = get_backfill(options["name"])
+        except KeyError as exc:
+            raise CommandError(f"Unknown backfill {options['name']}.") from exc
+        if options["batch_size"] is not None and options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        result = run_backfill(
+            backfill,
+            batch_size=options["batch_size"],
+            sleep=options["sleep"],
+            max_batches=options["max_batches"],
+            restart=options["restart"],
+            on_batch=lambda result: self.stdout.write(f"  {result.rows} rows, last pk {result.last_pk}"),
+        )
+
+        if result.completed:
+            self.stdout.write(self.style.SUCCESS(f"{backfill.name}: finished after {result.rows} rows."))
+        else:
+            self.stdout.write(
+                self.style.WARNING(f"{backfill.name}: paused after {result.rows} rows (pk {result.last_pk}); rerun to continue.")
+            )
@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class BackfillProgress(models.Model):
+    """Resume marker for a config.backfill run: the last primary key whose batch committed."""
+
+    name = models.CharField(max_length=100, unique=True)
+    last_pk = models.BigIntegerField(null=True, blank=True)
+    rows_processed = models.PositiveBigIntegerField(default=0)
+    batches = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name_plural = "backfill progress"
+
+    def __str__(self) -> str:
+        state = "done" if self.completed_at else f"after pk {self.last_pk}"
+        return f"{self.name} ({state})"
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'config',
     'rest_framework',
     'rest_framework_simplejwt',
     'drf_spectacular',
@@ -49,10 +50,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'config.tenancy.TenantMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'config.db_routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -101,6 +104,97 @@ else:
             'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
         }
     }
+    # Optional process-wide connection pool (config.db_backends.postgresql_pool). Connections go back
+    # to the pool at the end of every request instead of being held per thread for CONN_MAX_AGE.
+    if os.getenv('DB_POOL', '').lower() in ('1', 'true', 'yes'):
+        DATABASES['default'].update(
+            {
+                'ENGINE': 'config.db_backends.postgresql_pool',
+                'CONN_MAX_AGE': 0,
+                'POOL': {
+                    'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', 20)),
+                    'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+                    'HEALTH_CHECK_AFTER': float(os.getenv('DB_POOL_HEALTH_CHECK_AFTER', 30)),
+                },
+            }
+        )
+
+# Build the student dashboard and exam roster JSON inside PostgreSQL (academics.pg_payloads).
+# Ignored on SQLite, which always uses the ORM path.
+PG_JSON_PAYLOADS = os.getenv('PG_JSON_PAYLOADS', '').lower() in ('1', 'true', 'yes')
+
+# Per-statement time budget in ms for API views and heavy services (config.timeouts); views may
+# declare their own. Cancelled queries answer 503. 0 disables every budget.
+STATEMENT_TIMEOUT_MS = int(os.getenv('STATEMENT_TIMEOUT_MS', 10000))
+
+# Async dashboard views (config.async_support) fetch independent sections on parallel threads,
+# each with its own connection; 0 runs them one after another on the shared ORM thread.
+ASYNC_PARALLEL_SECTIONS = os.getenv('ASYNC_PARALLEL_SECTIONS', '1').lower() in ('1', 'true', 'yes')
+
+# Student event stream (academics.events): how often a stream checks for events committed by other
+# processes, and how long one connection lasts before the client reconnects with Last-Event-ID.
+SSE_POLL_SECONDS = float(os.getenv('SSE_POLL_SECONDS', 15))
+SSE_STREAM_SECONDS = float(os.getenv('SSE_STREAM_SECONDS', 300))
+
+# SQLite tuning for single-node deployments (config.sqlite); SQLITE_TUNED=0 keeps SQLite defaults.
+SQLITE_TUNED = os.getenv("SQLITE_TUNED", "1").lower() in ("1", "true", "yes")
+SQLITE_PRAGMAS = (
+    {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        "cache_size": -int(os.getenv("SQLITE_CACHE_KB", 64000)),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_BYTES", 256 * 1024 * 1024)),
+        "temp_store": "MEMORY",
+    }
+    if SQLITE_TUNED
+    else {}
+)
+# Queue SQLite writers from save_marks / create_exam / registration on an in-process lock.
+SQLITE_SERIALIZE_WRITES = SQLITE_TUNED
+
+# Read replicas: comma-separated hosts (PostgreSQL) or database files (SQLite) that mirror `default`.
+# Reads are spread across them by config.db_routers; tests mirror them onto the default test database.
+for index, location in enumerate(filter(None, os.getenv("DB_REPLICAS", "").split(",")), start=1):
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        ("NAME" if USE_SQLITE else "HOST"): location.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+REPLICA_DATABASES = [alias for alias in DATABASES if alias.startswith("replica_")]
+# Seconds a user keeps reading from the primary after a write (read-your-writes).
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
+# Multi-school tenancy (config.tenancy): TENANTS="north=north.example.org|north.localhost,south=south.example.org".
+# Each school gets the alias tenant_<slug>: its own SQLite file, or a PostgreSQL database <DB_NAME>_<slug>
+# on TENANT_<SLUG>_DB_HOST (DB_HOST by default) so large schools can be moved to their own node.
+# Create the schema with `python manage.py migrate --database tenant_<slug>`.
+TENANTS = {}
+for entry in filter(None, os.getenv("TENANTS", "").split(",")):
+    slug, _, hostnames = entry.strip().partition("=")
+    tenant_db = {**DATABASES["default"]}
+    if USE_SQLITE:
+        tenant_db["NAME"] = BASE_DIR / f"db_{slug}.sqlite3"
+    else:
+        tenant_db["NAME"] = f"{DATABASES['default']['NAME']}_{slug}"
+        tenant_db["HOST"] = os.getenv(f"TENANT_{slug.upper()}_DB_HOST", DATABASES["default"]["HOST"])
+    DATABASES[f"tenant_{slug}"] = tenant_db
+    TENANTS[slug] = {"database": f"tenant_{slug}", "hostnames": [name for name in hostnames.split("|") if name]}
+
+DATABASE_ROUTERS = ["config.tenancy.TenantRouter", "config.db_routers.ReplicaRouter"]
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+        # Cache keys are namespaced by the active school.
+        "KEY_FUNCTION": "config.tenancy.make_cache_key",
+    }
+}
+
+# Exam analytics are dropped when marks change, but only from the cache of the process that saved
+# them (LocMemCache is per process); the timeout bounds how stale other processes can be.
+ANALYTICS_CACHE_SECONDS = int(os.getenv("ANALYTICS_CACHE_SECONDS", 300))
 
 
 # Password validation
@@ -147,7 +241,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "config.tenancy.TenantJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -192,9 +286,31 @@ LOGGING = {
     "loggers": {
         "authentication": {"handlers": ["console"], "level": "INFO"},
         "academics": {"handlers": ["console"], "level": "INFO"},
+        "config": {"handlers": ["console"], "level": "INFO"},
         "django.request": {"handlers": ["console"], "level": "WARNING", "propagate": False},
     },
 }
 
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "no-reply@example.com")
+
+# Email outbox (authentication.outbox): password-reset mail is queued, then sent in batches over one connection.
+EMAIL_OUTBOX_SEND_ON_COMMIT = os.getenv("EMAIL_OUTBOX_SEND_ON_COMMIT", "1").lower() in ("1", "true", "yes")
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", 5))
+EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS = int(os.getenv("EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS", 60))
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.getenv("EMAIL_OUTBOX_LEASE_SECONDS", 300))
+
+# Password-hashing processes per import request from the API; manage.py imports use every CPU by default.
+IMPORT_WEB_WORKERS = int(os.getenv("IMPORT_WEB_WORKERS", 1))
+
+# Background jobs (academics.jobs): worker threads per process; eager mode runs jobs inline after commit.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOBS_EAGER = os.getenv("JOBS_EAGER", "").lower() in ("1", "true", "yes")
+# "thread" runs jobs in the web process; "db" leaves them in the jobs table for `manage.py run_worker`.
+JOB_BACKEND = os.getenv("JOB_BACKEND", "thread").lower()
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+JOB_RETRY_BACKOFF_SECONDS = int(os.getenv("JOB_RETRY_BACKOFF_SECONDS", 30))
+JOB_LOCK_TIMEOUT_SECONDS = int(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", 3600))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", 60))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 2))
@@ -0,0 +1,54 @@
+"""
+Tuning for single-node SQLite deployments (USE_SQLITE=1).
+
+Every new connection gets the pragmas in settings.SQLITE_PRAGMAS (WAL journal, relaxed fsync,
+mmap, page cache, busy timeout). SQLite allows one writer at a time, so write services are also
+wrapped in `serialized_write`: writers inside this process queue on a lock instead of racing for
+the database lock, and the busy timeout covers writers in other processes.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import ContextDecorator
+from typing import Optional
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from config.tenancy import tenant_database
+
+
+_write_lock = threading.RLock()
+
+
+@receiver(connection_created, dispatch_uid="config.sqlite.apply_pragmas")
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    # Straight on the sqlite3 connection so the pragmas don't show up as application queries.
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+class serialized_write(ContextDecorator):
+    """Run the block while holding the process-wide SQLite write lock; a no-op on other databases."""
+
+    def __init__(self, using: Optional[str] = None):
+        self.using = using
+        self._held = threading.local()
+
+    def __enter__(self):
+        using = self.using or tenant_database()
+        held = settings.SQLITE_SERIALIZE_WRITES and connections[using].vendor == "sqlite"
+        if held:
+            _write_lock.acquire()
+        self._held.__dict__.setdefault("stack", []).append(held)
+        return self
+
+    def __exit__(self, *exc):
+        if self._held.stack.pop():
+            _write_lock.release()
+        return False
@@ -0,0 +1,230 @@
+"""
+Multi-school tenancy: every school (tenant) has its own database alias, configured in settings.TENANTS.
+
+The active tenant lives in a context variable. Requests resolve it from the hostname
+(TenantMiddleware) or from the "tenant" claim of the JWT (TenantJWTAuthentication). Management
+commands take --tenant (TenantCommandMixin). Background jobs carry it into their worker thread.
+TenantRouter sends every query to the tenant's alias, and make_cache_key prefixes cache keys with
+the tenant. Without an active tenant everything uses `default`.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+
+from config.db_routers import PinnedJWTAuthentication
+
+
+TENANT_CLAIM = "tenant"
+
+_current_tenant: ContextVar[Optional[str]] = ContextVar("current_tenant", default=None)
+
+
+def get_current_tenant() -> Optional[str]:
+    return _current_tenant.get()
+
+
+def tenant_database(tenant: Optional[str] = None) -> str:
+    """Database alias for `tenant` (the active tenant by default); `default` when there is none."""
+    tenant = tenant if tenant is not None else _current_tenant.get()
+    if tenant is None:
+        return DEFAULT_DB_ALIAS
+    try:
+        return settings.TENANTS[tenant]["database"]
+    except KeyError as exc:
+        raise ImproperlyConfigured(f"Unknown tenant {tenant}.") from exc
+
+
+@contextmanager
+def tenant_context(tenant: Optional[str]):
+    if tenant is not None and tenant not in settings.TENANTS:
+        raise ImproperlyConfigured(f"Unknown tenant {tenant}.")
+    token = _current_tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _current_tenant.reset(token)
+
+
+def tenant_for_host(host: str) -> Optional[str]:
+    hostname = host.split(":", 1)[0].lower()
+    for tenant, config in settings.TENANTS.items():
+        if hostname in config.get("hostnames", ()):
+            return tenant
+    return None
+
+
+def make_cache_key(key, key_prefix, version):
+    """CACHES KEY_FUNCTION: Django's default key format, namespaced by the active tenant."""
+    tenant = _current_tenant.get() or "-"
+    return f"{key_prefix}:{version}:{tenant}:{key}"
+
+
+class TenantRouter:
+    """Pins every model to the active tenant's database; defers to the next router when there is none."""
+
+    def _tenant_db(self):
+        tenant = _current_tenant.get()
+        return tenant_database(tenant) if tenant is not None else None
+
+    def db_for_read(self, model, **hints):
+        return self._tenant_db()
+
+    def db_for_write(self, model, **hints):
+        return self._tenant_db()
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._state.db and obj2._state.db and obj1._state.db != obj2._state.db:
+            return False
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Every tenant database carries the full schema; `migrate --database tenant_<slug>` builds it.
+        if any(config["database"] == db for config in settings.TENANTS.values()):
+            return True
+        return None
+
+
+class TenantMiddleware:
+    """Resolves the tenant from the request host; streamed responses keep it while they are consumed."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with tenant_context(self._resolve(request)):
+            response = self.get_response(request)
+            tenant = self._effective_tenant(request)
+        return self._wrap_streaming(tenant, response)
+
+    async def __acall__(self, request):
+        with tenant_context(self._resolve(request)):
+            response = await self.get_response(request)
+            tenant = self._effective_tenant(request)
+        return self._wrap_streaming(tenant, response)
+
+    @staticmethod
+    def _resolve(request):
+        request.tenant = tenant_for_host(request.get_host()) if settings.TENANTS else None
+        return request.tenant
+
+    @staticmethod
+    def _effective_tenant(request):
+        # TenantJWTAuthentication records the token's school on shared hostnames; read it before
+        # the context resets, because a streamed body is consumed after that.
+        tenant = getattr(request, "tenant", None)
+        return tenant if tenant is not None else get_current_tenant()
+
+    def _wrap_streaming(self, tenant, response):
+        if tenant is not None and response.streaming:
+            wrap = self._ain_tenant if response.is_async else self._in_tenant
+            response.streaming_content = wrap(tenant, response.streaming_content)
+        return response
+
+    @staticmethod
+    def _in_tenant(tenant, content):
+        iterator = iter(content)
+        while True:
+            with tenant_context(tenant):
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    return
+            yield chunk
+
+    @staticmethod
+    async def _ain_tenant(tenant, content):
+        iterator = aiter(content)
+        while True:
+            with tenant_context(tenant):
+                try:
+                    chunk = await anext(iterator)
+                except StopAsyncIteration:
+                    return
+            yield chunk
+
+
+class TenantJWTAuthentication(PinnedJWTAuthentication):
+    """
+    Reads the tenant from the token before the user is loaded, so the user comes from the right
+    database. A token issued for one school is rejected on another school's hostname.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            self.record_tenant(request, result[1])
+        return result
+
+    @staticmethod
+    def record_tenant(request, validated_token):
+        """Keep the token's school on the request for TenantMiddleware to wrap streamed bodies."""
+        tenant = validated_token.get(TENANT_CLAIM)
+        if tenant is not None:
+            request._request.tenant = tenant
+
+    def get_user(self, validated_token):
+        tenant = validated_token.get(TENANT_CLAIM)
+        host_tenant = get_current_tenant()
+        if host_tenant is not None and tenant != host_tenant:
+            raise AuthenticationFailed("Token was issued for a different school.", code="tenant_mismatch")
+        if tenant is not None and tenant not in settings.TENANTS:
+            raise AuthenticationFailed("Token was issued for an unknown school.", code="tenant_unknown")
+        # The view runs in the request's context, so this stays active until the middleware resets it.
+        _current_tenant.set(tenant)
+        return super().get_user(validated_token)
+
+
+class QueryTokenJWTAuthentication(TenantJWTAuthentication):
+    """
+    Also accepts the access token as `?access_token=`, for clients such as browser EventSource
+    that cannot send an Authorization header. Only enable it on endpoints that need it: URLs end
+    up in logs.
+    """
+
+    query_param = "access_token"
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            return result
+        raw_token = request.query_params.get(self.query_param)
+        if not raw_token:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_user(validated_token)
+        self.record_tenant(request, validated_token)
+        return user, validated_token
+
+
+class TenantCommandMixin:
+    """Adds --tenant to a management command and runs handle() against that tenant's database."""
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.add_argument("--tenant", help="School (tenant) slug from settings.TENANTS; default database if omitted")
+        return parser
+
+    def execute(self, *args, **options):
+        tenant = options.get("tenant")
+        if tenant is not None and tenant not in settings.TENANTS:
+            raise CommandError(f"Unknown tenant {tenant}.")
+        with tenant_context(tenant):
+            return super().execute(*args, **options)
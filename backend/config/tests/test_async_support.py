@@ -0,0 +1,29 @@
+import threading
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, override_settings
+
+from config.async_support import gather_sections
+from config.tenancy import get_current_tenant, tenant_context
+
+
+def meet(barrier):
+    # Only returns if both sections are running at the same time.
+    barrier.wait()
+    return threading.get_ident(), get_current_tenant()
+
+
+@override_settings(TENANTS={"north": {"database": "default", "hostnames": []}}, STATEMENT_TIMEOUT_MS=0)
+class GatherSectionsTests(SimpleTestCase):
+    def test_sections_run_concurrently_with_context(self):
+        barrier = threading.Barrier(2, timeout=5)
+        with tenant_context("north"):
+            results = async_to_sync(gather_sections)((meet, barrier), (meet, barrier))
+
+        self.assertEqual([tenant for _, tenant in results], ["north", "north"])
+        self.assertNotEqual(results[0][0], results[1][0])
+
+    @override_settings(ASYNC_PARALLEL_SECTIONS=False)
+    def test_sequential_mode_keeps_order_on_one_thread(self):
+        results = async_to_sync(gather_sections)((lambda: 1,), (lambda: 2,))
+        self.assertEqual(results, [1, 2])
@@ -0,0 +1,62 @@
+import io
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from authentication.models import StudentProfile
+from authentication.tests.fixtures import create_student
+from academics.models import ClassOffering
+from academics.tests.fixtures import create_academic_year
+from config.models import BackfillProgress
+
+
+class BackfillCommandTests(TestCase):
+    def setUp(self):
+        self.students = [
+            create_student(username=f"legacy{index}", email=f"legacy{index}@example.com")[1] for index in range(5)
+        ]
+        StudentProfile.objects.filter(pk__in=[student.pk for student in self.students[1:4]]).update(student_id=None)
+
+    def run_backfill(self, *args):
+        out = io.StringIO()
+        call_command("run_backfill", *args, stdout=out)
+        return out.getvalue()
+
+    def test_batches_resume_from_marker(self):
+        output = self.run_backfill("normalize_student_ids", "--batch-size", "2", "--max-batches", "1")
+        self.assertIn("paused after 2 rows", output)
+        progress = BackfillProgress.objects.get(name="normalize_student_ids")
+        self.assertEqual(progress.last_pk, self.students[1].pk)
+        self.assertIsNone(progress.completed_at)
+        self.assertEqual(StudentProfile.objects.filter(student_id__isnull=True).count(), 2)
+
+        output = self.run_backfill("normalize_student_ids", "--batch-size", "2")
+        self.assertIn("finished after 3 rows", output)
+        progress.refresh_from_db()
+        self.assertEqual((progress.rows_processed, progress.batches), (5, 3))
+        self.assertIsNotNone(progress.completed_at)
+        ids = list(StudentProfile.objects.order_by("pk").values_list("student_id", flat=True))
+        self.assertTrue(all(len(student_id) == 9 for student_id in ids))
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_restart_reprocesses_every_row(self):
+        self.run_backfill("normalize_student_ids")
+        output = self.run_backfill("normalize_student_ids", "--restart")
+        self.assertIn("finished after 5 rows", output)
+
+    def test_seed_class_offerings_repairs_missing_and_renamed(self):
+        year = create_academic_year()
+        ClassOffering.objects.filter(academic_year=year, level="7").delete()
+        ClassOffering.objects.filter(academic_year=year, level="8").update(name="8")
+
+        self.run_backfill("seed_class_offerings", "--batch-size", "10")
+
+        self.assertEqual(
+            sorted(ClassOffering.objects.filter(academic_year=year).values_list("name", flat=True)),
+            ["Class 10", "Class 6", "Class 7", "Class 8", "Class 9"],
+        )
+
+    def test_list_and_unknown_backfill(self):
+        self.assertIn("seed_class_offerings: academics.AcademicYear - not started", self.run_backfill("--list"))
+        with self.assertRaisesMessage(CommandError, "Unknown backfill nowhere."):
+            self.run_backfill("nowhere")
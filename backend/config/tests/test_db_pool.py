@@ -0,0 +1,109 @@
+import threading
+
+from django.db.utils import load_backend
+from django.test import SimpleTestCase
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS, TRANSACTION_STATUS_UNKNOWN
+
+from config.db_backends.postgresql_pool.pool import ConnectionPool, PoolTimeout
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        if self.connection.broken:
+            raise RuntimeError("server closed the connection")
+        self.connection.pings += 1
+
+
+class FakeConnection:
+    """Just the psycopg2 connection surface the pool touches."""
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.pings = 0
+        self.rollbacks = 0
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def make_pool(self, **options):
+        self.created = []
+
+        def connect():
+            connection = FakeConnection()
+            self.created.append(connection)
+            return connection
+
+        return ConnectionPool(connect, **{"max_size": 2, "timeout": 0.05, "health_check_after": 30, **options})
+
+    def test_reuses_idle_connections_and_times_out_when_exhausted(self):
+        pool = self.make_pool()
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        second = pool.acquire()
+
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        stats = pool.stats()
+        self.assertEqual((stats["created"], stats["in_use"], stats["timeouts"]), (2, 2, 1))
+
+        released = threading.Timer(0.01, pool.release, args=[second])
+        pool.timeout = 1
+        released.start()
+        self.assertIs(pool.acquire(), second)
+        self.assertGreater(pool.stats()["max_wait_seconds"], 0)
+
+    def test_release_rolls_back_open_transactions_and_drops_broken_connections(self):
+        pool = self.make_pool()
+        aborted = pool.acquire()
+        aborted.status = TRANSACTION_STATUS_INTRANS
+        pool.release(aborted)
+        self.assertEqual(aborted.rollbacks, 1)
+        self.assertIs(pool.acquire(), aborted)
+
+        aborted.status = TRANSACTION_STATUS_UNKNOWN
+        pool.release(aborted)
+        self.assertTrue(aborted.closed)
+        self.assertEqual(pool.stats()["discarded"], 1)
+        self.assertIsNot(pool.acquire(), aborted)
+
+    def test_health_check_replaces_dead_idle_connections(self):
+        pool = self.make_pool(health_check_after=0)
+        connection = pool.acquire()
+        pool.release(connection)
+        self.assertIs(pool.acquire(), connection)
+        self.assertEqual(connection.pings, 1)
+
+        connection.broken = True
+        pool.release(connection)
+        replacement = pool.acquire()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(len(self.created), 2)
+
+    def test_engine_loads_as_django_backend(self):
+        backend = load_backend("config.db_backends.postgresql_pool")
+        self.assertEqual(backend.DatabaseWrapper.vendor, "postgresql")
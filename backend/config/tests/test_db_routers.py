@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.tests.fixtures import create_teacher
+from academics.tests.fixtures import create_academic_year, create_assignment, create_class_offering, create_subject
+from config import db_routers
+from config.db_routers import ReplicaRouter, check_pin_cache, is_pinned, primary_db, use_primary
+
+
+@override_settings(REPLICA_DATABASES=["replica_1", "replica_2"])
+class ReplicaRouterTests(SimpleTestCase):
+    def test_reads_use_replicas_unless_forced_onto_primary(self):
+        router = ReplicaRouter()
+        self.assertIn(router.db_for_read(None), {"replica_1", "replica_2"})
+        self.assertEqual(router.db_for_write(None), "default")
+        with use_primary():
+            self.assertEqual(router.db_for_read(None), "default")
+        self.assertEqual(primary_db(lambda: router.db_for_read(None))(), "default")
+        self.assertTrue(router.allow_migrate("default", "academics"))
+        self.assertFalse(router.allow_migrate("replica_1", "academics"))
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_without_replicas_everything_reads_from_default(self):
+        self.assertEqual(ReplicaRouter().db_for_read(None), "default")
+
+    def test_replicas_need_a_shared_cache_for_pins(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "shared by all processes"):
+            check_pin_cache()
+        shared = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": "/tmp"}}
+        with override_settings(CACHES=shared):
+            check_pin_cache()
+        with override_settings(REPLICA_DATABASES=[]):
+            check_pin_cache()
+
+
+# The test database stands in as the only "replica" so queries still run; picking a replica
+# is observed through random.choice, which the router only calls when it may leave the primary.
+@override_settings(REPLICA_DATABASES=["default"])
+class ReadYourWritesTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.teacher = create_teacher()
+        login = self.client.post(reverse("auth_login"), {"username": self.user.username, "password": "password123"}, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['access']}")
+        year = create_academic_year()
+        self.assignment = create_assignment(self.teacher, year, create_class_offering(year), create_subject())
+
+    def _replica_reads(self, method, *args, **kwargs):
+        with mock.patch.object(db_routers.random, "choice", return_value="default") as choice:
+            response = method(*args, **kwargs)
+        return response, choice.call_count
+
+    def test_write_pins_user_to_primary(self):
+        self.assertFalse(is_pinned(self.user.pk))
+        _, replica_reads = self._replica_reads(self.client.get, reverse("teacher-dashboard"))
+        self.assertGreater(replica_reads, 0)
+
+        payload = {"assignment_id": self.assignment.id, "title": "Pinned", "date": timezone.localdate(), "max_marks": 100}
+        response, replica_reads = self._replica_reads(self.client.post, reverse("teacher-exams"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replica_reads, 0)
+        self.assertTrue(is_pinned(self.user.pk))
+
+        response, replica_reads = self._replica_reads(self.client.get, reverse("teacher-dashboard"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Only the JWT user lookup runs before authentication has seen the pin.
+        self.assertEqual(replica_reads, 1)
+
+        cache.clear()
+        _, replica_reads = self._replica_reads(self.client.get, reverse("teacher-dashboard"))
+        self.assertGreater(replica_reads, 1)
+
+    def test_registration_pins_new_account(self):
+        self.client.credentials()
+        payload = {
+            "username": "fresh",
+            "email": "fresh@example.com",
+            "password1": "strongpass123",
+            "password2": "strongpass123",
+        }
+        response = self.client.post(reverse("auth_register_student"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertTrue(is_pinned(response.data["user"]["id"]))
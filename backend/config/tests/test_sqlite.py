@@ -0,0 +1,104 @@
+import threading
+import unittest
+
+from django.db import OperationalError, close_old_connections, connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from authentication.tests.fixtures import create_student, create_teacher
+from academics.models import HARDCODED_SUBJECTS, Exam, Mark
+from academics.services import ServiceError, create_exam, save_marks
+from academics.tests.fixtures import (
+    create_academic_year,
+    create_assignment,
+    create_class_offering,
+    create_subject,
+    enroll_student,
+)
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "SQLite tuning only applies to SQLite")
+class SQLiteWriteConcurrencyTests(TransactionTestCase):
+    serialized_rollback = True
+    writers = len(HARDCODED_SUBJECTS)
+
+    def setUp(self):
+        _, self.teacher = create_teacher()
+        year = create_academic_year()
+        class_offering = create_class_offering(year)
+        self.assignments = [
+            create_assignment(self.teacher, year, class_offering, create_subject(name, code))
+            for name, code in HARDCODED_SUBJECTS.items()
+        ]
+        self.enrollments = []
+        for index in range(1, 6):
+            _, student = create_student(username=f"writer{index}", email=f"writer{index}@example.com")
+            self.enrollments.append(enroll_student(student, year, class_offering, roll_number=str(index)))
+
+    def run_concurrently(self, calls):
+        """Start every call at once on its own thread; return (results, lock errors)."""
+        barrier = threading.Barrier(len(calls))
+        results, lock_errors = [], []
+
+        def worker(call):
+            try:
+                barrier.wait()
+                results.append(call())
+            except OperationalError as exc:
+                lock_errors.append(exc)
+            except ServiceError as exc:
+                results.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(call,)) for call in calls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, lock_errors
+
+    def test_pragmas_applied_to_new_connections(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    def test_concurrent_mark_submissions_queue_without_lock_errors(self):
+        exams = Exam.objects.bulk_create(
+            Exam(
+                assignment=assignment,
+                academic_year=assignment.academic_year,
+                title=f"Concurrent {index}",
+                date=timezone.localdate(),
+                created_by=self.teacher,
+            )
+            for index, assignment in enumerate(self.assignments)
+        )
+        marks = [{"student_enrollment_id": enrollment.id, "marks_obtained": 70} for enrollment in self.enrollments]
+        # Two submissions for the first exam race the same "already marked" check.
+        calls = [lambda exam=exam: save_marks(exam, marks, actor=self.teacher) for exam in [exams[0], *exams]]
+
+        results, lock_errors = self.run_concurrently(calls)
+
+        self.assertEqual(lock_errors, [])
+        self.assertEqual(sorted(result for result in results if isinstance(result, int)), [5] * self.writers)
+        self.assertEqual(len([result for result in results if isinstance(result, ServiceError)]), 1)
+        self.assertEqual(Mark.objects.count(), 5 * self.writers)
+
+    def test_concurrent_exam_creation_respects_limit(self):
+        assignment = self.assignments[0]
+        calls = [
+            lambda index=index: create_exam(
+                assignment=assignment, teacher=self.teacher, title=f"Race {index}", exam_date=timezone.localdate()
+            )
+            for index in range(6)
+        ]
+
+        results, lock_errors = self.run_concurrently(calls)
+
+        self.assertEqual(lock_errors, [])
+        self.assertEqual(Exam.objects.filter(assignment=assignment).count(), 3)
+        self.assertEqual(len([result for result in results if isinstance(result, ServiceError)]), 3)
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.tests.fixtures import create_teacher
+from academics import jobs
+from config.tenancy import TenantRouter, get_current_tenant, tenant_context, tenant_database
+
+
+TENANTS = {
+    "north": {"database": "tenant_north", "hostnames": ["north.example.org"]},
+    "south": {"database": "tenant_south", "hostnames": ["south.example.org"]},
+}
+# Both schools share the test database so requests can run; routing itself is covered by TenantRouterTests.
+SHARED_TENANTS = {slug: {**config, "database": "default"} for slug, config in TENANTS.items()}
+
+
+@override_settings(TENANTS=TENANTS)
+class TenantRouterTests(SimpleTestCase):
+    def test_queries_and_cache_keys_follow_active_tenant(self):
+        router = TenantRouter()
+        self.assertIsNone(router.db_for_read(None))
+        self.assertEqual(tenant_database(), "default")
+        with tenant_context("north"):
+            self.assertEqual(router.db_for_read(None), "tenant_north")
+            self.assertEqual(router.db_for_write(None), "tenant_north")
+            cache.set("dashboard", "north data")
+        with tenant_context("south"):
+            self.assertEqual(tenant_database(), "tenant_south")
+            self.assertIsNone(cache.get("dashboard"))
+        self.assertTrue(router.allow_migrate("tenant_south", "academics"))
+        self.assertIsNone(router.allow_migrate("default", "academics"))
+
+    def test_unknown_tenant_is_rejected_by_commands(self):
+        with self.assertRaisesMessage(CommandError, "Unknown tenant nowhere"):
+            call_command("archive_academic_year", "--year", "2025", "--tenant", "nowhere")
+
+
+@override_settings(TENANTS=SHARED_TENANTS)
+class TenantRequestTests(APITestCase):
+    def setUp(self):
+        self.user, _ = create_teacher()
+
+    def login(self, host):
+        credentials = {"username": self.user.username, "password": "password123"}
+        response = self.client.post(reverse("auth_login"), credentials, format="json", HTTP_HOST=host)
+        return response.data["access"]
+
+    def test_token_carries_tenant_and_is_bound_to_its_school(self):
+        access = self.login("north.example.org")
+        self.assertEqual(AccessToken(access)["tenant"], "north")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        response = self.client.get(reverse("auth_me"), HTTP_HOST="north.example.org")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Shared hostnames take the school from the token.
+        response = self.client.get(reverse("auth_me"), HTTP_HOST="api.example.org")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(reverse("auth_me"), HTTP_HOST="south.example.org")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIsNone(get_current_tenant())
+
+    def test_streamed_export_reads_the_token_school_on_a_shared_host(self):
+        self.user.is_staff = True
+        self.user.save(update_fields=["is_staff"])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login('north.example.org')}")
+
+        def export(academic_year):
+            # Evaluated while the body streams, after the view has returned.
+            return ["tenant"], ([get_current_tenant()] for _ in range(1))
+
+        with mock.patch("academics.api.views.year_results_export", export):
+            response = self.client.get(
+                reverse("staff-export-year-results", args=["2026"]), HTTP_HOST="api.example.org"
+            )
+            body = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(body.split(), ["tenant", "north"])
+
+    def test_tokens_without_tenant_stay_on_default(self):
+        access = self.login("api.example.org")
+        self.assertNotIn("tenant", AccessToken(access).payload)
+
+
+@override_settings(TENANTS=SHARED_TENANTS, JOBS_EAGER=False)
+class TenantJobTests(TestCase):
+    def test_worker_thread_receives_tenant(self):
+        with mock.patch.object(jobs, "_get_executor") as executor, tenant_context("south"):
+            with self.captureOnCommitCallbacks(execute=True):
+                job = jobs.enqueue_job("recompute_grades", params={"enrollment_ids": []})
+
+        executor.return_value.submit.assert_called_once_with(jobs._run_in_worker, job.pk, "south")
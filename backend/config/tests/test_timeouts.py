@@ -0,0 +1,98 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.tests.fixtures import create_student, create_teacher
+from academics.api.views import StaffYearResultsExportView, StudentTrendsView
+from config.timeouts import _postgresql_budget, is_statement_timeout, statement_timeout
+
+
+# Counts to a hundred million; takes seconds unless something interrupts it.
+SLOW_QUERY = (
+    "WITH RECURSIVE counter(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM counter WHERE n < 100000000) "
+    "SELECT COUNT(*) FROM counter"
+)
+
+
+def run_slow_query(*args, **kwargs):
+    with connection.cursor() as cursor:
+        cursor.execute(SLOW_QUERY)
+        return cursor.fetchone()
+
+
+class PostgreSQLBudgetTests(SimpleTestCase):
+    def call(self, cursor_name=None, many=False):
+        execute = mock.Mock()
+        context = {"cursor": SimpleNamespace(cursor=SimpleNamespace(name=cursor_name))}
+        with statement_timeout(250):
+            _postgresql_budget(execute, "SELECT 1", None, many, context)
+        return execute.call_args.args[0]
+
+    def test_statement_is_prefixed_with_set_local(self):
+        self.assertEqual(self.call(), "SET LOCAL statement_timeout = 250; SELECT 1")
+        self.assertEqual(self.call(cursor_name="_django_curs_1"), "SELECT 1")
+        self.assertEqual(self.call(many=True), "SELECT 1")
+
+    @override_settings(STATEMENT_TIMEOUT_MS=0)
+    def test_zero_setting_disables_budgets(self):
+        self.assertEqual(self.call(), "SELECT 1")
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "progress-handler interrupts are SQLite specific")
+class SQLiteInterruptTests(TestCase):
+    def test_slow_statement_is_interrupted(self):
+        with self.assertRaises(OperationalError) as raised, statement_timeout(5000), statement_timeout(1):
+            run_slow_query()
+        self.assertTrue(is_statement_timeout(raised.exception))
+
+        # A budget nested in a block with budgets off still applies.
+        with self.assertRaises(OperationalError), statement_timeout(0), statement_timeout(1):
+            run_slow_query()
+
+        # The handler is gone once the block exits.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            self.assertEqual(cursor.fetchone(), (1,))
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "progress-handler interrupts are SQLite specific")
+class TimeoutResponseTests(APITestCase):
+    def setUp(self):
+        self.user, _ = create_student()
+        login = self.client.post(
+            reverse("auth_login"), {"username": self.user.username, "password": "password123"}, format="json"
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['access']}")
+
+    def test_cancelled_query_returns_503(self):
+        with mock.patch.object(StudentTrendsView, "statement_timeout", 1), mock.patch(
+            "academics.api.views.get_student_trends", run_slow_query
+        ):
+            response = self.client.get(reverse("student-trends"))
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.data["code"], "statement_timeout")
+        self.assertEqual(response["Retry-After"], "30")
+
+    def test_streamed_body_runs_under_the_view_budget(self):
+        staff, _ = create_teacher()
+        staff.is_staff = True
+        staff.save(update_fields=["is_staff"])
+        self.client.force_authenticate(staff)
+
+        def slow_export(academic_year):
+            return ["count"], (run_slow_query() for _ in range(1))
+
+        with mock.patch.object(StaffYearResultsExportView, "statement_timeout", 1), mock.patch(
+            "academics.api.views.year_results_export", slow_export
+        ):
+            response = self.client.get(reverse("staff-export-year-results", args=["2026"]))
+            with self.assertRaises(OperationalError) as raised:
+                b"".join(response.streaming_content)
+        self.assertTrue(is_statement_timeout(raised.exception))
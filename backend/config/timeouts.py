@@ -0,0 +1,122 @@
+"""
+Statement timeouts: one slow query is cancelled before it holds a database connection for minutes.
+
+`statement_timeout(ms)` caps every SQL statement that runs inside the block. On PostgreSQL the
+statement is sent with `SET LOCAL statement_timeout` in front of it. On SQLite a progress handler
+interrupts the statement once the budget is spent. Views in academics.api.views declare their
+budget through StatementTimeoutMixin, which also covers streamed response bodies chunk by chunk,
+and heavier services decorate themselves. A nested budget replaces the outer one until it exits,
+including inside a block whose budget is 0 (off). A cancelled statement raises OperationalError;
+is_statement_timeout() recognises it, and config.exceptions turns it into a 503.
+settings.STATEMENT_TIMEOUT_MS is the default budget, and 0 turns budgets off.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import ContextDecorator, ExitStack
+from contextvars import ContextVar
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db import OperationalError, connections
+
+
+# PostgreSQL SQLSTATE for query_canceled, raised when statement_timeout fires.
+QUERY_CANCELED = "57014"
+# SQLite virtual-machine instructions between deadline checks.
+SQLITE_PROGRESS_STEPS = 1000
+
+_budget_ms: ContextVar[Optional[int]] = ContextVar("statement_budget_ms", default=None)
+# Whether an enclosing block already installed the execute wrappers; they stay until it exits.
+_wrapped: ContextVar[bool] = ContextVar("statement_budget_wrapped", default=False)
+
+
+def is_statement_timeout(exc: BaseException) -> bool:
+    if not isinstance(exc, OperationalError):
+        return False
+    cause = exc.__cause__
+    return getattr(cause, "pgcode", None) == QUERY_CANCELED or str(cause or exc) == "interrupted"
+
+
+def _postgresql_budget(execute, sql, params, many, context):
+    budget = _budget_ms.get()
+    # executemany and server-side (named) cursors can't take a second statement in the same call.
+    if budget and not many and getattr(context["cursor"].cursor, "name", None) is None:
+        # Sent as one query string, so the SET LOCAL scopes to this statement's transaction even in autocommit.
+        sql = f"SET LOCAL statement_timeout = {int(budget)}; {sql}"
+    return execute(sql, params, many, context)
+
+
+def _sqlite_budget(execute, sql, params, many, context):
+    budget = _budget_ms.get()
+    if not budget:
+        return execute(sql, params, many, context)
+    raw = context["connection"].connection
+    deadline = time.monotonic() + budget / 1000
+    raw.set_progress_handler(lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS)
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        raw.set_progress_handler(None, 0)
+
+
+_WRAPPERS = {"postgresql": _postgresql_budget, "sqlite": _sqlite_budget}
+
+
+class statement_timeout(ContextDecorator):
+    """Cap each statement in the block at `milliseconds` (settings.STATEMENT_TIMEOUT_MS when None)."""
+
+    def __init__(self, milliseconds: Optional[int] = None):
+        self.milliseconds = milliseconds
+        self._scopes = threading.local()
+
+    def __enter__(self):
+        budget = max(settings.STATEMENT_TIMEOUT_MS, 0)
+        if budget and self.milliseconds is not None:
+            budget = self.milliseconds
+        stack = ExitStack()
+        # The first block with a budget installs the wrappers; nested ones only swap the value they read.
+        if budget and not _wrapped.get():
+            for alias in connections:
+                wrapper = _WRAPPERS.get(connections[alias].vendor)
+                if wrapper is not None:
+                    stack.enter_context(connections[alias].execute_wrapper(wrapper))
+            stack.callback(_wrapped.reset, _wrapped.set(True))
+        token = _budget_ms.set(budget)
+        stack.callback(_budget_ms.reset, token)
+        self._scopes.__dict__.setdefault("stack", []).append(stack)
+        return self
+
+    def __exit__(self, *exc):
+        self._scopes.stack.pop().close()
+        return False
+
+
+def _budgeted(milliseconds: Optional[int], content: Iterable) -> Iterator:
+    iterator = iter(content)
+    while True:
+        with statement_timeout(milliseconds):
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+        yield chunk
+
+
+class StatementTimeoutMixin:
+    """
+    APIView mixin: the whole request runs under `statement_timeout` milliseconds per statement
+    (None = settings.STATEMENT_TIMEOUT_MS). A streamed body queries while the server sends it, after
+    dispatch has returned, so each chunk is produced under the same budget.
+    """
+
+    statement_timeout: Optional[int] = None
+
+    def dispatch(self, request, *args, **kwargs):
+        with statement_timeout(self.statement_timeout):
+            response = super().dispatch(request, *args, **kwargs)
+        if response.streaming and not response.is_async:
+            response.streaming_content = _budgeted(self.statement_timeout, response.streaming_content)
+        return response
@@ -23,6 +23,7 @@ urlpatterns = [
     path('api/auth/', include('authentication.api.urls')),
     path('api/student/', include('academics.api.student_urls')),
     path('api/teacher/', include('academics.api.teacher_urls')),
+    path('api/staff/', include('academics.api.staff_urls')),
     path('api/reference/', include('reference.api.urls')),
     path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
     path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='api-schema'), name='api-swagger-ui'),